@@ -0,0 +1,172 @@
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime
+from itertools import combinations
+from typing import Iterator, List, Optional, Sequence, Tuple
+import gc
+import numpy as np
+from .models import (Agent, AgentConfig, Background, Squad, EDUCATION_LEVELS, LIFE_EVENTS,
+                     SKILLS, TRAITS)
+from .organization import Department, Division
+from .scoring import CONFIG_FIELDS
+
+# Inclusive ranges of each AgentConfig field, as drawn by Agent.create_random
+CONFIG_RANGES = {
+    "learning_rate": (0.1, 1.0),
+    "attention_span": (1, 10),
+    "memory_capacity": (1, 100),
+    "creativity_factor": (0.1, 1.0),
+    "risk_tolerance": (0.1, 1.0),
+    "cooperation_bias": (0.1, 1.0),
+    "energy_efficiency": (0.1, 1.0),
+    "adaptation_speed": (0.1, 1.0)
+}
+
+@dataclass(frozen=True)
+class OrganizationSpec:
+    """Shape of a department to build"""
+    name: str = "Department"
+    headcount: int = 100_000
+    division_size: int = 10_000
+    squad_size: int = 5
+    # Direct reports per manager in each division's reporting tree
+    span_of_control: int = 10
+
+class _Choices:
+    """Every subset of `options` with between `low` and `high` members.
+
+    Drawing a size uniformly and then a subset of that size uniformly
+    matches `random.sample(options, randint(low, high))` up to ordering.
+    """
+
+    def __init__(self, options: Sequence[str], low: int, high: int):
+        self.subsets: List[Tuple[str, ...]] = []
+        self.starts = []
+        self.counts = []
+        for size in range(low, high + 1):
+            self.starts.append(len(self.subsets))
+            self.subsets.extend(combinations(options, size))
+            self.counts.append(len(self.subsets) - self.starts[-1])
+        self.starts = np.array(self.starts)
+        self.counts = np.array(self.counts)
+
+    def draw(self, rng: np.random.Generator, n: int) -> np.ndarray:
+        sizes = rng.integers(0, len(self.counts), n)
+        return self.starts[sizes] + (rng.random(n) * self.counts[sizes]).astype(np.int64)
+
+_SKILLS = _Choices(SKILLS, 2, 5)
+_TRAITS = _Choices(TRAITS, 2, 4)
+_EVENTS = _Choices(LIFE_EVENTS, 1, 3)
+
+@contextmanager
+def _collection_paused() -> Iterator[None]:
+    """Suspend the cyclic GC, which would otherwise rescan the growing heap
+    many times over while a million fresh objects are allocated"""
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+class OrganizationBuilder:
+    """Builds whole departments in batch.
+
+    Configs, backgrounds and ids for every agent are drawn as arrays from
+    one seeded generator, all records share one creation timestamp, and the
+    per-object work is reduced to constructing the dataclasses. Each
+    division is a complete tree with `span_of_control` reports per manager;
+    its root leads the division and reports to the department leader.
+    """
+
+    def __init__(self, seed: Optional[int] = None):
+        self.rng = np.random.default_rng(seed)
+
+    def configs(self, n: int) -> List[AgentConfig]:
+        """n random agent configs, drawn column by column"""
+        columns = []
+        for name in CONFIG_FIELDS:
+            low, high = CONFIG_RANGES[name]
+            if isinstance(low, int):
+                columns.append(self.rng.integers(low, high + 1, n).tolist())
+            else:
+                columns.append(self.rng.uniform(low, high, n).tolist())
+        return [AgentConfig(*values) for values in zip(*columns)]
+
+    def backgrounds(self, n: int) -> List[Background]:
+        education = self.rng.integers(0, len(EDUCATION_LEVELS), n).tolist()
+        years = self.rng.integers(1, 31, n).tolist()
+        skills = _SKILLS.draw(self.rng, n).tolist()
+        traits = _TRAITS.draw(self.rng, n).tolist()
+        events = _EVENTS.draw(self.rng, n).tolist()
+        return [
+            Background(EDUCATION_LEVELS[e], y, list(_SKILLS.subsets[s]),
+                       list(_TRAITS.subsets[t]), list(_EVENTS.subsets[v]))
+            for e, y, s, t, v in zip(education, years, skills, traits, events)
+        ]
+
+    def ids(self, n: int) -> List[str]:
+        """A block of n version 4 UUID strings, formatted from one hex dump"""
+        raw = self.rng.integers(0, 256, (n, 16), dtype=np.uint8)
+        # Version and variant bits, as uuid.UUID(version=4) sets them
+        raw[:, 6] = (raw[:, 6] & 0x0F) | 0x40
+        raw[:, 8] = (raw[:, 8] & 0x3F) | 0x80
+        h = raw.tobytes().hex()
+        return [f"{h[i:i + 8]}-{h[i + 8:i + 12]}-{h[i + 12:i + 16]}-{h[i + 16:i + 20]}-{h[i + 20:i + 32]}"
+                for i in range(0, 32 * n, 32)]
+
+    def build_department(self, spec: OrganizationSpec) -> Department:
+        if spec.headcount < 1 or spec.squad_size < 1 or spec.division_size < 1 \
+                or spec.span_of_control < 1:
+            raise ValueError("Headcount, sizes and span of control must be positive")
+        with _collection_paused():
+            return self._build_department(spec)
+
+    def _build_department(self, spec: OrganizationSpec) -> Department:
+        now = datetime.now()
+        n = spec.headcount
+        ids = self.ids(n)
+        configs = self.configs(n)
+        backgrounds = self.backgrounds(n)
+        
+        department = Department(name=spec.name, created_at=now)
+        for d, start in enumerate(range(0, n, spec.division_size)):
+            stop = min(start + spec.division_size, n)
+            division = Division(name=f"{spec.name}-Division-{d}", created_at=now)
+            agents = self._division_agents(division.name, spec, ids[start:stop],
+                                           configs[start:stop], backgrounds[start:stop], now)
+            division.leader = agents[0]
+            division.squads = [
+                Squad(id=squad_id, name=f"{division.name}-Squad-{s}",
+                      agents=agents[first:first + spec.squad_size], created_at=now)
+                for s, (squad_id, first) in enumerate(zip(self.ids(-(-len(agents) // spec.squad_size)),
+                                                          range(0, len(agents), spec.squad_size)))
+            ]
+            department.divisions.append(division)
+        
+        # Division leaders report to the first division's leader
+        department.leader = department.divisions[0].leader
+        for division in department.divisions[1:]:
+            division.leader.supervisor_id = department.leader.id
+            department.leader.subordinate_ids.append(division.leader.id)
+        return department
+
+    def _division_agents(self, name: str, spec: OrganizationSpec, ids: List[str],
+                         configs: List[AgentConfig], backgrounds: List[Background],
+                         now: datetime) -> List[Agent]:
+        span = spec.span_of_control
+        squad_size = spec.squad_size
+        # Agent i of a complete tree reports to (i - 1) // span
+        return [
+            Agent(
+                id=ids[i],
+                name=f"{name}-Squad-{i // squad_size}-Agent-{i % squad_size}",
+                config=configs[i],
+                background=backgrounds[i],
+                created_at=now,
+                supervisor_id=ids[(i - 1) // span] if i else None,
+                subordinate_ids=ids[i * span + 1:i * span + span + 1]
+            )
+            for i in range(len(ids))
+        ]
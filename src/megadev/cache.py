@@ -0,0 +1,119 @@
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Hashable, Optional, Tuple
+import json
+import threading
+
+# Items of a long list whose encoded size stands in for the whole list
+SIZE_SAMPLE = 16
+
+def estimate_bytes(data: Any, sample: int = SIZE_SAMPLE) -> int:
+    """Approximate JSON-encoded size of `data` without encoding all of it.
+
+    Lists longer than `sample` are extrapolated from evenly spaced items, so
+    the cost does not grow with the population.
+    """
+    # Sizes follow json.dumps defaults: ", " between items and ": " after keys
+    if isinstance(data, dict):
+        if not data:
+            return 2
+        return sum(len(json.dumps(str(key))) + 2 + estimate_bytes(value, sample)
+                   for key, value in data.items()) + 2 * len(data)
+    if isinstance(data, (list, tuple)):
+        if len(data) <= sample:
+            return sum(estimate_bytes(item, sample) for item in data) + 2 * max(len(data), 1)
+        step = len(data) / sample
+        picked = sum(estimate_bytes(data[int(i * step)], sample) for i in range(sample))
+        return round(picked * len(data) / sample) + 2 * len(data)
+    return len(json.dumps(data, default=str))
+
+@dataclass
+class CachedResponse:
+    """A built resource response together with its estimated encoded size"""
+    response: Any
+    size: int
+    version: Hashable
+    scope: Hashable = None
+
+class ResponseCache:
+    """LRU cache of resource responses keyed by (resource, params, version).
+
+    The version identifies the state a response was built from (generation
+    plus population mutation counters), so a stale entry can never be served
+    once the population changes. The estimated JSON size of each response's
+    data counts against `max_bytes`; least recently used entries are evicted
+    when the budget is exceeded.
+    """
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: "OrderedDict[Tuple[str, str, Hashable], CachedResponse]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def params_key(params: Optional[Dict[str, Any]]) -> str:
+        return json.dumps(params or {}, sort_keys=True, default=str)
+
+    def get(self, resource: str, params: Optional[Dict[str, Any]],
+            version: Hashable) -> Optional[CachedResponse]:
+        key = (resource, self.params_key(params), version)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, resource: str, params: Optional[Dict[str, Any]], version: Hashable,
+            response: Any, data: Any, scope: Hashable = None) -> CachedResponse:
+        """Cache a response, charging the estimated size of the `data` it serves"""
+        entry = CachedResponse(
+            response=response,
+            size=estimate_bytes(data),
+            version=version,
+            scope=scope
+        )
+        if entry.size > self.max_bytes:
+            return entry
+
+        key = (resource, self.params_key(params), version)
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.bytes -= previous.size
+            self._entries[key] = entry
+            self.bytes += entry.size
+            while self.bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.bytes -= evicted.size
+                self.evictions += 1
+        return entry
+
+    def invalidate(self, keep_version: Optional[Hashable] = None, scope: Hashable = None):
+        """Drop entries of `scope` (all entries if None) not built from `keep_version`"""
+        with self._lock:
+            stale = [
+                key for key, entry in self._entries.items()
+                if (scope is None or entry.scope == scope) and entry.version != keep_version
+            ]
+            for key in stale:
+                self.bytes -= self._entries.pop(key).size
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "entries": len(self._entries),
+            "bytes": self.bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions
+        }
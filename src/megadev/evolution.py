@@ -1,18 +1,110 @@
-from typing import List, Tuple
+from typing import Any, Callable, Dict, List, Optional, Tuple
 import random
 import numpy as np
-from .models import Squad, Agent, AgentConfig
+from .models import Squad, Agent, AgentConfig, Background, random_id
+
+# Gene ranges used to normalise configs when measuring diversity
+GENE_BOUNDS = {
+    "learning_rate": (0.1, 1.0),
+    "attention_span": (1, 10),
+    "memory_capacity": (1, 100),
+    "creativity_factor": (0.1, 1.0),
+    "risk_tolerance": (0.1, 1.0),
+    "cooperation_bias": (0.1, 1.0),
+    "energy_efficiency": (0.1, 1.0),
+    "adaptation_speed": (0.1, 1.0)
+}
+
+def generation_stats(squads: List[Squad]) -> Dict[str, float]:
+    """Fitness spread and genetic diversity of an evaluated population"""
+    fitness = np.fromiter((squad.fitness_score for squad in squads), dtype=float, count=len(squads))
+    configs = np.array([
+        [getattr(agent.config, gene) for gene in GENE_BOUNDS]
+        for squad in squads
+        for agent in squad.agents
+    ], dtype=float).reshape(-1, len(GENE_BOUNDS))
+    lower, upper = np.array(list(GENE_BOUNDS.values()), dtype=float).T
+    normalised = (configs - lower) / (upper - lower)
+    
+    return {
+        "best": float(fitness.max()) if len(fitness) else 0.0,
+        "mean": float(fitness.mean()) if len(fitness) else 0.0,
+        "std": float(fitness.std()) if len(fitness) else 0.0,
+        # Mean per-gene standard deviation on a 0-1 scale
+        "diversity": float(normalised.std(axis=0).mean()) if len(normalised) else 0.0
+    }
+
+def _rng_state(rng: random.Random) -> List[Any]:
+    version, internal, gauss_next = rng.getstate()
+    return [version, list(internal), gauss_next]
+
+def _set_rng_state(rng: random.Random, state: List[Any]):
+    version, internal, gauss_next = state
+    rng.setstate((version, tuple(internal), gauss_next))
 
 class EvolutionEngine:
-    def __init__(self, population_size: int = 10, elite_size: int = 2):
+    """Selection, crossover and mutation of squad populations.
+
+    Every random draw, including new ids, comes from the engine's own
+    generator seeded by `seed`, so a run is reproducible and unaffected by
+    other users of the global `random` module. `checkpoint()` captures the
+    parameters, generation and the state of every stream; an engine built
+    by `restore()` continues exactly where the checkpointed one was.
+    """
+
+    def __init__(self, population_size: int = 10, elite_size: int = 2, squad_size: int = 5,
+                 seed: Optional[int] = None):
         self.population_size = population_size
         self.elite_size = elite_size
+        self.squad_size = squad_size
         self.generation = 0
+        self.seed = seed if seed is not None else random.randrange(2**63)
+        self.rng = random.Random(self.seed)
+        self._streams: Dict[str, random.Random] = {}
+        
+    def stream(self, name: str) -> random.Random:
+        """Independent generator for one consumer, e.g. fitness evaluation or a worker.
+
+        Streams are seeded from (seed, name), so each worker's draws do not
+        depend on how much the others have drawn.
+        """
+        rng = self._streams.get(name)
+        if rng is None:
+            rng = self._streams[name] = random.Random(f"{self.seed}:{name}")
+        return rng
+
+    def checkpoint(self) -> Dict[str, Any]:
+        """JSON-safe engine state, including the position of every random stream"""
+        return {
+            "population_size": self.population_size,
+            "elite_size": self.elite_size,
+            "squad_size": self.squad_size,
+            "generation": self.generation,
+            "seed": self.seed,
+            "rng": _rng_state(self.rng),
+            "streams": {name: _rng_state(rng) for name, rng in self._streams.items()}
+        }
+
+    @classmethod
+    def restore(cls, state: Dict[str, Any]) -> "EvolutionEngine":
+        """Rebuild an engine from `checkpoint()` output"""
+        engine = cls(
+            population_size=state["population_size"],
+            elite_size=state["elite_size"],
+            squad_size=state["squad_size"],
+            seed=state.get("seed")
+        )
+        engine.generation = state["generation"]
+        if "rng" in state:
+            _set_rng_state(engine.rng, state["rng"])
+        for name, stream_state in state.get("streams", {}).items():
+            _set_rng_state(engine.stream(name), stream_state)
+        return engine
         
     def create_initial_population(self) -> List[Squad]:
         """Create initial population of squads"""
         return [
-            Squad.create_random(f"Squad-{i}")
+            Squad.create_random(f"Squad-{i}", size=self.squad_size, rng=self.rng)
             for i in range(self.population_size)
         ]
     
@@ -21,8 +113,8 @@ class EvolutionEngine:
         mutation_rate = 0.1
         
         def mutate_value(value: float) -> float:
-            if random.random() < mutation_rate:
-                return max(0.1, min(1.0, value + random.gauss(0, 0.1)))
+            if self.rng.random() < mutation_rate:
+                return max(0.1, min(1.0, value + self.rng.gauss(0, 0.1)))
             return value
         
         return AgentConfig(
@@ -50,14 +142,20 @@ class EvolutionEngine:
         )
         
         return Agent(
-            id=str(uuid.uuid4()),
+            id=random_id(self.rng),
             name=f"Gen{self.generation}-{parent1.name}-{parent2.name}",
             config=self.mutate_config(child_config),
+            background=Background.generate_random(self.rng),
             generation=self.generation
         )
     
-    def evolve_population(self, squads: List[Squad]) -> List[Squad]:
-        """Evolve population through selection, crossover and mutation"""
+    def evolve_population(self, squads: List[Squad],
+                          progress: Optional[Callable[[int, int], None]] = None) -> List[Squad]:
+        """Evolve population through selection, crossover and mutation.
+
+        `progress(done, total)` is called after each new squad is bred; it may
+        raise to abort the generation before the new population is returned.
+        """
         self.generation += 1
         
         # Sort squads by fitness
@@ -68,21 +166,23 @@ class EvolutionEngine:
         
         # Create new squads through crossover
         while len(new_population) < self.population_size:
-            parent_squad1 = random.choice(sorted_squads[:len(sorted_squads)//2])
-            parent_squad2 = random.choice(sorted_squads[:len(sorted_squads)//2])
+            parent_squad1 = self.rng.choice(sorted_squads[:len(sorted_squads)//2])
+            parent_squad2 = self.rng.choice(sorted_squads[:len(sorted_squads)//2])
             
             new_agents = []
             for i in range(len(parent_squad1.agents)):
-                parent1 = random.choice(parent_squad1.agents)
-                parent2 = random.choice(parent_squad2.agents)
+                parent1 = self.rng.choice(parent_squad1.agents)
+                parent2 = self.rng.choice(parent_squad2.agents)
                 new_agents.append(self.crossover(parent1, parent2))
             
             new_squad = Squad(
-                id=str(uuid.uuid4()),
+                id=random_id(self.rng),
                 name=f"Squad-Gen{self.generation}-{len(new_population)}",
                 agents=new_agents,
                 generation=self.generation
             )
             new_population.append(new_squad)
+            if progress:
+                progress(len(new_population), self.population_size)
         
         return new_population 
\ No newline at end of file
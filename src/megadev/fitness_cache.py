@@ -0,0 +1,74 @@
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Dict, Hashable, Optional, Tuple
+import threading
+from .models import AgentConfig
+from .scoring import CONFIG_FIELDS
+
+@dataclass(frozen=True)
+class FitnessFunction:
+    """A fitness function split into a cacheable part and a random factor.
+
+    `evaluate` must depend only on the config. `noise`, if set, is drawn
+    afresh on every evaluation and multiplies the cached value, so noisy
+    fitness functions still benefit from memoization.
+    """
+    id: str
+    evaluate: Callable[[AgentConfig], float]
+    noise: Optional[Callable[[], float]] = None
+
+class FitnessCache:
+    """LRU memo of fitness values keyed by (function id, quantized config).
+
+    Configs are quantized to multiples of `quantum` so values that differ
+    only by float noise share an entry. Elites carried over unchanged and
+    children whose mutations did not fire are then scored only once.
+    """
+
+    def __init__(self, max_entries: int = 1_000_000, quantum: float = 1e-9):
+        self.max_entries = max_entries
+        self.quantum = quantum
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: "OrderedDict[Tuple[str, Hashable], float]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def key(self, config: AgentConfig) -> Tuple[int, ...]:
+        return tuple(round(getattr(config, name) / self.quantum) for name in CONFIG_FIELDS)
+
+    def score(self, config: AgentConfig, function: FitnessFunction) -> float:
+        """Fitness of a config, evaluating `function` only on a cache miss"""
+        key = (function.id, self.key(config))
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+        if value is None:
+            value = function.evaluate(config)
+            with self._lock:
+                self.misses += 1
+                self._entries[key] = value
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                    self.evictions += 1
+        return value * function.noise() if function.noise else value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, float]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0
+        }
@@ -0,0 +1,279 @@
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+import itertools
+import random
+from .models import Squad
+
+class _Node:
+    """Treap node ordered by (-fitness, sequence)"""
+    __slots__ = ("key", "squad", "priority", "size", "left", "right")
+
+    def __init__(self, key: Tuple[float, int], squad: Squad, priority: float):
+        self.key = key
+        self.squad = squad
+        self.priority = priority
+        self.size = 1
+        self.left: Optional['_Node'] = None
+        self.right: Optional['_Node'] = None
+
+def _size(node: Optional[_Node]) -> int:
+    return node.size if node else 0
+
+def _refresh(node: _Node) -> _Node:
+    node.size = 1 + _size(node.left) + _size(node.right)
+    return node
+
+def _split(node: Optional[_Node], key: Tuple[float, int]) -> Tuple[Optional[_Node], Optional[_Node]]:
+    """Split into nodes with keys < key and nodes with keys >= key"""
+    if node is None:
+        return None, None
+    if node.key < key:
+        node.right, right = _split(node.right, key)
+        return _refresh(node), right
+    left, node.left = _split(node.left, key)
+    return left, _refresh(node)
+
+def _split_at(node: Optional[_Node], count: int) -> Tuple[Optional[_Node], Optional[_Node]]:
+    """Split into the first `count` nodes and the rest"""
+    if node is None:
+        return None, None
+    if _size(node.left) < count:
+        node.right, right = _split_at(node.right, count - _size(node.left) - 1)
+        return _refresh(node), right
+    left, node.left = _split_at(node.left, count)
+    return left, _refresh(node)
+
+def _merge(left: Optional[_Node], right: Optional[_Node]) -> Optional[_Node]:
+    if left is None:
+        return right
+    if right is None:
+        return left
+    if left.priority > right.priority:
+        left.right = _merge(left.right, right)
+        return _refresh(left)
+    right.left = _merge(left, right.left)
+    return _refresh(right)
+
+def _walk(node: Optional[_Node]) -> Iterator[_Node]:
+    """In-order traversal without recursion"""
+    stack: List[_Node] = []
+    while stack or node:
+        while node:
+            stack.append(node)
+            node = node.left
+        node = stack.pop()
+        yield node
+        node = node.right
+
+class FitnessIndex:
+    """Order-statistics index over squad fitness scores.
+
+    Squads are kept in a size-augmented treap ordered by descending fitness,
+    so best, rank, percentile and select queries are O(log n) and top-k is
+    O(log n + k). Tracked squads notify the index whenever their
+    `fitness_score` is assigned, so the index never needs a full re-sort.
+    Ties keep the order in which squads were first scored.
+    """
+
+    def __init__(self, squads: Iterable[Squad] = ()):
+        self._root: Optional[_Node] = None
+        self._keys: Dict[str, Tuple[float, int]] = {}
+        self._squads: Dict[str, Squad] = {}
+        self._sequence = itertools.count()
+        self._random = random.Random()
+        self.version = 0
+        self.rebuild(squads)
+
+    def __len__(self) -> int:
+        return _size(self._root)
+
+    def __contains__(self, squad_id: str) -> bool:
+        return squad_id in self._keys
+
+    def __iter__(self) -> Iterator[Squad]:
+        return (node.squad for node in _walk(self._root))
+
+    def rebuild(self, squads: Iterable[Squad]):
+        """Replace the indexed squads, building the treap in O(n log n)"""
+        self.clear()
+        entries = []
+        for squad in squads:
+            if squad.id in self._keys:
+                continue
+            key = (-squad.fitness_score, next(self._sequence))
+            self._keys[squad.id] = key
+            self._squads[squad.id] = squad
+            entries.append((key, squad))
+            self._attach(squad)
+        entries.sort(key=lambda entry: entry[0])
+
+        # Cartesian tree construction over sorted keys: O(n) after the sort
+        spine: List[_Node] = []
+        for key, squad in entries:
+            node = _Node(key, squad, self._random.random())
+            last = None
+            while spine and spine[-1].priority < node.priority:
+                last = spine.pop()
+            node.left = last
+            if spine:
+                spine[-1].right = node
+            spine.append(node)
+        self._root = spine[0] if spine else None
+        self._resize(self._root)
+
+    def clear(self):
+        """Stop tracking every squad"""
+        for squad in self._squads.values():
+            self._detach(squad)
+        self._root = None
+        self._keys.clear()
+        self._squads.clear()
+        self.version += 1
+
+    def update(self, squad: Squad):
+        """Insert a squad or move it to the position of its current fitness"""
+        key = self._keys.get(squad.id)
+        current = self._squads.get(squad.id)
+        if key is not None:
+            if key[0] == -squad.fitness_score and current is squad:
+                return
+            self._remove_key(key)
+        if current is not squad:
+            if current is not None:
+                self._detach(current)
+            self._attach(squad)
+        key = (-squad.fitness_score, key[1] if key else next(self._sequence))
+        self._keys[squad.id] = key
+        self._squads[squad.id] = squad
+        left, right = _split(self._root, key)
+        node = _Node(key, squad, self._random.random())
+        self._root = _merge(_merge(left, node), right)
+        self.version += 1
+
+    def assign(self, squads: Sequence[Squad], scores: Iterable[float]):
+        """Set many fitness scores at once, indexing any squads not yet tracked.
+
+        Large batches skip the per-squad treap updates and rebuild the index
+        once instead, which is O(n log n) rather than O(k log n) with a much
+        larger constant. Squads also tracked by other indexes still notify them.
+        """
+        if len(squads) * 8 < len(self):
+            for squad, score in zip(squads, scores):
+                squad.fitness_score = float(score)
+                if self._squads.get(squad.id) is not squad:
+                    self.update(squad)
+            return
+        indexed = dict(self._squads)
+        for squad, score in zip(squads, scores):
+            if squad.__dict__.get("_fitness_observers") == [self]:
+                object.__setattr__(squad, "fitness_score", float(score))
+            else:
+                squad.fitness_score = float(score)
+            indexed[squad.id] = squad
+        self.rebuild(list(indexed.values()))
+
+    def remove(self, squad_id: str) -> Optional[Squad]:
+        """Stop tracking a squad, returning it if it was indexed"""
+        key = self._keys.pop(squad_id, None)
+        if key is None:
+            return None
+        squad = self._squads.pop(squad_id)
+        self._remove_key(key)
+        self._detach(squad)
+        self.version += 1
+        return squad
+
+    def truncate(self, count: int) -> List[Squad]:
+        """Keep only the `count` best squads and return the removed ones"""
+        self._root, dropped = _split_at(self._root, max(0, count))
+        removed = [node.squad for node in _walk(dropped)]
+        for squad in removed:
+            del self._keys[squad.id]
+            del self._squads[squad.id]
+            self._detach(squad)
+        if removed:
+            self.version += 1
+        return removed
+
+    def best(self) -> Optional[Squad]:
+        """Squad with the highest fitness"""
+        node = self._root
+        if node is None:
+            return None
+        while node.left:
+            node = node.left
+        return node.squad
+
+    def top(self, k: int) -> List[Squad]:
+        """The k best squads in descending fitness order"""
+        return [squad for squad in itertools.islice(self, max(0, k))]
+
+    def select(self, rank: int) -> Optional[Squad]:
+        """Squad at a 1-based rank"""
+        if not 1 <= rank <= len(self):
+            return None
+        node = self._root
+        while node:
+            left_size = _size(node.left)
+            if rank <= left_size:
+                node = node.left
+            elif rank == left_size + 1:
+                return node.squad
+            else:
+                rank -= left_size + 1
+                node = node.right
+        return None
+
+    def rank(self, squad_id: str) -> Optional[int]:
+        """1-based rank of a squad, 1 being the fittest"""
+        key = self._keys.get(squad_id)
+        if key is None:
+            return None
+        rank = 0
+        node = self._root
+        while node:
+            if key < node.key:
+                node = node.left
+            else:
+                rank += _size(node.left) + 1
+                if key == node.key:
+                    return rank
+                node = node.right
+        return None
+
+    def percentile(self, squad_id: str) -> Optional[float]:
+        """Share of the indexed squads (0-100) this squad ranks level with or above"""
+        rank = self.rank(squad_id)
+        if rank is None:
+            return None
+        total = len(self)
+        return 100.0 * (total - rank + 1) / total
+
+    def _remove_key(self, key: Tuple[float, int]):
+        left, rest = _split(self._root, key)
+        _, right = _split_at(rest, 1)
+        self._root = _merge(left, right)
+
+    def _attach(self, squad: Squad):
+        observers = squad.__dict__.setdefault("_fitness_observers", [])
+        if self not in observers:
+            observers.append(self)
+
+    def _detach(self, squad: Squad):
+        observers = squad.__dict__.get("_fitness_observers")
+        if observers and self in observers:
+            observers.remove(self)
+
+    @staticmethod
+    def _resize(root: Optional[_Node]):
+        """Recompute subtree sizes bottom-up after a bulk build"""
+        order: List[_Node] = []
+        stack = [root] if root else []
+        while stack:
+            node = stack.pop()
+            order.append(node)
+            if node.left:
+                stack.append(node.left)
+            if node.right:
+                stack.append(node.right)
+        for node in reversed(order):
+            _refresh(node)
@@ -0,0 +1,211 @@
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+import numpy as np
+from .models import Agent
+from .organization import Department
+
+ROOT = -1
+
+def _layout(parent: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray, int]:
+    """CSR children plus preorder positions of a parent array.
+
+    Returns (offsets, children, tin, size, depth, reached). Children of node
+    i are children[offsets[i]:offsets[i + 1]]; the subtree of i occupies
+    preorder positions [tin[i], tin[i] + size[i]). The tree is expanded one
+    level at a time with array operations, so the cost is O(n) numpy work
+    plus O(depth) Python steps. Nodes on a cycle are never reached.
+    """
+    n = len(parent)
+    has_parent = parent != ROOT
+    counts = np.bincount(parent[has_parent], minlength=n)
+    offsets = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(counts, out=offsets[1:])
+    by_parent = np.argsort(parent, kind="stable")
+    children = by_parent[np.count_nonzero(~has_parent):]
+    
+    roots = np.flatnonzero(~has_parent)
+    levels: List[Tuple[np.ndarray, np.ndarray]] = []
+    frontier = roots
+    while len(frontier):
+        child_counts = counts[frontier]
+        levels.append((frontier, child_counts))
+        total = int(child_counts.sum())
+        if total == 0:
+            break
+        # Concatenated CSR ranges of every frontier node
+        firsts = np.cumsum(child_counts) - child_counts
+        frontier = children[np.repeat(offsets[frontier] - firsts, child_counts) + np.arange(total)]
+    
+    size = np.ones(n, dtype=np.int64)
+    for nodes, _ in reversed(levels[1:]):
+        np.add.at(size, parent[nodes], size[nodes])
+    
+    tin = np.zeros(n, dtype=np.int64)
+    depth = np.full(n, -1, dtype=np.int64)
+    if levels:
+        tin[roots] = np.cumsum(size[roots]) - size[roots]
+        depth[roots] = 0
+    for level, ((nodes, child_counts), (below, _)) in enumerate(zip(levels, levels[1:]), 1):
+        # Siblings are contiguous, so each child starts after its elder siblings' subtrees
+        before = np.cumsum(size[below]) - size[below]
+        firsts = (np.cumsum(child_counts) - child_counts)[child_counts > 0]
+        base = np.repeat(before[firsts], child_counts[child_counts > 0])
+        tin[below] = tin[parent[below]] + 1 + before - base
+        depth[below] = level
+    reached = sum(len(nodes) for nodes, _ in levels)
+    return offsets, children, tin, size, depth, reached
+
+class ReportingGraph:
+    """Supervisor/subordinate lines of an organization as integer arrays.
+
+    Agents are numbered 0..n-1. `parent` holds each agent's supervisor
+    (ROOT for the top of a chain) and direct reports are stored in CSR form
+    (`offsets`, `children`). Preorder positions make every subtree one
+    contiguous range of `order`, so "does X report to Y" and subtree sizes
+    are O(1), descendants are a slice, and the management chain is
+    O(depth). Reorganizations rebuild the arrays in one vectorized pass and
+    are rejected if they would create a cycle.
+    """
+
+    def __init__(self, ids: Sequence[str], parent: np.ndarray,
+                 agents: Optional[Sequence[Agent]] = None):
+        self.ids: List[str] = list(ids)
+        self._index: Dict[str, int] = {agent_id: i for i, agent_id in enumerate(self.ids)}
+        if len(self._index) != len(self.ids):
+            raise ValueError("Agent ids must be unique")
+        # Agents to keep in sync with reorganizations, if built from them
+        self.agents = list(agents) if agents is not None else None
+        self._build(np.asarray(parent, dtype=np.int64))
+
+    @classmethod
+    def from_agents(cls, agents: Iterable[Agent]) -> "ReportingGraph":
+        """Graph of `supervisor_id` links; supervisors outside the set count as none"""
+        agents = list(agents)
+        index = {agent.id: i for i, agent in enumerate(agents)}
+        parent = np.fromiter(
+            (index.get(agent.supervisor_id, ROOT) for agent in agents),
+            dtype=np.int64, count=len(agents)
+        )
+        return cls([agent.id for agent in agents], parent, agents)
+
+    @classmethod
+    def from_department(cls, department: Department) -> "ReportingGraph":
+        """Graph of every leader and squad member of a department"""
+        # Leaders may also be squad members; keep each agent once
+        agents: Dict[str, Agent] = {}
+        if department.leader:
+            agents[department.leader.id] = department.leader
+        for division in department.divisions:
+            if division.leader:
+                agents.setdefault(division.leader.id, division.leader)
+            for squad in division.squads:
+                for agent in squad.agents:
+                    agents.setdefault(agent.id, agent)
+        return cls.from_agents(agents.values())
+
+    def _build(self, parent: np.ndarray):
+        if len(parent) != len(self.ids):
+            raise ValueError("Need one supervisor entry per agent")
+        offsets, children, tin, size, depth, reached = _layout(parent)
+        if reached < len(parent):
+            raise ValueError(f"Reporting lines contain a cycle: {' -> '.join(self._cycle(parent, depth))}")
+        self.parent = parent
+        self.offsets = offsets
+        self.children = children
+        self.tin = tin
+        self.size = size
+        self.depth_of = depth
+        self.order = np.empty_like(tin)
+        self.order[tin] = np.arange(len(tin))
+
+    def _cycle(self, parent: np.ndarray, depth: np.ndarray) -> List[str]:
+        """Ids along one cycle among the unreached nodes"""
+        node = int(np.flatnonzero(depth < 0)[0])
+        seen: Dict[int, int] = {}
+        path: List[int] = []
+        while node not in seen:
+            seen[node] = len(path)
+            path.append(node)
+            node = int(parent[node])
+        cycle = path[seen[node]:] + [node]
+        return [self.ids[i] for i in cycle]
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __contains__(self, agent_id: str) -> bool:
+        return agent_id in self._index
+
+    def index(self, agent_id: str) -> int:
+        try:
+            return self._index[agent_id]
+        except KeyError:
+            raise KeyError(f"Unknown agent: {agent_id}") from None
+
+    def supervisor(self, agent_id: str) -> Optional[str]:
+        parent = int(self.parent[self.index(agent_id)])
+        return self.ids[parent] if parent != ROOT else None
+
+    def direct_reports(self, agent_id: str) -> List[str]:
+        i = self.index(agent_id)
+        return [self.ids[j] for j in self.children[self.offsets[i]:self.offsets[i + 1]]]
+
+    def span_of_control(self, agent_id: str) -> int:
+        """Number of direct reports"""
+        i = self.index(agent_id)
+        return int(self.offsets[i + 1] - self.offsets[i])
+
+    def headcount(self, agent_id: str) -> int:
+        """Number of people reporting to the agent, directly or not"""
+        return int(self.size[self.index(agent_id)]) - 1
+
+    def depth(self, agent_id: str) -> int:
+        """Levels of management above the agent"""
+        return int(self.depth_of[self.index(agent_id)])
+
+    def chain_of_command(self, agent_id: str) -> List[str]:
+        """Supervisors from the agent's manager up to the top of the chain"""
+        chain = []
+        node = int(self.parent[self.index(agent_id)])
+        while node != ROOT:
+            chain.append(self.ids[node])
+            node = int(self.parent[node])
+        return chain
+
+    def descendant_indices(self, agent_id: str) -> np.ndarray:
+        """Indices of everyone under the agent, in preorder (a view, no copy)"""
+        i = self.index(agent_id)
+        return self.order[self.tin[i] + 1:self.tin[i] + self.size[i]]
+
+    def descendants(self, agent_id: str) -> List[str]:
+        return [self.ids[j] for j in self.descendant_indices(agent_id)]
+
+    def reports_to(self, agent_id: str, manager_id: str) -> bool:
+        """Whether the agent is anywhere under the manager"""
+        i, m = self.index(agent_id), self.index(manager_id)
+        return bool(self.tin[m] < self.tin[i] < self.tin[m] + self.size[m])
+
+    def reassign(self, moves: Dict[str, Optional[str]]):
+        """Move agents, with their whole subtrees, under new supervisors.
+
+        All moves are applied together and the graph is rebuilt once. A
+        batch that would make anyone their own indirect supervisor raises
+        ValueError and leaves the graph unchanged.
+        """
+        parent = self.parent.copy()
+        for agent_id, supervisor_id in moves.items():
+            parent[self.index(agent_id)] = ROOT if supervisor_id is None else self.index(supervisor_id)
+        old_parent = self.parent
+        self._build(parent)
+        if self.agents is not None:
+            self._sync(np.flatnonzero(parent != old_parent), old_parent)
+
+    def _sync(self, moved: np.ndarray, old_parent: np.ndarray):
+        """Mirror moved reporting lines onto the Agent objects"""
+        for i in moved:
+            agent = self.agents[i]
+            old, new = int(old_parent[i]), int(self.parent[i])
+            if old != ROOT and agent.id in self.agents[old].subordinate_ids:
+                self.agents[old].subordinate_ids.remove(agent.id)
+            if new != ROOT:
+                self.agents[new].subordinate_ids.append(agent.id)
+            agent.supervisor_id = self.ids[new] if new != ROOT else None
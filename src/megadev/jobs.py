@@ -0,0 +1,155 @@
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+import asyncio
+import threading
+import time
+import uuid
+
+ProgressReporter = Callable[..., None]
+
+class JobCancelled(Exception):
+    """Raised inside a job's worker when the job has been cancelled"""
+
+@dataclass
+class Job:
+    """A unit of background work tracked by the JobManager"""
+    kind: str
+    # Who submitted the job, e.g. a session name
+    owner: Optional[str] = None
+    id: str = field(default_factory=lambda: str(uuid.uuid4()))
+    status: str = "pending"  # pending, running, completed, failed, cancelled
+    progress: int = 0
+    total: Optional[int] = None
+    result: Any = None
+    error: Optional[str] = None
+    updates: List[Any] = field(default_factory=list)
+    created_at: datetime = field(default_factory=datetime.now)
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    cancel_event: threading.Event = field(default_factory=threading.Event, repr=False, compare=False)
+    future: Optional[asyncio.Future] = field(default=None, repr=False, compare=False)
+
+    @property
+    def done(self) -> bool:
+        return self.status in ("completed", "failed", "cancelled")
+
+    def to_dict(self, since: int = 0) -> Dict[str, Any]:
+        """Job summary including the updates published from index `since` on"""
+        return {
+            "job_id": self.id,
+            "kind": self.kind,
+            "owner": self.owner,
+            "status": self.status,
+            "progress": self.progress,
+            "total": self.total,
+            "result": self.result,
+            "error": self.error,
+            "updates": self.updates[since:],
+            "update_count": len(self.updates),
+            "created_at": self.created_at.isoformat(),
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None
+        }
+
+class JobManager:
+    """Runs blocking work on an executor so the event loop stays responsive.
+
+    Work functions receive a `report(progress, total, update)` callable.
+    Calling it records progress, appends `update` (if given) to the job's
+    update stream, forwards throttled progress to the job's progress callback
+    and raises JobCancelled once the job has been cancelled, which makes
+    every progress report a cancellation point.
+    """
+
+    def __init__(self, max_workers: int = 1, max_finished: int = 100,
+                 notify_interval: float = 0.25):
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="megadev-job")
+        self.max_finished = max_finished
+        self.notify_interval = notify_interval
+        self.jobs: Dict[str, Job] = {}
+
+    def submit(self, kind: str, work: Callable[[ProgressReporter], Any],
+               on_progress: Optional[Callable[[Job], None]] = None,
+               owner: Optional[str] = None) -> Job:
+        """Schedule work on the executor; must be called from the event loop"""
+        loop = asyncio.get_running_loop()
+        job = Job(kind=kind, owner=owner)
+        self.jobs[job.id] = job
+        self._prune()
+
+        last_notified = [0.0]
+
+        def report(progress: int, total: Optional[int] = None, update: Any = None):
+            if job.cancel_event.is_set():
+                raise JobCancelled(job.id)
+            job.progress = progress
+            if total is not None:
+                job.total = total
+            if update is not None:
+                job.updates.append(update)
+            now = time.monotonic()
+            finished = job.total is not None and progress >= job.total
+            if on_progress and (finished or update is not None
+                                or now - last_notified[0] >= self.notify_interval):
+                last_notified[0] = now
+                loop.call_soon_threadsafe(on_progress, job)
+
+        def run():
+            if job.cancel_event.is_set():
+                raise JobCancelled(job.id)
+            job.status = "running"
+            job.started_at = datetime.now()
+            return work(report)
+
+        job.future = loop.run_in_executor(self.executor, run)
+        job.future.add_done_callback(lambda future: self._finish(job, future))
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self.jobs.get(job_id)
+
+    async def wait(self, job_id: str) -> Job:
+        """Wait for a job to finish without propagating its error"""
+        job = self.jobs[job_id]
+        if job.future is not None:
+            await asyncio.wait([job.future])
+        return job
+
+    def cancel(self, job_id: str) -> bool:
+        """Request cancellation; running jobs stop at their next progress report"""
+        job = self.jobs.get(job_id)
+        if job is None or job.done:
+            return False
+        job.cancel_event.set()
+        return True
+
+    def list(self) -> List[Job]:
+        return list(self.jobs.values())
+
+    def shutdown(self):
+        for job in self.jobs.values():
+            job.cancel_event.set()
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    def _finish(self, job: Job, future: asyncio.Future):
+        job.finished_at = datetime.now()
+        if future.cancelled():
+            job.status = "cancelled"
+            return
+        error = future.exception()
+        if isinstance(error, JobCancelled):
+            job.status = "cancelled"
+        elif error is not None:
+            job.status = "failed"
+            job.error = str(error)
+        else:
+            job.status = "completed"
+            job.result = future.result()
+
+    def _prune(self):
+        """Forget the oldest finished jobs beyond max_finished"""
+        finished = [job for job in self.jobs.values() if job.done]
+        for job in finished[:max(0, len(finished) - self.max_finished)]:
+            del self.jobs[job.id]
@@ -7,6 +7,12 @@ from faker import Faker
 
 fake = Faker()
 
+def random_id(rng: Optional[random.Random] = None) -> str:
+    """A version 4 UUID string, reproducible when drawn from a seeded `rng`"""
+    if rng is None:
+        return str(uuid.uuid4())
+    return str(uuid.UUID(int=rng.getrandbits(128), version=4))
+
 @dataclass
 class HumanNeeds:
     """Physical and psychological needs of an agent"""
@@ -29,6 +35,15 @@ class HumanNeeds:
             setattr(self, attr, min(100.0, max(0.0, getattr(self, attr))))
         self.energy = min(100.0, max(0.0, self.energy))
 
+# Choices for randomly generated backgrounds
+EDUCATION_LEVELS = ['High School', "Bachelor's", "Master's", 'PhD']
+SKILLS = ['Writing', 'Analysis', 'Research', 'Communication', 'Leadership', 
+          'Problem Solving', 'Critical Thinking', 'Time Management']
+TRAITS = ['Introvert', 'Extrovert', 'Detail-oriented', 'Creative', 
+          'Analytical', 'Collaborative', 'Independent', 'Ambitious']
+LIFE_EVENTS = ['Career Change', 'Relocation', 'Major Project Success', 
+               'Industry Award', 'Professional Development']
+
 @dataclass
 class Background:
     """Agent's simulated life experience"""
@@ -39,22 +54,15 @@ class Background:
     life_events: List[str]
     
     @classmethod
-    def generate_random(cls) -> 'Background':
-        """Generate a random background"""
-        education_levels = ['High School', "Bachelor's", "Master's", 'PhD']
-        skills = ['Writing', 'Analysis', 'Research', 'Communication', 'Leadership', 
-                 'Problem Solving', 'Critical Thinking', 'Time Management']
-        traits = ['Introvert', 'Extrovert', 'Detail-oriented', 'Creative', 
-                 'Analytical', 'Collaborative', 'Independent', 'Ambitious']
-        events = ['Career Change', 'Relocation', 'Major Project Success', 
-                 'Industry Award', 'Professional Development']
-        
+    def generate_random(cls, rng: Optional[random.Random] = None) -> 'Background':
+        """Generate a random background, drawing from `rng` if given"""
+        rng = rng or random
         return cls(
-            education=random.choice(education_levels),
-            years_experience=random.randint(1, 30),
-            skills=random.sample(skills, random.randint(2, 5)),
-            personality_traits=random.sample(traits, random.randint(2, 4)),
-            life_events=random.sample(events, random.randint(1, 3))
+            education=rng.choice(EDUCATION_LEVELS),
+            years_experience=rng.randint(1, 30),
+            skills=rng.sample(SKILLS, rng.randint(2, 5)),
+            personality_traits=rng.sample(TRAITS, rng.randint(2, 4)),
+            life_events=rng.sample(LIFE_EVENTS, rng.randint(1, 3))
         )
 
 @dataclass
@@ -85,25 +93,30 @@ class Agent:
     subordinate_ids: List[str] = field(default_factory=list)
     
     @classmethod
-    def create_random(cls, name: str) -> 'Agent':
-        """Create an agent with randomized parameters"""
-        import random
+    def create_random(cls, name: str, rng: Optional[random.Random] = None) -> 'Agent':
+        """Create an agent with randomized parameters.
+
+        With `rng`, every draw including the id comes from it, so a seeded
+        generator recreates the same agent.
+        """
+        source = rng or random
         
         config = AgentConfig(
-            learning_rate=random.uniform(0.1, 1.0),
-            attention_span=random.randint(1, 10),
-            memory_capacity=random.randint(1, 100),
-            creativity_factor=random.uniform(0.1, 1.0),
-            risk_tolerance=random.uniform(0.1, 1.0),
-            cooperation_bias=random.uniform(0.1, 1.0),
-            energy_efficiency=random.uniform(0.1, 1.0),
-            adaptation_speed=random.uniform(0.1, 1.0)
+            learning_rate=source.uniform(0.1, 1.0),
+            attention_span=source.randint(1, 10),
+            memory_capacity=source.randint(1, 100),
+            creativity_factor=source.uniform(0.1, 1.0),
+            risk_tolerance=source.uniform(0.1, 1.0),
+            cooperation_bias=source.uniform(0.1, 1.0),
+            energy_efficiency=source.uniform(0.1, 1.0),
+            adaptation_speed=source.uniform(0.1, 1.0)
         )
         
         return cls(
-            id=str(uuid.uuid4()),
+            id=random_id(rng),
             name=name,
-            config=config
+            config=config,
+            background=Background.generate_random(rng)
         )
 
 @dataclass
@@ -116,16 +129,30 @@ class Squad:
     generation: int = 0
     created_at: datetime = datetime.now()
     
+    def __setattr__(self, name, value):
+        object.__setattr__(self, name, value)
+        if name == "fitness_score":
+            # Keep any FitnessIndex tracking this squad in sync
+            for index in self.__dict__.get("_fitness_observers", ()):
+                index.update(self)
+    
+    def __getstate__(self):
+        # Copies and pickles must not drag the tracking indexes along
+        state = dict(self.__dict__)
+        state.pop("_fitness_observers", None)
+        return state
+    
     @classmethod
-    def create_random(cls, name: str, size: int = 5) -> 'Squad':
+    def create_random(cls, name: str, size: int = 5,
+                      rng: Optional[random.Random] = None) -> 'Squad':
         """Create a squad with random agents"""
         agents = [
-            Agent.create_random(f"{name}-Agent-{i}") 
+            Agent.create_random(f"{name}-Agent-{i}", rng=rng) 
             for i in range(size)
         ]
         
         return cls(
-            id=str(uuid.uuid4()),
+            id=random_id(rng),
             name=name,
             agents=agents
         ) 
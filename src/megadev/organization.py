@@ -1,31 +1,194 @@
 from dataclasses import dataclass, field
-from typing import List, Optional
+from typing import Dict, Iterable, List, Optional, Tuple
 from datetime import datetime
 import uuid
 from .models import Agent, Squad
 
+class _Registered:
+    """Back-reference from a unit to the registry that counts it.
+
+    Kept out of the dataclass fields and dropped when pickling or copying,
+    so serializing one unit never drags the whole organization along.
+    """
+    registry: "Optional[OrganizationRegistry]"
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state.pop("registry", None)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.registry = None
+
 @dataclass
-class Division:
+class Division(_Registered):
     """A division of 10,000 employees"""
-    id: str = field(default_factory=lambda: str(uuid.uuid4()))
     name: str
+    id: str = field(default_factory=lambda: str(uuid.uuid4()))
     squads: List[Squad] = field(default_factory=list)
     leader: Optional[Agent] = None
     created_at: datetime = field(default_factory=datetime.now)
     
+    def __post_init__(self):
+        # Keeps the headcount once the division is registered
+        self.registry = None
+    
     @property
     def size(self) -> int:
+        if self.registry is not None:
+            return self.registry.size(self.id)
         return sum(len(squad.agents) for squad in self.squads)
 
 @dataclass
-class Department:
+class Department(_Registered):
     """A department of 100,000 employees"""
-    id: str = field(default_factory=lambda: str(uuid.uuid4()))
     name: str
+    id: str = field(default_factory=lambda: str(uuid.uuid4()))
     divisions: List[Division] = field(default_factory=list)
     leader: Optional[Agent] = None
     created_at: datetime = field(default_factory=datetime.now)
     
+    def __post_init__(self):
+        self.registry = None
+    
     @property
     def size(self) -> int:
+        if self.registry is not None:
+            return self.registry.size(self.id)
         return sum(division.size for division in self.divisions)
+
+@dataclass(frozen=True)
+class Placement:
+    """Where an agent sits in the organization"""
+    department: Department
+    division: Division
+    squad: Squad
+    agent: Agent
+
+class OrganizationRegistry:
+    """Id indexes and running headcounts over a set of departments.
+
+    Every department, division, squad and agent is indexed by id, and the
+    headcount of each unit is adjusted as squads and agents come and go, so
+    sizes, lookups and membership tests are O(1) instead of walking the
+    tree. Registered units must be changed through the registry (not by
+    editing their lists directly) for the counts to stay correct.
+    """
+
+    def __init__(self, departments: Iterable[Department] = ()):
+        self._departments: Dict[str, Department] = {}
+        self._divisions: Dict[str, Tuple[Department, Division]] = {}
+        self._squads: Dict[str, Tuple[Department, Division, Squad]] = {}
+        self._agents: Dict[str, Placement] = {}
+        # Headcount by department, division and squad id
+        self._sizes: Dict[str, int] = {}
+        for department in departments:
+            self.add_department(department)
+
+    def __len__(self) -> int:
+        """Total headcount"""
+        return len(self._agents)
+
+    def __contains__(self, unit_id: str) -> bool:
+        return unit_id in self._sizes or unit_id in self._agents
+
+    @property
+    def departments(self) -> List[Department]:
+        return list(self._departments.values())
+
+    def size(self, unit_id: str) -> int:
+        """Headcount of a department, division or squad"""
+        try:
+            return self._sizes[unit_id]
+        except KeyError:
+            raise KeyError(f"Unknown unit: {unit_id}") from None
+
+    def add_department(self, department: Department):
+        """Register a department with everything already in it"""
+        self._claim(department.id)
+        self._departments[department.id] = department
+        self._sizes[department.id] = 0
+        department.registry = self
+        divisions, department.divisions = department.divisions, []
+        for division in divisions:
+            self.add_division(department, division)
+
+    def add_division(self, department: Department, division: Division):
+        if department.id not in self._departments:
+            raise KeyError(f"Unknown unit: {department.id}")
+        self._claim(division.id)
+        department.divisions.append(division)
+        self._divisions[division.id] = (department, division)
+        self._sizes[division.id] = 0
+        division.registry = self
+        squads, division.squads = division.squads, []
+        for squad in squads:
+            self.add_squad(division, squad)
+
+    def add_squad(self, division: Division, squad: Squad):
+        department, _ = self._divisions[division.id]
+        self._claim(squad.id)
+        for agent in squad.agents:
+            if agent.id in self._agents:
+                raise ValueError(f"Agent already registered: {agent.id}")
+        division.squads.append(squad)
+        self._squads[squad.id] = (department, division, squad)
+        self._sizes[squad.id] = 0
+        for agent in squad.agents:
+            self._agents[agent.id] = Placement(department, division, squad, agent)
+        self._count(department, division, squad, len(squad.agents))
+
+    def remove_squad(self, squad_id: str) -> Squad:
+        """Unregister a squad and its agents; O(squads in its division)"""
+        department, division, squad = self._squads.pop(squad_id)
+        division.squads.remove(squad)
+        for agent in squad.agents:
+            del self._agents[agent.id]
+        self._count(department, division, squad, -len(squad.agents))
+        del self._sizes[squad_id]
+        return squad
+
+    def add_agent(self, squad_id: str, agent: Agent):
+        department, division, squad = self._squads[squad_id]
+        if agent.id in self._agents:
+            raise ValueError(f"Agent already registered: {agent.id}")
+        squad.agents.append(agent)
+        self._agents[agent.id] = Placement(department, division, squad, agent)
+        self._count(department, division, squad, 1)
+
+    def remove_agent(self, agent_id: str) -> Agent:
+        placement = self._agents.pop(agent_id)
+        placement.squad.agents.remove(placement.agent)
+        self._count(placement.department, placement.division, placement.squad, -1)
+        return placement.agent
+
+    def locate(self, agent_id: str) -> Optional[Placement]:
+        """Department, division and squad of an agent"""
+        return self._agents.get(agent_id)
+
+    def agent(self, agent_id: str) -> Optional[Agent]:
+        placement = self._agents.get(agent_id)
+        return placement.agent if placement else None
+
+    def department(self, department_id: str) -> Optional[Department]:
+        return self._departments.get(department_id)
+
+    def squad(self, squad_id: str) -> Optional[Squad]:
+        entry = self._squads.get(squad_id)
+        return entry[2] if entry else None
+
+    def supervisor(self, agent_id: str) -> Optional[Agent]:
+        agent = self.agent(agent_id)
+        if agent is None or agent.supervisor_id is None:
+            return None
+        return self.agent(agent.supervisor_id)
+
+    def _claim(self, unit_id: str):
+        if unit_id in self._sizes:
+            raise ValueError(f"Unit already registered: {unit_id}")
+
+    def _count(self, department: Department, division: Division, squad: Squad, delta: int):
+        self._sizes[squad.id] += delta
+        self._sizes[division.id] += delta
+        self._sizes[department.id] += delta
@@ -0,0 +1,104 @@
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+from typing import Callable, Dict, List, Optional, Tuple
+import numpy as np
+from .scoring import ConfigMatrix, challenge_scores, top_k_slots
+
+# (shared memory name, shape, dtype) of the values, starts and counts arrays
+SharedSpec = Tuple[Tuple[str, Tuple[int, ...], str], ...]
+
+# Per-worker attachments, so each process maps a matrix only once
+_attached: Dict[SharedSpec, Tuple[List[shared_memory.SharedMemory], ConfigMatrix]] = {}
+
+class SharedConfigMatrix:
+    """A ConfigMatrix copied into shared memory for worker processes.
+
+    The parent owns the segments and must call `close()` to release them;
+    workers attach read-only views by name through `spec`.
+    """
+
+    def __init__(self, matrix: ConfigMatrix):
+        self._segments: List[shared_memory.SharedMemory] = []
+        spec = []
+        for array in (matrix.values, matrix.starts, matrix.counts):
+            segment = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+            np.ndarray(array.shape, dtype=array.dtype, buffer=segment.buf)[...] = array
+            self._segments.append(segment)
+            spec.append((segment.name, array.shape, array.dtype.str))
+        self.spec: SharedSpec = tuple(spec)
+
+    def close(self):
+        for segment in self._segments:
+            segment.close()
+            segment.unlink()
+        self._segments = []
+
+def _attach(spec: SharedSpec) -> ConfigMatrix:
+    if spec not in _attached:
+        segments = [shared_memory.SharedMemory(name=name) for name, _, _ in spec]
+        arrays = [
+            np.ndarray(shape, dtype=np.dtype(dtype), buffer=segment.buf)
+            for segment, (_, shape, dtype) in zip(segments, spec)
+        ]
+        _attached[spec] = (segments, ConfigMatrix.from_arrays(*arrays))
+    return _attached[spec][1]
+
+def score_shard(spec: SharedSpec, round_number: int, seed: int, slots: np.ndarray,
+                k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Worker entry point: score one shard of squads and return its top k"""
+    scores = challenge_scores(_attach(spec), round_number, slots=slots, seed=seed)
+    return top_k_slots(slots, scores, k)
+
+class ShardedScorer:
+    """Scores tournament rounds across a process pool.
+
+    Live squad slots are split into one contiguous shard per worker. Each
+    worker scores its shard over the shared config matrix and returns its
+    own top k; the parent merges those into the global top k. Noise depends
+    only on the seed, round and agent row, so the survivors and their
+    scores are identical for any number of workers.
+    """
+
+    def __init__(self, matrix: ConfigMatrix, seed: int, workers: int = 1):
+        self.matrix = matrix
+        self.seed = seed
+        self.workers = max(1, workers)
+        self.shared: Optional[SharedConfigMatrix] = None
+        self.pool: Optional[ProcessPoolExecutor] = None
+        if self.workers > 1:
+            self.shared = SharedConfigMatrix(matrix)
+            self.pool = ProcessPoolExecutor(max_workers=self.workers)
+
+    def top_k(self, round_number: int, slots: np.ndarray, k: int,
+              on_shard: Optional[Callable[[int], None]] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """The k best live squads of a round as (slots, scores), best first.
+
+        `on_shard(squads)` is called as each shard finishes, for progress.
+        """
+        if self.pool is None or len(slots) < self.workers:
+            scores = challenge_scores(self.matrix, round_number, slots=slots, seed=self.seed)
+            if on_shard:
+                on_shard(len(slots))
+            return top_k_slots(slots, scores, k)
+
+        shards = np.array_split(slots, self.workers)
+        futures = {
+            self.pool.submit(score_shard, self.shared.spec, round_number, self.seed, shard, k): len(shard)
+            for shard in shards
+        }
+        results = []
+        for future in as_completed(futures):
+            results.append(future.result())
+            if on_shard:
+                on_shard(futures[future])
+        merged_slots = np.concatenate([shard_slots for shard_slots, _ in results])
+        merged_scores = np.concatenate([shard_scores for _, shard_scores in results])
+        return top_k_slots(merged_slots, merged_scores, k)
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.shutdown()
+            self.pool = None
+        if self.shared is not None:
+            self.shared.close()
+            self.shared = None
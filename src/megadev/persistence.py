@@ -1,10 +1,26 @@
 import json
+import os
+import tempfile
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional, Tuple
 from .models import Agent, Squad, HumanNeeds, Background, AgentConfig
 from .organization import Division, Department
 
+def write_json_atomic(path: Path, data: Any):
+    """Write JSON to a temp file beside path and swap it in, so readers never see a partial file"""
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'w') as f:
+            json.dump(data, f)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
 class SimulationSerializer:
     """Handles serialization of simulation state"""
     
@@ -71,6 +87,26 @@ class SimulationSerializer:
             subordinate_ids=data["subordinate_ids"]
         )
         return agent
+    
+    def serialize_squad(self, squad: Squad) -> Dict[str, Any]:
+        return {
+            "id": squad.id,
+            "name": squad.name,
+            "fitness_score": squad.fitness_score,
+            "generation": squad.generation,
+            "created_at": self.serialize_datetime(squad.created_at),
+            "agents": [self.serialize_agent(agent) for agent in squad.agents]
+        }
+        
+    def deserialize_squad(self, data: Dict[str, Any]) -> Squad:
+        return Squad(
+            id=data["id"],
+            name=data["name"],
+            agents=[self.deserialize_agent(agent) for agent in data["agents"]],
+            fitness_score=data["fitness_score"],
+            generation=data["generation"],
+            created_at=self.deserialize_datetime(data["created_at"])
+        )
 
 class SimulationPersistence:
     """Handles saving and loading simulation state"""
@@ -105,15 +141,7 @@ class SimulationPersistence:
                 }
                 
                 for squad in div.squads:
-                    squad_data = {
-                        "id": squad.id,
-                        "name": squad.name,
-                        "fitness_score": squad.fitness_score,
-                        "generation": squad.generation,
-                        "created_at": self.serializer.serialize_datetime(squad.created_at),
-                        "agents": [self.serializer.serialize_agent(agent) for agent in squad.agents]
-                    }
-                    div_data["squads"].append(squad_data)
+                    div_data["squads"].append(self.serializer.serialize_squad(squad))
                     
                 dept_data["divisions"].append(div_data)
             state["departments"].append(dept_data)
@@ -121,3 +149,34 @@ class SimulationPersistence:
         save_path = self.save_dir / f"simulation_state_{timestamp.strftime('%Y%m%d_%H%M%S')}.json"
         with open(save_path, 'w') as f:
             json.dump(state, f, indent=2)
+            
+    def save_population(self, squads: List[Squad], generation: int,
+                        engine: Optional[Dict[str, Any]] = None) -> Path:
+        """Save an evolution population checkpoint, with the engine's state if given"""
+        self.save_dir.mkdir(parents=True, exist_ok=True)
+        
+        state = {
+            "timestamp": self.serializer.serialize_datetime(datetime.now()),
+            "generation": generation,
+            "squads": [self.serializer.serialize_squad(squad) for squad in squads]
+        }
+        if engine is not None:
+            state["engine"] = engine
+        
+        save_path = self.save_dir / f"population_gen{generation:06d}.json"
+        write_json_atomic(save_path, state)
+        return save_path
+        
+    def load_population(self, path: Path) -> Tuple[int, List[Squad]]:
+        """Load a population checkpoint, returning its generation and squads"""
+        with open(path) as f:
+            state = json.load(f)
+        squads = [self.serializer.deserialize_squad(squad) for squad in state["squads"]]
+        return state["generation"], squads
+        
+    def load_checkpoint(self, path: Path) -> Tuple[int, List[Squad], Optional[Dict[str, Any]]]:
+        """Load a population checkpoint along with the engine state saved with it"""
+        with open(path) as f:
+            state = json.load(f)
+        squads = [self.serializer.deserialize_squad(squad) for squad in state["squads"]]
+        return state["generation"], squads, state.get("engine")
@@ -0,0 +1,134 @@
+from collections.abc import Sequence
+from typing import Dict, Iterable, Iterator, List, Optional, Union
+import numpy as np
+from .fitness_index import FitnessIndex
+from .models import Squad
+
+class Population(Sequence):
+    """Squads of one generation with in-place elimination.
+
+    Squads keep the slot they were added in for the life of the container, so
+    stable indices stay valid across rounds. Eliminating a squad only clears
+    its bit in the live mask; iteration, `len` and item access cover live
+    squads only. Eliminated squads are also dropped from `index` when one is
+    attached, so the ranking and the population never disagree. `version` is
+    bumped on every change for cache invalidation.
+    """
+
+    def __init__(self, squads: Iterable[Squad] = (), index: Optional[FitnessIndex] = None):
+        self._squads: List[Squad] = list(squads)
+        self._live = np.ones(len(self._squads), dtype=bool)
+        self._slots: Dict[str, int] = {squad.id: slot for slot, squad in enumerate(self._squads)}
+        self._live_count = len(self._squads)
+        # Slots of live squads in order; rebuilt lazily after eliminations
+        self._live_slots: Optional[np.ndarray] = None
+        self.index = index
+        self.version = 0
+
+    def __len__(self) -> int:
+        return self._live_count
+
+    def __iter__(self) -> Iterator[Squad]:
+        if self._live_count == len(self._squads):
+            return iter(self._squads)
+        return (self._squads[slot] for slot in self.live_slots())
+
+    def __getitem__(self, item: Union[int, slice]) -> Union[Squad, List[Squad]]:
+        if self._live_count == len(self._squads):
+            return self._squads[item]
+        slots = self.live_slots()[item]
+        if isinstance(item, slice):
+            return [self._squads[slot] for slot in slots]
+        return self._squads[slots]
+
+    def __contains__(self, squad: object) -> bool:
+        key = squad.id if isinstance(squad, Squad) else squad
+        slot = self._slots.get(key)
+        return slot is not None and bool(self._live[slot])
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, (Population, list)):
+            return len(self) == len(other) and all(a is b or a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"Population(live={self._live_count}, slots={len(self._squads)})"
+
+    @property
+    def capacity(self) -> int:
+        """Number of stable slots, live or eliminated"""
+        return len(self._squads)
+
+    def live_slots(self) -> np.ndarray:
+        if self._live_slots is None:
+            self._live_slots = np.flatnonzero(self._live)
+        return self._live_slots
+
+    def slot(self, squad_id: str) -> Optional[int]:
+        """Stable index of a squad, live or eliminated"""
+        return self._slots.get(squad_id)
+
+    def at(self, slot: int) -> Squad:
+        """Squad in a stable slot, whether or not it is still live"""
+        return self._squads[slot]
+
+    def is_live(self, slot: int) -> bool:
+        return bool(self._live[slot])
+
+    def eliminate(self, squads: Iterable[Union[Squad, str]]) -> int:
+        """Mark squads (or squad ids) as eliminated; returns how many were live"""
+        eliminated = 0
+        for squad in squads:
+            key = squad.id if isinstance(squad, Squad) else squad
+            slot = self._slots.get(key)
+            if slot is None or not self._live[slot]:
+                continue
+            self._live[slot] = False
+            eliminated += 1
+            if self.index is not None:
+                self.index.remove(key)
+        if eliminated:
+            self._changed(-eliminated)
+        return eliminated
+
+    def keep_top(self, count: int) -> List[Squad]:
+        """Eliminate all but the `count` fittest live squads, using the attached index"""
+        if self.index is None:
+            raise ValueError("keep_top needs an attached fitness index")
+        dropped = self.index.truncate(count)
+        eliminated = 0
+        for squad in dropped:
+            slot = self._slots.get(squad.id)
+            if slot is not None and self._live[slot]:
+                self._live[slot] = False
+                eliminated += 1
+        if eliminated:
+            self._changed(-eliminated)
+        return dropped
+
+    def retain(self, slots: np.ndarray, scores: Optional[Sequence[float]] = None):
+        """Eliminate every live squad whose slot is not in `slots`, in one pass.
+        
+        With `scores`, the retained squads' fitness is set to them (aligned
+        with `slots`) in the same pass, so the index is rebuilt only once.
+        """
+        keep = np.zeros_like(self._live)
+        keep[slots] = True
+        keep &= self._live
+        eliminated = self._live_count - int(keep.sum())
+        self._live = keep
+        if scores is not None:
+            if self.index is not None:
+                # Untrack first so the assignments don't update the index one by one
+                self.index.clear()
+            for slot, score in zip(slots, scores):
+                self._squads[slot].fitness_score = float(score)
+        if self.index is not None:
+            self.index.rebuild(self._squads[slot] for slot in np.flatnonzero(keep))
+        if eliminated:
+            self._changed(-eliminated)
+
+    def _changed(self, delta: int):
+        self._live_count += delta
+        self._live_slots = None
+        self.version += 1
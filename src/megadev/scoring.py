@@ -0,0 +1,156 @@
+from dataclasses import fields
+from itertools import chain
+from operator import attrgetter
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+import heapq
+import itertools
+import numpy as np
+from .models import AgentConfig, Squad
+
+CONFIG_FIELDS: Tuple[str, ...] = tuple(f.name for f in fields(AgentConfig))
+
+# Attribute weights of each challenge type, selected by round % 3
+CHALLENGE_WEIGHTS: Tuple[Dict[str, float], ...] = (
+    # Algorithm challenges
+    {"learning_rate": 0.4, "memory_capacity": 0.4, "attention_span": 0.2},
+    # System design challenges
+    {"creativity_factor": 0.3, "cooperation_bias": 0.4, "risk_tolerance": 0.3},
+    # Debug challenges
+    {"adaptation_speed": 0.5, "energy_efficiency": 0.3, "attention_span": 0.2},
+)
+
+def challenge_weights(round_number: int) -> np.ndarray:
+    """Weight vector over CONFIG_FIELDS for a round's challenge"""
+    weights = CHALLENGE_WEIGHTS[round_number % 3]
+    return np.array([weights.get(name, 0.0) for name in CONFIG_FIELDS])
+
+# Agent rows scored per matrix-vector product when gathering live rows,
+# bounding the temporary copy
+SCORE_CHUNK_ROWS = 1 << 16
+
+class ConfigMatrix:
+    """Agent configurations of many squads as one (agents x fields) array.
+
+    Rows of a squad are contiguous; `starts[i]` is the first row of squad i.
+    Built once per population, it serves every round's scoring.
+    """
+
+    def __init__(self, squads: Sequence[Squad]):
+        counts = np.fromiter((len(squad.agents) for squad in squads), dtype=np.int64,
+                             count=len(squads))
+        if len(counts) and counts.min() == 0:
+            raise ValueError("Every squad needs at least one agent")
+        starts = np.zeros(len(squads), dtype=np.int64)
+        np.cumsum(counts[:-1], out=starts[1:])
+        rows = int(counts.sum())
+        get = attrgetter(*CONFIG_FIELDS)
+        flat = np.fromiter(
+            chain.from_iterable(get(agent.config) for squad in squads for agent in squad.agents),
+            dtype=np.float64, count=rows * len(CONFIG_FIELDS)
+        )
+        self.values = flat.reshape(rows, len(CONFIG_FIELDS))
+        self.starts = starts
+        self.counts = counts
+
+    @classmethod
+    def from_arrays(cls, values: np.ndarray, starts: np.ndarray,
+                    counts: np.ndarray) -> "ConfigMatrix":
+        """Wrap existing arrays, e.g. views of shared memory, without copying"""
+        matrix = cls.__new__(cls)
+        matrix.values = values
+        matrix.starts = starts
+        matrix.counts = counts
+        return matrix
+
+    def __len__(self) -> int:
+        return len(self.counts)
+
+def _mix(x: np.ndarray) -> np.ndarray:
+    """splitmix64 finalizer over a uint64 array (wrapping arithmetic)"""
+    x = x + np.uint64(0x9E3779B97F4A7C15)
+    x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return x ^ (x >> np.uint64(31))
+
+def row_noise(seed: int, round_number: int, rows: np.ndarray,
+              noise: Tuple[float, float] = (0.8, 1.2)) -> np.ndarray:
+    """Noise factors of the given agent rows, a pure function of (seed, round, row).
+
+    Each row's value is hashed from its own index, so any subset or split of
+    the rows sees the same values without generating the rows in between.
+    """
+    key = _mix(_mix(np.array([seed % 2**64], dtype=np.uint64)) + np.uint64(round_number))
+    bits = _mix(np.asarray(rows, dtype=np.uint64) ^ key)
+    unit = (bits >> np.uint64(11)).astype(np.float64) * 2.0**-53
+    return noise[0] + unit * (noise[1] - noise[0])
+
+def challenge_scores(matrix: ConfigMatrix, round_number: int,
+                     rng: Optional[np.random.Generator] = None,
+                     slots: Optional[np.ndarray] = None,
+                     noise: Tuple[float, float] = (0.8, 1.2),
+                     seed: Optional[int] = None) -> np.ndarray:
+    """Mean noisy challenge score of each squad (or of the squads in `slots`).
+
+    Agent scores are one matrix-vector product scaled by uniform noise, and
+    squad means are a segmented sum over each squad's contiguous rows. With
+    `slots`, only those squads' rows are gathered and scored, so eliminated
+    squads cost nothing. With `seed` the noise comes from `row_noise`
+    instead of `rng`, so results do not depend on which rows are scored
+    together.
+    """
+    if len(matrix) == 0 or (slots is not None and len(slots) == 0):
+        return np.zeros(0)
+    weights = challenge_weights(round_number)
+    if slots is None:
+        counts = matrix.counts
+        rows = None
+        agent_scores = matrix.values @ weights
+    else:
+        counts = matrix.counts[slots]
+        firsts = np.cumsum(counts) - counts
+        rows = np.repeat(matrix.starts[slots] - firsts, counts) + np.arange(int(counts.sum()))
+        agent_scores = np.empty(len(rows))
+        for start in range(0, len(rows), SCORE_CHUNK_ROWS):
+            chunk = rows[start:start + SCORE_CHUNK_ROWS]
+            agent_scores[start:start + len(chunk)] = matrix.values[chunk] @ weights
+    
+    if seed is not None:
+        agent_scores *= row_noise(seed, round_number,
+                                  np.arange(len(agent_scores)) if rows is None else rows, noise)
+    else:
+        rng = rng or np.random.default_rng()
+        agent_scores *= rng.uniform(noise[0], noise[1], size=len(agent_scores))
+    return np.add.reduceat(agent_scores, np.cumsum(counts) - counts) / counts
+
+def top_k_slots(slots: np.ndarray, scores: np.ndarray,
+                k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """The k best (slot, score) pairs, best first; ties go to the lower slot"""
+    order = np.lexsort((slots, -scores))[:k]
+    return slots[order], scores[order]
+
+def stream_top_k(chunks: Iterable[List[Squad]], k: int,
+                 score: Callable[[List[Squad]], np.ndarray]) -> List[Tuple[float, Squad]]:
+    """Keep the `k` best squads of a stream, scoring it one chunk at a time.
+
+    Only the current chunk and a k-entry min-heap are ever held, so memory is
+    bounded by the survivors rather than the whole field. Each chunk is
+    prefiltered against the heap's minimum with one vectorized comparison.
+    Returns (score, squad) pairs, best first; ties keep arrival order.
+    """
+    if k <= 0:
+        return []
+    heap: List[Tuple[float, int, Squad]] = []
+    arrivals = itertools.count()
+    for chunk in chunks:
+        scores = score(chunk)
+        candidates = range(len(chunk))
+        if len(heap) == k:
+            candidates = np.flatnonzero(scores > heap[0][0])
+        for i in candidates:
+            # Earlier arrivals win ties, so later ones sort lower
+            entry = (float(scores[i]), -next(arrivals), chunk[i])
+            if len(heap) < k:
+                heapq.heappush(heap, entry)
+            elif entry[:2] > heap[0][:2]:
+                heapq.heapreplace(heap, entry)
+    return [(value, squad) for value, _, squad in sorted(heap, key=lambda e: e[:2], reverse=True)]
@@ -1,19 +1,54 @@
-from typing import Any, Dict, Optional
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from pathlib import Path
 import asyncio
+import time
 from mcp import Server, Resource, Tool
 from .models import Squad
-from .evolution import EvolutionEngine
+from .cache import ResponseCache
+from .evolution import EvolutionEngine, generation_stats
+from .fitness_cache import FitnessCache, FitnessFunction
+from .fitness_index import FitnessIndex
+from .jobs import Job, JobCancelled, JobManager, ProgressReporter
+from .persistence import SimulationPersistence
+from .population import Population
+from .sessions import QuotaExceeded, Session, SessionManager
+
+# Squads scored per session-lock acquisition while a job assigns fitness
+FITNESS_CHUNK_SIZE = 1024
+DEFAULT_SESSION = "default"
 
 class MegaDevServer(Server):
-    def __init__(self):
+    def __init__(self, checkpoint_dir: Path = Path("checkpoints"),
+                 response_cache_bytes: int = 64 * 1024 * 1024,
+                 session_dir: Path = Path("sessions"),
+                 max_sessions: int = 64,
+                 max_session_bytes: Optional[int] = 512 * 1024 * 1024,
+                 max_resident_bytes: Optional[int] = 2 * 1024 * 1024 * 1024,
+                 job_workers: int = 4,
+                 fitness_function: Optional[FitnessFunction] = None,
+                 fitness_cache_entries: int = 1_000_000):
         super().__init__()
-        self.engine = EvolutionEngine()
-        self.population: List[Squad] = []
-        self.generation = 0
+        # Each client works in its own named session (engine, population, index)
+        self.sessions = SessionManager(
+            session_dir,
+            max_sessions=max_sessions,
+            max_session_bytes=max_session_bytes,
+            max_resident_bytes=max_resident_bytes
+        )
+        # Generations of one session run in order; different sessions run in parallel
+        self.jobs = JobManager(max_workers=job_workers)
+        self.checkpoint_dir = checkpoint_dir
+        self.checkpoints = SimulationPersistence(checkpoint_dir)
+        # Encoded resource responses, valid until a session's population changes
+        self.responses = ResponseCache(max_bytes=response_cache_bytes)
+        # Deterministic fitness is memoized per genome; None keeps the random simulation
+        self.fitness_function = fitness_function
+        self.fitness_cache = FitnessCache(max_entries=fitness_cache_entries)
         
         # Register resources
         self.register_resource("population", self.get_population)
         self.register_resource("best_squad", self.get_best_squad)
+        self.register_resource("leaderboard", self.get_leaderboard)
         
         # Register tools
         self.register_tool(
@@ -32,6 +67,14 @@ class MegaDevServer(Server):
                         "description": "Number of agents per squad",
                         "minimum": 1,
                         "maximum": 10
+                    },
+                    "seed": {
+                        "type": "integer",
+                        "description": "Seed of the run's random streams, for reproducible evolution"
+                    },
+                    "session": {
+                        "type": "string",
+                        "description": "Name of the session to operate on (default: \"default\")"
                     }
                 },
                 handler=self.initialize_population
@@ -42,17 +85,241 @@ class MegaDevServer(Server):
             Tool(
                 name="evolve_generation",
                 description="Evolve the current population to create a new generation",
-                parameters={},
+                parameters={
+                    "session": {
+                        "type": "string",
+                        "description": "Name of the session to operate on (default: \"default\")"
+                    }
+                },
                 handler=self.evolve_generation
             )
         )
+        
+        self.register_tool(
+            Tool(
+                name="evolve_generations",
+                description="Evolve many generations in one call, streaming per-generation statistics",
+                parameters={
+                    "generations": {
+                        "type": "integer",
+                        "description": "Maximum number of generations to run",
+                        "minimum": 1,
+                        "maximum": 100000
+                    },
+                    "target_fitness": {
+                        "type": "number",
+                        "description": "Stop once the best fitness reaches this value"
+                    },
+                    "plateau_generations": {
+                        "type": "integer",
+                        "description": "Stop after this many generations without improvement",
+                        "minimum": 1
+                    },
+                    "min_improvement": {
+                        "type": "number",
+                        "description": "Smallest best-fitness gain that counts as improvement",
+                        "minimum": 0
+                    },
+                    "checkpoint_every": {
+                        "type": "integer",
+                        "description": "Save a population checkpoint every K generations",
+                        "minimum": 1
+                    },
+                    "checkpoint_seconds": {
+                        "type": "number",
+                        "description": "Also save a checkpoint once this many seconds have passed since the last",
+                        "minimum": 0
+                    },
+                    "background": {
+                        "type": "boolean",
+                        "description": "Return a job id immediately instead of waiting for the run"
+                    },
+                    "session": {
+                        "type": "string",
+                        "description": "Name of the session to operate on (default: \"default\")"
+                    }
+                },
+                handler=self.evolve_generations
+            )
+        )
+        
+        self.register_tool(
+            Tool(
+                name="resume_checkpoint",
+                description="Restore a session's population and engine state from a checkpoint file",
+                parameters={
+                    "path": {
+                        "type": "string",
+                        "description": ("Checkpoint file returned by evolve_generations; "
+                                        "must be inside the server's checkpoint directory")
+                    },
+                    "session": {
+                        "type": "string",
+                        "description": "Name of the session to operate on (default: \"default\")"
+                    }
+                },
+                handler=self.resume_checkpoint
+            )
+        )
+        
+        self.register_tool(
+            Tool(
+                name="start_evolution",
+                description="Evolve the current population as a background job and return its job id",
+                parameters={
+                    "session": {
+                        "type": "string",
+                        "description": "Name of the session to operate on (default: \"default\")"
+                    }
+                },
+                handler=self.start_evolution
+            )
+        )
+        
+        self.register_tool(
+            Tool(
+                name="job_status",
+                description="Get the status, progress and result of a background job",
+                parameters={
+                    "job_id": {
+                        "type": "string",
+                        "description": "Id returned when the job was submitted"
+                    },
+                    "since": {
+                        "type": "integer",
+                        "description": "Only return streamed updates from this index on",
+                        "minimum": 0
+                    }
+                },
+                handler=self.job_status
+            )
+        )
+        
+        self.register_tool(
+            Tool(
+                name="cancel_job",
+                description="Cancel a pending or running background job",
+                parameters={
+                    "job_id": {
+                        "type": "string",
+                        "description": "Id returned when the job was submitted"
+                    }
+                },
+                handler=self.cancel_job
+            )
+        )
+        
+        self.register_tool(
+            Tool(
+                name="list_sessions",
+                description="List sessions with their generation and estimated memory footprint",
+                parameters={},
+                handler=self.list_sessions
+            )
+        )
+        
+        self.register_tool(
+            Tool(
+                name="drop_session",
+                description="Delete a session and any state it spilled to disk",
+                parameters={
+                    "session": {
+                        "type": "string",
+                        "description": "Name of the session to operate on (default: \"default\")"
+                    }
+                },
+                handler=self.drop_session
+            )
+        )
+
+    @property
+    def engine(self) -> EvolutionEngine:
+        """Evolution engine of the default session"""
+        session = self.sessions.peek(DEFAULT_SESSION)
+        return session.engine if session else EvolutionEngine()
+
+    @property
+    def population(self) -> Population:
+        """Population of the default session, shared live with its clients while
+        resident; a spilled session yields a copy read from disk"""
+        session = self.sessions.peek(DEFAULT_SESSION)
+        return session.population if session else Population()
+
+    @property
+    def fitness_index(self) -> FitnessIndex:
+        """Fitness index of the default session"""
+        session = self.sessions.peek(DEFAULT_SESSION)
+        return session.fitness_index if session else FitnessIndex()
+
+    @property
+    def generation(self) -> int:
+        """Generation of the default session"""
+        session = self.sessions.peek(DEFAULT_SESSION)
+        return session.generation if session else 0
 
     async def get_population(self, params: Optional[Dict[str, Any]] = None) -> Resource:
         """Resource handler for current population state"""
+        return self._cached_resource("population", params, self._population_resource)
+
+    async def get_best_squad(self, params: Optional[Dict[str, Any]] = None) -> Resource:
+        """Resource handler for best performing squad"""
+        return self._cached_resource("best_squad", params, self._best_squad_resource)
+
+    async def get_leaderboard(self, params: Optional[Dict[str, Any]] = None) -> Resource:
+        """Resource handler for ranked squads, backed by the fitness index"""
+        params = params or {}
+        try:
+            limit = int(params.get("limit", 10))
+        except (TypeError, ValueError):
+            return Resource(error="limit must be an integer")
+        params = {
+            "session": params.get("session", DEFAULT_SESSION),
+            "limit": max(1, min(limit, 1000)),
+            "squad_id": params.get("squad_id")
+        }
+        return self._cached_resource("leaderboard", params, self._leaderboard_resource)
+
+    def _cached_resource(self, name: str, params: Optional[Dict[str, Any]],
+                         build: Callable[[Session, Dict[str, Any]], Resource]) -> Resource:
+        """Serve a session resource from the response cache, building it on a miss"""
+        params = dict(params or {})
+        params.setdefault("session", DEFAULT_SESSION)
+        try:
+            # The default session always exists; named ones must be initialized first
+            session = self.sessions.get(params["session"],
+                                        create=params["session"] == DEFAULT_SESSION)
+        except (ValueError, QuotaExceeded) as e:
+            return Resource(error=str(e))
+        if session is None:
+            return Resource(error=f"Unknown session: {params['session']}")
+        
+        with session.lock:
+            version = self._state_version(session)
+            cached = self.responses.get(name, params, version)
+            if cached is not None:
+                return cached.response
+            
+            resource = build(session, params)
+            data = resource.data if resource.data is not None else {"error": resource.error}
+            self.responses.put(name, params, version, resource, data, scope=session.name)
+            return resource
+
+    @staticmethod
+    def _state_version(session: Session) -> Tuple[int, int, int, int]:
+        """Identifies the population state cached responses were built from"""
+        return (session.generation, session.version, session.population.version,
+                session.fitness_index.version)
+
+    def _population_changed(self, session: Session):
+        """Record a population swap and drop the session's responses built from the old one"""
+        session.version += 1
+        self.responses.invalidate(self._state_version(session), scope=session.name)
+
+    def _population_resource(self, session: Session, params: Dict[str, Any]) -> Resource:
         return Resource(
             data={
-                "generation": self.generation,
-                "population_size": len(self.population),
+                "generation": session.generation,
+                "population_size": len(session.population),
                 "squads": [
                     {
                         "id": squad.id,
@@ -60,17 +327,16 @@ class MegaDevServer(Server):
                         "fitness": squad.fitness_score,
                         "agents": len(squad.agents)
                     }
-                    for squad in self.population
+                    for squad in session.population
                 ]
             }
         )
 
-    async def get_best_squad(self, params: Optional[Dict[str, Any]] = None) -> Resource:
-        """Resource handler for best performing squad"""
-        if not self.population:
+    def _best_squad_resource(self, session: Session, params: Dict[str, Any]) -> Resource:
+        if not session.population:
             return Resource(error="No population initialized")
             
-        best_squad = max(self.population, key=lambda s: s.fitness_score)
+        best_squad = session.fitness_index.best()
         return Resource(
             data={
                 "id": best_squad.id,
@@ -89,37 +355,383 @@ class MegaDevServer(Server):
             }
         )
 
-    async def initialize_population(self, population_size: int, squad_size: int) -> Dict[str, Any]:
+    def _leaderboard_resource(self, session: Session, params: Dict[str, Any]) -> Resource:
+        index = session.fitness_index
+        if not session.population:
+            return Resource(error="No population initialized")
+        
+        squads = index.top(params["limit"])
+        data = {
+            "generation": session.generation,
+            "population_size": len(index),
+            "squads": [
+                {
+                    "rank": rank,
+                    "id": squad.id,
+                    "name": squad.name,
+                    "fitness": squad.fitness_score,
+                    "percentile": index.percentile(squad.id)
+                }
+                for rank, squad in enumerate(squads, 1)
+            ]
+        }
+        
+        squad_id = params["squad_id"]
+        if squad_id is not None:
+            if squad_id not in index:
+                return Resource(error=f"Unknown squad: {squad_id}")
+            data["squad"] = {
+                "id": squad_id,
+                "rank": index.rank(squad_id),
+                "percentile": index.percentile(squad_id)
+            }
+        
+        return Resource(data=data)
+
+    async def initialize_population(self, population_size: int, squad_size: int,
+                                    session: str = DEFAULT_SESSION,
+                                    seed: Optional[int] = None) -> Dict[str, Any]:
         """Tool handler to initialize population"""
-        self.engine = EvolutionEngine(population_size=population_size)
-        self.population = self.engine.create_initial_population()
-        self.generation = 0
+        engine = EvolutionEngine(population_size=population_size, seed=seed)
+        try:
+            self.sessions.check_population(population_size, squad_size)
+            squads = engine.create_initial_population()
+            self.sessions.check_squads(squads)
+            state = self.sessions.get(session)
+        except (ValueError, QuotaExceeded) as e:
+            return {"error": str(e)}
+        await self.adopt_population(squads, state, engine)
         
         return {
             "status": "success",
-            "population_size": len(self.population),
+            "session": state.name,
+            "population_size": len(state.population),
             "squad_size": squad_size,
-            "generation": self.generation
+            "generation": state.generation,
+            "seed": engine.seed
+        }
+
+    async def resume_checkpoint(self, path: str, session: str = DEFAULT_SESSION) -> Dict[str, Any]:
+        """Tool handler to continue a run from a checkpoint written by evolve_generations"""
+        # Clients may only name files the server wrote, not arbitrary paths
+        checkpoint = Path(path).resolve()
+        if not checkpoint.is_relative_to(self.checkpoint_dir.resolve()):
+            return {"error": "Checkpoint must be inside the checkpoint directory"}
+        try:
+            generation, squads, engine_state = self.checkpoints.load_checkpoint(checkpoint)
+        except (OSError, ValueError, KeyError) as e:
+            return {"error": f"Unreadable checkpoint: {e}"}
+        if engine_state is None:
+            return {"error": "Checkpoint has no engine state to resume from"}
+        try:
+            self.sessions.check_squads(squads)
+            state = self.sessions.get(session)
+        except (ValueError, QuotaExceeded) as e:
+            return {"error": str(e)}
+        await self.adopt_population(squads, state, EvolutionEngine.restore(engine_state),
+                                    generation=generation)
+        
+        return {
+            "status": "success",
+            "session": state.name,
+            "population_size": len(state.population),
+            "generation": state.generation
+        }
+
+    async def adopt_population(self, squads: List[Squad], state: Session,
+                               engine: Optional[EvolutionEngine] = None, generation: int = 0):
+        """Install externally built squads as a session's population.
+        
+        Raises QuotaExceeded if they would not fit the session quota.
+        """
+        self.sessions.check_squads(squads)
+        await self._cancel_evolution(state.name)
+        
+        with state.lock:
+            if engine is not None:
+                state.engine = engine
+            state.fitness_index.rebuild(squads)
+            state.population = Population(squads, index=state.fitness_index)
+            state.generation = generation
+            self._population_changed(state)
+        self.sessions.enforce(keep=state.name)
+
+    async def evolve_generation(self, session: str = DEFAULT_SESSION) -> Dict[str, Any]:
+        """Tool handler to evolve population on the job executor and wait for it"""
+        state = self._evolvable_session(session)
+        if isinstance(state, dict):
+            return state
+        
+        job = self._submit("evolve_generation", state, self._run_evolution)
+        await self.jobs.wait(job.id)
+        if job.status != "completed":
+            return {"error": job.error or f"Job {job.status}", "job_id": job.id}
+        return job.result
+
+    async def evolve_generations(self, generations: int, target_fitness: Optional[float] = None,
+                                 plateau_generations: Optional[int] = None,
+                                 min_improvement: float = 0.0,
+                                 checkpoint_every: Optional[int] = None,
+                                 checkpoint_seconds: Optional[float] = None,
+                                 background: bool = False,
+                                 session: str = DEFAULT_SESSION) -> Dict[str, Any]:
+        """Tool handler to run a batch of generations as a single job"""
+        if generations < 1:
+            return {"error": "generations must be at least 1"}
+        if checkpoint_every is not None and checkpoint_every < 0:
+            return {"error": "checkpoint_every must not be negative"}
+        state = self._evolvable_session(session)
+        if isinstance(state, dict):
+            return state
+        
+        def work(state: Session, report: ProgressReporter) -> Dict[str, Any]:
+            return self._run_generations(state, report, generations, target_fitness,
+                                         plateau_generations, min_improvement, checkpoint_every,
+                                         checkpoint_seconds)
+        
+        job = self._submit("evolve_generations", state, work)
+        if background:
+            return {"status": "submitted", "job_id": job.id}
+        
+        await self.jobs.wait(job.id)
+        if job.status != "completed":
+            return {"error": job.error or f"Job {job.status}", "job_id": job.id,
+                    "stats": job.updates}
+        return {**job.result, "stats": job.updates}
+
+    async def start_evolution(self, session: str = DEFAULT_SESSION) -> Dict[str, Any]:
+        """Tool handler to evolve population in the background"""
+        state = self._evolvable_session(session)
+        if isinstance(state, dict):
+            return state
+        
+        job = self._submit("evolve_generation", state, self._run_evolution)
+        return {"status": "submitted", "job_id": job.id}
+
+    async def job_status(self, job_id: str, since: int = 0) -> Dict[str, Any]:
+        """Tool handler to poll a background job"""
+        job = self.jobs.get(job_id)
+        if job is None:
+            return {"error": f"Unknown job: {job_id}"}
+        return job.to_dict(since=since)
+
+    async def cancel_job(self, job_id: str) -> Dict[str, Any]:
+        """Tool handler to cancel a background job"""
+        job = self.jobs.get(job_id)
+        if job is None:
+            return {"error": f"Unknown job: {job_id}"}
+        if not self.jobs.cancel(job_id):
+            return {"error": f"Job already {job.status}", "job_id": job_id}
+        return {"status": "cancelling", "job_id": job_id}
+
+    async def list_sessions(self) -> Dict[str, Any]:
+        """Tool handler to list sessions and their memory footprint"""
+        return {
+            "sessions": self.sessions.list(),
+            "resident_bytes": self.sessions.resident_bytes,
+            "max_resident_bytes": self.sessions.max_resident_bytes,
+            "max_session_bytes": self.sessions.max_session_bytes
         }
 
-    async def evolve_generation(self) -> Dict[str, Any]:
-        """Tool handler to evolve population"""
-        if not self.population:
+    async def drop_session(self, session: str) -> Dict[str, Any]:
+        """Tool handler to delete a session"""
+        if session not in self.sessions:
+            return {"error": f"Unknown session: {session}"}
+        await self._cancel_evolution(session)
+        self.sessions.drop(session)
+        self.responses.invalidate(scope=session)
+        return {"status": "success", "session": session}
+
+    async def close(self):
+        """Cancel outstanding jobs, wait for them to stop and shut down the job executor"""
+        pending = [job for job in self.jobs.list() if not job.done]
+        for job in pending:
+            self.jobs.cancel(job.id)
+        for job in pending:
+            await self.jobs.wait(job.id)
+        self.jobs.shutdown()
+
+    def _evolvable_session(self, name: str):
+        """Return the named session, or an error dict if it has nothing to evolve"""
+        try:
+            session = self.sessions.get(name, create=False)
+        except ValueError as e:
+            return {"error": str(e)}
+        if session is None or not session.population:
             return {"error": "No population initialized"}
+        return session
+
+    def _submit(self, kind: str, session: Session,
+                work: Callable[[Session, ProgressReporter], Dict[str, Any]]) -> Job:
+        """Submit session work; busy sessions are pinned in memory until it finishes"""
+        session.busy += 1
+        
+        def run(report: ProgressReporter) -> Dict[str, Any]:
+            with session.evolution_lock:
+                return work(session, report)
+        
+        job = self.jobs.submit(kind, run, on_progress=self._progress_notifier(), owner=session.name)
+        job.future.add_done_callback(lambda _: self._release(session))
+        return job
+
+    def _release(self, session: Session):
+        session.busy -= 1
+        self.sessions.enforce()
+
+    async def _cancel_evolution(self, session: str):
+        """Cancel a session's outstanding jobs and wait for them to stop"""
+        pending = [job for job in self.jobs.list() if job.owner == session and not job.done]
+        for job in pending:
+            self.jobs.cancel(job.id)
+        for job in pending:
+            await self.jobs.wait(job.id)
+
+    def _progress_notifier(self) -> Optional[Callable[[Job], None]]:
+        """Forward job progress as MCP progress notifications if the client asked for them"""
+        try:
+            context = self.request_context
+        except (LookupError, AttributeError):
+            return None
+        meta = getattr(context, "meta", None)
+        token = getattr(meta, "progressToken", None) if meta else None
+        if token is None:
+            return None
+        
+        def notify(job: Job):
+            asyncio.ensure_future(
+                context.session.send_progress_notification(token, job.progress, job.total)
+            )
+        return notify
+
+    def _assign_fitness(self, session: Session, population: List[Squad],
+                        report: ProgressReporter, total: int):
+        """Evaluate fitness, yielding the session lock between chunks"""
+        function = self.fitness_function
+        # Simulated scores draw from the session's own stream so runs replay exactly
+        rng = session.engine.stream("fitness")
+        for start in range(0, len(population), FITNESS_CHUNK_SIZE):
+            with session.lock:
+                for squad in population[start:start + FITNESS_CHUNK_SIZE]:
+                    if function is None:
+                        # Simulated evaluation
+                        squad.fitness_score = sum(rng.random() for _ in range(len(squad.agents)))
+                        for agent in squad.agents:
+                            agent.fitness_score = rng.random()
+                        continue
+                    for agent in squad.agents:
+                        agent.fitness_score = self.fitness_cache.score(agent.config, function)
+                    squad.fitness_score = sum(agent.fitness_score for agent in squad.agents)
+            report(min(start + FITNESS_CHUNK_SIZE, len(population)), total)
+
+    def _evolve_step(self, session: Session, report: ProgressReporter) -> Dict[str, Any]:
+        """Score, breed and publish one generation; runs on the executor thread.
+        
+        Returns fitness and diversity statistics for the scored population.
+        """
+        started = time.perf_counter()
+        engine = session.engine
+        population = session.population
+        total = len(population) + engine.population_size
+        # A cancelled step rewinds the engine and restores the scores it overwrote,
+        # so the population is left as it was and a retry draws the same numbers
+        rewind = engine.checkpoint()
+        previous = [(squad.fitness_score, [agent.fitness_score for agent in squad.agents])
+                    for squad in population]
+        try:
+            self._assign_fitness(session, population, report, total)
+            stats = generation_stats(population)
+            if self.fitness_function is not None:
+                stats["fitness_cache"] = self.fitness_cache.stats()
             
-        # Simulate fitness evaluation
-        for squad in self.population:
-            squad.fitness_score = sum(random.random() for _ in range(len(squad.agents)))
-            for agent in squad.agents:
-                agent.fitness_score = random.random()
+            new_population = engine.evolve_population(
+                population,
+                progress=lambda done, _: report(len(population) + done, total)
+            )
+        except JobCancelled:
+            with session.lock:
+                for squad, (score, agent_scores) in zip(population, previous):
+                    squad.fitness_score = score
+                    for agent, agent_score in zip(squad.agents, agent_scores):
+                        agent.fitness_score = agent_score
+            session.engine = EvolutionEngine.restore(rewind)
+            raise
         
-        self.population = self.engine.evolve_population(self.population)
-        self.generation = self.engine.generation
+        new_index = FitnessIndex(new_population)
+        with session.lock:
+            old_index = session.fitness_index
+            session.population = Population(new_population, index=new_index)
+            session.fitness_index = new_index
+            session.generation = engine.generation
+            old_index.clear()
+            self._population_changed(session)
         
-        best_squad = max(self.population, key=lambda s: s.fitness_score)
+        stats["generation"] = session.generation
+        stats["wall_time"] = time.perf_counter() - started
+        return stats
+
+    def _run_evolution(self, session: Session, report: ProgressReporter) -> Dict[str, Any]:
+        """Job body for one generation"""
+        self._evolve_step(session, report)
+        
+        best_squad = session.fitness_index.best()
+        population = session.population
         return {
             "status": "success",
-            "generation": self.generation,
+            "generation": session.generation,
             "best_fitness": best_squad.fitness_score,
-            "average_fitness": sum(s.fitness_score for s in self.population) / len(self.population)
-        } 
\ No newline at end of file
+            "average_fitness": sum(s.fitness_score for s in population) / len(population)
+        }
+
+    def _run_generations(self, session: Session, report: ProgressReporter, generations: int,
+                         target_fitness: Optional[float], plateau_generations: Optional[int],
+                         min_improvement: float, checkpoint_every: Optional[int],
+                         checkpoint_seconds: Optional[float] = None) -> Dict[str, Any]:
+        """Job body for a batch of generations, publishing stats after each one.
+        
+        Checkpoints hold the population and the full engine state, so
+        `resume_checkpoint` continues the run with identical results.
+        """
+        best_fitness = None
+        stale = 0
+        stop_reason = "generations"
+        checkpoints = []
+        persistence = SimulationPersistence(self.checkpoint_dir / session.name)
+        last_checkpoint = time.monotonic()
+        
+        for completed in range(1, generations + 1):
+            stats = self._evolve_step(session, lambda *_: report(completed - 1, generations))
+            stats = {key: round(value, 6) if isinstance(value, float) else value
+                     for key, value in stats.items()}
+            report(completed, generations, stats)
+            
+            due = checkpoint_every and completed % checkpoint_every == 0
+            if checkpoint_seconds and time.monotonic() - last_checkpoint >= checkpoint_seconds:
+                due = True
+            if due:
+                # Only this worker replaces the population, so no lock is needed to read it
+                path = persistence.save_population(session.population, session.generation,
+                                                   engine=session.engine.checkpoint())
+                checkpoints.append(str(path))
+                last_checkpoint = time.monotonic()
+            
+            if best_fitness is None or stats["best"] > best_fitness + min_improvement:
+                best_fitness = stats["best"]
+                stale = 0
+            else:
+                stale += 1
+            
+            if target_fitness is not None and stats["best"] >= target_fitness:
+                stop_reason = "target_fitness"
+                break
+            if plateau_generations and stale >= plateau_generations:
+                stop_reason = "plateau"
+                break
+        
+        return {
+            "status": "success",
+            "generation": session.generation,
+            "generations_run": completed,
+            "stop_reason": stop_reason,
+            "best_fitness": best_fitness,
+            "checkpoints": checkpoints
+        }
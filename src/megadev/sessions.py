@@ -0,0 +1,238 @@
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+import re
+import shutil
+import sys
+import threading
+import time
+from .evolution import EvolutionEngine
+from .fitness_index import FitnessIndex
+from .models import Agent, Squad
+from .persistence import SimulationPersistence, write_json_atomic
+from .population import Population
+
+SESSION_NAME = re.compile(r"^[A-Za-z0-9_.-]{1,64}$")
+
+class QuotaExceeded(Exception):
+    """Raised when a session would exceed the configured memory or session quotas"""
+
+def _deep_size(obj: Any, seen: set) -> int:
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(_deep_size(k, seen) + _deep_size(v, seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set)):
+        size += sum(_deep_size(item, seen) for item in obj)
+    elif hasattr(obj, "__dict__"):
+        size += _deep_size(vars(obj), seen)
+    return size
+
+@lru_cache(maxsize=1)
+def estimate_agent_bytes() -> int:
+    """Approximate resident size of one agent, measured on a sample"""
+    samples = [Agent.create_random(f"Squad-0-Agent-{i}") for i in range(16)]
+    return sum(_deep_size(agent, set()) for agent in samples) // len(samples)
+
+def estimate_population_bytes(squads: int, agents_per_squad: int) -> int:
+    """Approximate resident size of a population, including per-squad overhead"""
+    squad_overhead = _deep_size(Squad(id="0" * 36, name="Squad-0", agents=[]), set())
+    return squads * (squad_overhead + agents_per_squad * (estimate_agent_bytes() + 8))
+
+@dataclass
+class Session:
+    """An isolated evolution run owned by one client"""
+    name: str
+    engine: EvolutionEngine = field(default_factory=EvolutionEngine)
+    population: Population = field(default_factory=Population)
+    fitness_index: FitnessIndex = field(default_factory=FitnessIndex)
+    generation: int = 0
+    # Bumped whenever the population is replaced
+    version: int = 0
+    last_used: float = field(default_factory=time.monotonic)
+    # Number of jobs currently using the session; busy sessions are never spilled
+    busy: int = 0
+    lock: threading.RLock = field(default_factory=threading.RLock, repr=False, compare=False)
+    # Serialises generations of this session across job workers
+    evolution_lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    @property
+    def footprint(self) -> int:
+        """Estimated resident bytes of the session's population"""
+        if not self.population:
+            return 0
+        agents = len(self.population[0].agents)
+        return estimate_population_bytes(len(self.population), agents)
+
+    def info(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "resident": True,
+            "generation": self.generation,
+            "population_size": len(self.population),
+            "estimated_bytes": self.footprint,
+            "busy": self.busy > 0
+        }
+
+class SessionManager:
+    """Named sessions with memory quotas and LRU eviction to disk.
+
+    Each session gets its own EvolutionEngine, population and fitness index.
+    When the resident sessions' estimated footprint exceeds
+    `max_resident_bytes`, the least recently used idle sessions are written
+    to `spill_dir` and transparently reloaded on their next access. A quota
+    of None disables that limit.
+    """
+
+    def __init__(self, spill_dir: Path, max_sessions: int = 64,
+                 max_session_bytes: Optional[int] = 512 * 1024 * 1024,
+                 max_resident_bytes: Optional[int] = 2 * 1024 * 1024 * 1024):
+        self.spill_dir = spill_dir
+        self.max_sessions = max_sessions
+        self.max_session_bytes = max_session_bytes
+        self.max_resident_bytes = max_resident_bytes
+        self._resident: "OrderedDict[str, Session]" = OrderedDict()
+        self._spilled: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.RLock()
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._resident or name in self._spilled
+
+    def get(self, name: str, create: bool = True) -> Optional[Session]:
+        """Return a resident session, reloading or creating it as needed"""
+        if not SESSION_NAME.match(name):
+            raise ValueError(f"Invalid session name: {name!r}")
+        with self._lock:
+            session = self._resident.get(name)
+            if session is None:
+                if name in self._spilled:
+                    session = self._restore(name)
+                elif not create:
+                    return None
+                else:
+                    if len(self._resident) + len(self._spilled) >= self.max_sessions:
+                        raise QuotaExceeded(f"Session limit of {self.max_sessions} reached")
+                    session = Session(name=name)
+                self._resident[name] = session
+                self.enforce(keep=name)
+            self._resident.move_to_end(name)
+            session.last_used = time.monotonic()
+            return session
+
+    def peek(self, name: str) -> Optional[Session]:
+        """Look a session up for reading without creating, reordering or spilling any.
+
+        A spilled session is read from disk into a detached copy and stays
+        spilled, so peeking never grows the resident set.
+        """
+        with self._lock:
+            session = self._resident.get(name)
+            if session is None and name in self._spilled:
+                session = self._load(name)
+            return session
+
+    def check_squads(self, squads: Sequence[Squad]):
+        """Raise QuotaExceeded if these squads would not fit one session"""
+        if not squads:
+            return
+        agents = sum(len(squad.agents) for squad in squads)
+        self.check_population(len(squads), -(-agents // len(squads)))
+
+    def check_population(self, population_size: int, squad_size: int):
+        """Raise QuotaExceeded if a population of this shape would not fit one session"""
+        if self.max_session_bytes is None:
+            return
+        needed = estimate_population_bytes(population_size, squad_size)
+        if needed > self.max_session_bytes:
+            raise QuotaExceeded(
+                f"Population needs ~{needed} bytes, session quota is {self.max_session_bytes}"
+            )
+
+    @property
+    def resident_bytes(self) -> int:
+        return sum(session.footprint for session in self._resident.values())
+
+    def enforce(self, keep: Optional[str] = None):
+        """Spill least recently used idle sessions until under the resident budget"""
+        if self.max_resident_bytes is None:
+            return
+        with self._lock:
+            for name in list(self._resident):
+                if self.resident_bytes <= self.max_resident_bytes:
+                    break
+                session = self._resident[name]
+                if name != keep and session.busy == 0:
+                    self.spill(name)
+
+    def spill(self, name: str) -> Path:
+        """Write a resident session to disk and release its memory"""
+        with self._lock:
+            session = self._resident.pop(name)
+            directory = self.spill_dir / name
+            shutil.rmtree(directory, ignore_errors=True)
+            with session.lock:
+                path = SimulationPersistence(directory).save_population(session.population,
+                                                                        session.generation)
+                meta = {
+                    "population_path": str(path),
+                    "generation": session.generation,
+                    "version": session.version,
+                    "engine": session.engine.checkpoint(),
+                    "estimated_bytes": session.footprint
+                }
+                session.fitness_index.clear()
+            write_json_atomic(directory / "session.json", meta)
+            self._spilled[name] = meta
+            return directory
+
+    def drop(self, name: str) -> bool:
+        """Forget a session, deleting any spilled state"""
+        with self._lock:
+            session = self._resident.pop(name, None)
+            if session is not None:
+                session.fitness_index.clear()
+            spilled = self._spilled.pop(name, None)
+            if spilled is not None:
+                shutil.rmtree(self.spill_dir / name, ignore_errors=True)
+            return session is not None or spilled is not None
+
+    def list(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            sessions = [session.info() for session in self._resident.values()]
+            for name, meta in self._spilled.items():
+                sessions.append({
+                    "name": name,
+                    "resident": False,
+                    "generation": meta["generation"],
+                    "population_size": meta["engine"]["population_size"],
+                    "estimated_bytes": meta["estimated_bytes"],
+                    "busy": False
+                })
+            return sessions
+
+    def _restore(self, name: str) -> Session:
+        session = self._load(name)
+        del self._spilled[name]
+        shutil.rmtree(self.spill_dir / name, ignore_errors=True)
+        return session
+
+    def _load(self, name: str) -> Session:
+        """Build a session from its spilled state, leaving that state in place"""
+        meta = self._spilled[name]
+        generation, population = SimulationPersistence(self.spill_dir / name).load_population(
+            Path(meta["population_path"])
+        )
+        engine = EvolutionEngine.restore(meta["engine"])
+        index = FitnessIndex(population)
+        return Session(
+            name=name,
+            engine=engine,
+            population=Population(population, index=index),
+            fitness_index=index,
+            generation=generation,
+            version=meta["version"] + 1
+        )
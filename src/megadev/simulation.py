@@ -1,8 +1,14 @@
 from dataclasses import dataclass
 from datetime import datetime, timedelta
-from typing import List, Optional
-from .models import Agent, Squad, Division, Department
-from .organization import Division, Department
+from multiprocessing import Pipe, Process
+from multiprocessing.connection import Connection
+from typing import Any, Dict, List, Optional, Tuple, Union
+import random
+from .models import Agent, Squad
+from .organization import Division, Department, OrganizationRegistry
+
+# Need fields summarised in tick statistics
+NEED_FIELDS = ("hunger", "thirst", "bathroom", "energy", "stress")
 
 @dataclass
 class SimulationClock:
@@ -16,12 +22,37 @@ class SimulationClock:
         self.current_time += self.tick_interval * self.time_scale
         return self.current_time
 
+def _update_departments(departments: List[Department], time_delta: float) -> Dict[str, float]:
+    """Advance every agent's needs by `time_delta` hours and sum them up"""
+    totals = {"agents": 0, "max_stress": 0.0, **{name: 0.0 for name in NEED_FIELDS}}
+    for department in departments:
+        for division in department.divisions:
+            for squad in division.squads:
+                for agent in squad.agents:
+                    needs = agent.needs
+                    needs.update(time_delta)
+                    totals["agents"] += 1
+                    for name in NEED_FIELDS:
+                        totals[name] += getattr(needs, name)
+                    totals["max_stress"] = max(totals["max_stress"], needs.stress)
+    return totals
+
+def _summarise(time: datetime, totals: List[Dict[str, float]]) -> Dict[str, Any]:
+    agents = sum(t["agents"] for t in totals)
+    stats: Dict[str, Any] = {"time": time, "agents": agents}
+    for name in NEED_FIELDS:
+        stats[f"mean_{name}"] = sum(t[name] for t in totals) / agents if agents else 0.0
+    stats["max_stress"] = max((t["max_stress"] for t in totals), default=0.0)
+    return stats
+
 class SimulationEngine:
     """Manages the simulation state and progression"""
     def __init__(self):
         self.clock = SimulationClock(current_time=datetime.now())
         self.departments: List[Department] = []
         self.paused: bool = False
+        # Aggregate needs after the latest tick
+        self.stats: Optional[Dict[str, Any]] = None
         
     def add_department(self, department: Department):
         self.departments.append(department)
@@ -34,13 +65,8 @@ class SimulationEngine:
         current_time = self.clock.tick()
         
         # Update all agents in the organization
-        for department in self.departments:
-            for division in department.divisions:
-                for squad in division.squads:
-                    for agent in squad.agents:
-                        # Update human needs based on time delta
-                        time_delta = self.clock.tick_interval.total_seconds() / 3600  # Convert to hours
-                        agent.needs.update(time_delta)
+        time_delta = self.clock.tick_interval.total_seconds() / 3600  # Convert to hours
+        self.stats = _summarise(current_time, [_update_departments(self.departments, time_delta)])
                         
     def pause(self):
         """Pause the simulation"""
@@ -49,3 +75,183 @@ class SimulationEngine:
     def resume(self):
         """Resume the simulation"""
         self.paused = False
+
+    def close(self):
+        """Nothing to release; present so engines are interchangeable"""
+
+# Messages between the coordinator and a shard. Each request carries the
+# shard's inbox of routed events; receives are applied before the request
+# and releases after it:
+#   ("receive", department_id, squad)   add a squad that moved from another shard
+#   ("release", squad_id, department_id) hand a squad over to another department
+Event = Tuple[Any, ...]
+
+def _shard_worker(conn: Connection, seed: str):
+    """Worker loop owning one shard of departments"""
+    random.seed(seed)
+    # The shard's own index, so sizes stay right as squads come and go
+    registry = OrganizationRegistry()
+    while True:
+        command, payload, inbox = conn.recv()
+        for event in inbox:
+            if event[0] == "receive":
+                _, department_id, squad = event
+                registry.add_squad(registry.department(department_id).divisions[0], squad)
+        
+        result: Any = None
+        if command == "add":
+            registry.add_department(payload)
+        elif command == "tick":
+            # Shards keep no clock of their own; the coordinator's sets the step
+            result = _update_departments(registry.departments, payload)
+        elif command == "departments":
+            result = registry.departments
+        
+        # Squads leave after this tick's update, so they miss no tick in transit
+        outbox: List[Event] = []
+        for event in inbox:
+            if event[0] == "release":
+                _, squad_id, target = event
+                if registry.squad(squad_id) is not None:
+                    outbox.append(("receive", target, registry.remove_squad(squad_id)))
+        conn.send((result, outbox))
+        if command == "stop":
+            return
+
+class ShardedSimulationEngine:
+    """SimulationEngine that spreads departments across worker processes.
+
+    Each department is moved into the least loaded of `workers` shard
+    processes. A tick advances the coordinator's clock, sends the new time
+    to every shard and waits for all of them before returning, so no shard
+    is ever a tick ahead of another. Shards report summed needs, which the
+    coordinator combines into `stats`. Events between departments, such as
+    `transfer_squad`, are routed through the coordinator and applied at
+    the start of the next tick.
+
+    Departments live in the workers once added; `departments` fetches
+    copies of their current state. Call `close()` to stop the workers.
+    """
+
+    def __init__(self, workers: int = 2, seed: Optional[int] = None):
+        self.clock = SimulationClock(current_time=datetime.now())
+        self.paused: bool = False
+        self.stats: Optional[Dict[str, Any]] = None
+        seed = seed if seed is not None else random.randrange(2**63)
+        self._connections: List[Connection] = []
+        self._processes: List[Process] = []
+        for shard in range(max(1, workers)):
+            parent, child = Pipe()
+            process = Process(target=_shard_worker, args=(child, f"{seed}:{shard}"), daemon=True)
+            process.start()
+            child.close()
+            self._connections.append(parent)
+            self._processes.append(process)
+        self._load = [0] * len(self._processes)
+        # Shard of each department
+        self._owner: Dict[str, int] = {}
+        # Events waiting for each shard's next request
+        self._inbox: List[List[Event]] = [[] for _ in self._processes]
+
+    def __enter__(self) -> "ShardedSimulationEngine":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @property
+    def workers(self) -> int:
+        return len(self._processes)
+
+    def add_department(self, department: Department):
+        if department.id in self._owner:
+            raise ValueError(f"Department already added: {department.id}")
+        shard = min(range(self.workers), key=self._load.__getitem__)
+        self._owner[department.id] = shard
+        self._load[shard] += department.size
+        self._request(shard, "add", department)
+
+    def shard_of(self, department_id: str) -> int:
+        return self._owner[department_id]
+
+    def transfer_squad(self, squad_id: str, from_department: str, to_department: str):
+        """Move a squad into another department's first division on the next tick"""
+        for department_id in (from_department, to_department):
+            if department_id not in self._owner:
+                raise KeyError(f"Unknown department: {department_id}")
+        self._inbox[self._owner[from_department]].append(("release", squad_id, to_department))
+
+    def tick(self):
+        """Process one simulation tick on every shard"""
+        if self.paused:
+            return
+        
+        current_time = self.clock.tick()
+        time_delta = self.clock.tick_interval.total_seconds() / 3600  # Convert to hours
+        replies = self._broadcast("tick", time_delta)
+        self.stats = _summarise(current_time, replies)
+
+    @property
+    def departments(self) -> List[Department]:
+        """Copies of every department's current state, gathered from the shards"""
+        shards = self._broadcast("departments", None)
+        # Repeat until squads in flight have landed, so none are missing
+        while any(self._inbox):
+            shards = self._broadcast("departments", None)
+        return [department for shard in shards for department in shard]
+
+    def pause(self):
+        """Pause the simulation"""
+        self.paused = True
+        
+    def resume(self):
+        """Resume the simulation"""
+        self.paused = False
+
+    def close(self):
+        """Stop the shard processes"""
+        for shard, connection in enumerate(self._connections):
+            try:
+                connection.send(("stop", None, self._inbox[shard]))
+                connection.recv()
+            except (EOFError, OSError, BrokenPipeError):
+                pass
+            connection.close()
+        for process in self._processes:
+            process.join(timeout=5)
+        self._connections = []
+        self._processes = []
+
+    def _request(self, shard: int, command: str, payload: Any) -> Any:
+        inbox, self._inbox[shard] = self._inbox[shard], []
+        self._connections[shard].send((command, payload, inbox))
+        result, outbox = self._connections[shard].recv()
+        self._route(shard, outbox)
+        return result
+
+    def _route(self, shard: int, outbox: List[Event]):
+        for event in outbox:
+            target = self._owner[event[1]]
+            self._inbox[target].append(event)
+            # Headcount moves with the squad, so placement sees each shard's real load
+            moved = len(event[2].agents)
+            self._load[shard] -= moved
+            self._load[target] += moved
+
+    def _broadcast(self, command: str, payload: Any) -> List[Any]:
+        """Send a command to every shard, wait for all (the tick barrier) and route their events"""
+        for shard, connection in enumerate(self._connections):
+            inbox, self._inbox[shard] = self._inbox[shard], []
+            connection.send((command, payload, inbox))
+        results = []
+        for shard, connection in enumerate(self._connections):
+            result, outbox = connection.recv()
+            results.append(result)
+            self._route(shard, outbox)
+        return results
+
+def create_engine(workers: int = 1, seed: Optional[int] = None) -> Union[SimulationEngine, ShardedSimulationEngine]:
+    """The serial engine for one worker, the sharded engine for more"""
+    if workers <= 1:
+        return SimulationEngine()
+    return ShardedSimulationEngine(workers=workers, seed=seed)
@@ -0,0 +1,214 @@
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+from dataclasses import dataclass
+from pathlib import Path
+import json
+import sqlite3
+import threading
+import time
+from cachetools import TTLCache
+
+@dataclass
+class CacheEntry:
+    value: Any
+    stored_at: float
+    hits: int = 0  # Reads since the value was stored
+
+class InstrumentedTTLCache(TTLCache):
+    """TTLCache that counts entries dropped for space and for age"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.evictions = 0
+        self.expirations = 0
+
+    def popitem(self):
+        # Only called by the cache itself when it is full
+        item = super().popitem()
+        self.evictions += 1
+        return item
+
+    def expire(self, time=None):
+        expired = super().expire(time)
+        self.expirations += len(expired)
+        return expired
+
+class RefreshingCache:
+    """TTL cache with stale-while-revalidate and refresh-ahead for hot keys.
+
+    Entries live until `hard_ttl`. Once older than `soft_ttl` they are still
+    served, but lookups report that a background refresh is due. Keys read at
+    least `hot_hits` times are refreshed early, after `refresh_ahead` of the
+    soft TTL, so popular entries are renewed before anyone sees them stale.
+    """
+
+    def __init__(self, maxsize: int, soft_ttl: float, hard_ttl: float,
+                 hot_hits: int = 5, refresh_ahead: float = 0.8,
+                 timer: Callable[[], float] = time.monotonic, name: str = "cache"):
+        if soft_ttl > hard_ttl:
+            raise ValueError("soft_ttl must not exceed hard_ttl")
+        self.name = name
+        self.soft_ttl = soft_ttl
+        self.hard_ttl = hard_ttl
+        self.hot_hits = hot_hits
+        self.refresh_ahead = refresh_ahead
+        self.timer = timer
+        self.entries = InstrumentedTTLCache(maxsize=maxsize, ttl=hard_ttl, timer=timer)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self.entries
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def lookup(self, key: Hashable) -> Tuple[Optional[Any], bool]:
+        """Return (value or None, whether the caller should refresh the key)"""
+        entry = self.entries.get(key)
+        if entry is None:
+            return None, False
+        entry.hits += 1
+        age = self.timer() - entry.stored_at
+        stale = age >= self.soft_ttl
+        refresh_early = entry.hits >= self.hot_hits and age >= self.soft_ttl * self.refresh_ahead
+        return entry.value, stale or refresh_early
+
+    def store(self, key: Hashable, value: Any, age: float = 0.0):
+        """Cache a value; `age` back-dates values that were fetched earlier"""
+        self.entries[key] = CacheEntry(value=value, stored_at=self.timer() - age)
+
+    def age(self, key: Hashable) -> Optional[float]:
+        entry = self.entries.get(key)
+        return None if entry is None else self.timer() - entry.stored_at
+
+class DiskCache:
+    """SQLite-backed L2 cache that survives restarts.
+
+    Values are stored as JSON with their wall-clock fetch time and an expiry.
+    When the stored payloads exceed `max_bytes`, compaction drops expired
+    entries first and then the least recently read ones. The payload total
+    is kept as a running count, so writes never sum the table, and read
+    times are buffered and written in batches of `flush_every` rather than
+    committed on every read. Every method blocks, so async callers should
+    run them in a worker thread.
+    """
+
+    def __init__(self, path: Path, max_bytes: int = 64 * 1024 * 1024,
+                 compact_every: int = 256, flush_every: int = 256):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.compact_every = compact_every
+        self.flush_every = flush_every
+        self._writes = 0
+        # Payload bytes stored; recounted from the table on every compaction
+        self._bytes = 0
+        # Read times not yet written to the table, by key
+        self._accessed: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            " key TEXT PRIMARY KEY,"
+            " value TEXT NOT NULL,"
+            " stored_at REAL NOT NULL,"
+            " expires_at REAL NOT NULL,"
+            " accessed_at REAL NOT NULL,"
+            " size INTEGER NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed_at)")
+        self._db.commit()
+        self.compact()
+
+    def get(self, key: str) -> Optional[Tuple[Any, float]]:
+        """Return (value, age in seconds) for an unexpired key"""
+        now = time.time()
+        with self._lock:
+            row = self._db.execute(
+                "SELECT value, stored_at FROM entries WHERE key = ? AND expires_at > ?",
+                (key, now)
+            ).fetchone()
+            if row is None:
+                return None
+            self._accessed[key] = now
+            if len(self._accessed) >= self.flush_every:
+                self._flush_accessed()
+        return json.loads(row[0]), max(0.0, now - row[1])
+
+    def set(self, key: str, value: Any, ttl: float, stored_at: Optional[float] = None):
+        payload = json.dumps(value)
+        now = time.time()
+        stored_at = now if stored_at is None else stored_at
+        with self._lock:
+            self._bytes += len(payload) - self._stored_size(key)
+            self._accessed.pop(key, None)
+            self._db.execute(
+                "INSERT OR REPLACE INTO entries"
+                " (key, value, stored_at, expires_at, accessed_at, size)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (key, payload, stored_at, stored_at + ttl, now, len(payload))
+            )
+            self._db.commit()
+            self._writes += 1
+            due = self._writes % self.compact_every == 0 or self._bytes > self.max_bytes
+        if due:
+            self.compact()
+
+    def delete(self, key: str):
+        with self._lock:
+            self._bytes -= self._stored_size(key)
+            self._accessed.pop(key, None)
+            self._db.execute("DELETE FROM entries WHERE key = ?", (key,))
+            self._db.commit()
+
+    def size_bytes(self) -> int:
+        with self._lock:
+            return self._bytes
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    def compact(self, vacuum: bool = False) -> Dict[str, int]:
+        """Drop expired entries, then least recently read ones until under budget"""
+        with self._lock:
+            # Eviction orders by read time, so buffered reads must land first
+            self._flush_accessed()
+            expired = self._db.execute(
+                "DELETE FROM entries WHERE expires_at <= ?", (time.time(),)
+            ).rowcount
+            evicted = 0
+            total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+            if total > self.max_bytes:
+                rows = self._db.execute(
+                    "SELECT key, size FROM entries ORDER BY accessed_at"
+                ).fetchall()
+                doomed = []
+                for key, size in rows:
+                    if total <= self.max_bytes:
+                        break
+                    doomed.append((key,))
+                    total -= size
+                self._db.executemany("DELETE FROM entries WHERE key = ?", doomed)
+                evicted = len(doomed)
+            self._db.commit()
+            self._bytes = total
+            if vacuum:
+                self._db.execute("VACUUM")
+        return {"expired": expired, "evicted": evicted}
+
+    def close(self):
+        with self._lock:
+            self._flush_accessed()
+            self._db.close()
+
+    def _stored_size(self, key: str) -> int:
+        row = self._db.execute("SELECT size FROM entries WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else 0
+
+    def _flush_accessed(self):
+        """Write buffered read times in one transaction; the caller holds the lock"""
+        if self._accessed:
+            self._db.executemany("UPDATE entries SET accessed_at = ? WHERE key = ?",
+                                 [(at, key) for key, at in self._accessed.items()])
+            self._db.commit()
+            self._accessed.clear()
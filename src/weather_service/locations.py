@@ -0,0 +1,93 @@
+from dataclasses import asdict, dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+import asyncio
+import re
+from .cache import DiskCache, InstrumentedTTLCache
+from .metrics import Metrics
+
+# Country spellings users commonly send that the geocoder does not treat as ISO codes
+COUNTRY_ALIASES = {"uk": "gb", "england": "gb", "scotland": "gb", "wales": "gb", "usa": "us"}
+
+def normalize_query(text: str) -> str:
+    """Reduce a free-form location string to a stable lookup form.
+
+    " London ", "london, GB" and "London,UK" all become "london,gb" or "london".
+    """
+    parts = [re.sub(r"\s+", " ", part).strip().lower() for part in text.split(",")]
+    parts = [part for part in parts if part]
+    if not parts:
+        raise ValueError("Location must not be empty")
+    if len(parts) > 1:
+        parts[-1] = COUNTRY_ALIASES.get(parts[-1], parts[-1])
+    return ",".join(parts)
+
+@dataclass(frozen=True)
+class Location:
+    id: str
+    name: str
+    country: str
+    lat: float
+    lon: float
+    state: Optional[str] = None
+
+    @classmethod
+    def from_geocode(cls, data: Dict[str, Any]) -> "Location":
+        parts = [data["name"], data.get("state"), data["country"]]
+        return cls(
+            id=",".join(part.lower() for part in parts if part),
+            name=data["name"],
+            country=data["country"],
+            lat=round(data["lat"], 4),
+            lon=round(data["lon"], 4),
+            state=data.get("state")
+        )
+
+class LocationResolver:
+    """Resolves location strings to canonical locations through a geocoder.
+
+    Resolutions rarely change, so they are cached for `ttl` seconds in memory
+    and, when a disk cache is given, on disk. Concurrent lookups of the same
+    query share one geocoding call through `inflight` if it is provided.
+    """
+
+    def __init__(self, geocode: Callable[[str], Awaitable[List[Dict[str, Any]]]],
+                 disk_cache: Optional[DiskCache] = None, ttl: float = 30 * 24 * 3600,
+                 maxsize: int = 10_000, inflight: Any = None,
+                 metrics: Optional[Metrics] = None):
+        self.geocode = geocode
+        self.disk_cache = disk_cache
+        self.ttl = ttl
+        self.inflight = inflight
+        self.metrics = metrics or Metrics()
+        self.resolved = InstrumentedTTLCache(maxsize=maxsize, ttl=ttl)
+
+    async def resolve(self, text: str) -> Location:
+        query = normalize_query(text)
+        location = self.resolved.get(query)
+        if location is not None:
+            self.metrics.inc("weather_cache_lookups_total", cache="locations", result="hit")
+            return location
+
+        key = f"geo:{query}"
+        if self.disk_cache is not None:
+            stored = await asyncio.to_thread(self.disk_cache.get, key)
+            if stored is not None:
+                location = Location(**stored[0])
+                self.resolved[query] = location
+                self.metrics.inc("weather_cache_lookups_total", cache="locations", result="disk_hit")
+                return location
+
+        self.metrics.inc("weather_cache_lookups_total", cache="locations", result="miss")
+        if self.inflight is None:
+            return await self._lookup(query, key)
+        return await self.inflight.do(key, lambda: self._lookup(query, key))
+
+    async def _lookup(self, query: str, key: str) -> Location:
+        matches = await self.geocode(query)
+        if not matches:
+            raise LookupError(f"Unknown location: {query}")
+        location = Location.from_geocode(matches[0])
+        self.resolved[query] = location
+        if self.disk_cache is not None:
+            await asyncio.to_thread(self.disk_cache.set, key, asdict(location), self.ttl)
+        return location
@@ -0,0 +1,120 @@
+from bisect import bisect_left
+from typing import Dict, List, Sequence, Tuple
+import threading
+
+Labels = Tuple[Tuple[str, str], ...]
+
+# Upper bounds in seconds; suits both cache-speed and upstream-speed latencies
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+def _labels(labels: Dict[str, str]) -> Labels:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+def _format_labels(labels: Labels, extra: Labels = ()) -> str:
+    pairs = labels + extra
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{v}"' for k, v in pairs) + "}"
+
+class Histogram:
+    """Cumulative-bucket latency histogram, as exported by Prometheus"""
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding the q-th quantile (inf past the last bucket)"""
+        if self.count == 0:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return float("inf")
+
+    def to_dict(self) -> Dict[str, float]:
+        return {
+            "count": self.count,
+            "sum": round(self.sum, 6),
+            "mean": round(self.sum / self.count, 6) if self.count else 0.0,
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+            "p99": self.quantile(0.99)
+        }
+
+class Metrics:
+    """In-process registry of labelled counters, gauges and histograms"""
+
+    def __init__(self):
+        self.counters: Dict[str, Dict[Labels, float]] = {}
+        self.gauges: Dict[str, Dict[Labels, float]] = {}
+        self.histograms: Dict[str, Dict[Labels, Histogram]] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, name: str, amount: float = 1, **labels: str):
+        key = _labels(labels)
+        with self._lock:
+            series = self.counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + amount
+
+    def set(self, name: str, value: float, **labels: str):
+        with self._lock:
+            self.gauges.setdefault(name, {})[_labels(labels)] = value
+
+    def observe(self, name: str, value: float, **labels: str):
+        key = _labels(labels)
+        with self._lock:
+            series = self.histograms.setdefault(name, {})
+            if key not in series:
+                series[key] = Histogram()
+            series[key].observe(value)
+
+    def value(self, name: str, **labels: str) -> float:
+        """Current value of a counter or gauge series (0 if never recorded)"""
+        key = _labels(labels)
+        for kind in (self.counters, self.gauges):
+            if name in kind and key in kind[name]:
+                return kind[name][key]
+        return 0
+
+    def snapshot(self) -> Dict[str, List[Dict]]:
+        """JSON-friendly view of every series"""
+        with self._lock:
+            result: Dict[str, List[Dict]] = {}
+            for kind in (self.counters, self.gauges):
+                for name, series in kind.items():
+                    result[name] = [{"labels": dict(k), "value": v} for k, v in series.items()]
+            for name, series in self.histograms.items():
+                result[name] = [{"labels": dict(k), **h.to_dict()} for k, h in series.items()]
+            return result
+
+    def render_prometheus(self) -> str:
+        """Export every series in the Prometheus text exposition format"""
+        lines = []
+        with self._lock:
+            for kind, type_name in ((self.counters, "counter"), (self.gauges, "gauge")):
+                for name, series in sorted(kind.items()):
+                    lines.append(f"# TYPE {name} {type_name}")
+                    for labels, value in sorted(series.items()):
+                        lines.append(f"{name}{_format_labels(labels)} {value}")
+            for name, series in sorted(self.histograms.items()):
+                lines.append(f"# TYPE {name} histogram")
+                for labels, histogram in sorted(series.items()):
+                    cumulative = 0
+                    for bound, count in zip(histogram.buckets + (float("inf"),), histogram.counts):
+                        cumulative += count
+                        le = "+Inf" if bound == float("inf") else repr(bound)
+                        lines.append(f"{name}_bucket{_format_labels(labels, (('le', le),))} {cumulative}")
+                    lines.append(f"{name}_sum{_format_labels(labels)} {histogram.sum}")
+                    lines.append(f"{name}_count{_format_labels(labels)} {histogram.count}")
+        return "\n".join(lines) + "\n"
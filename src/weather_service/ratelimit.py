@@ -0,0 +1,95 @@
+from pathlib import Path
+from typing import Callable, Optional, Tuple, TypeVar
+import asyncio
+import os
+import struct
+import time
+
+try:
+    import fcntl
+except ImportError:  # Not available on Windows
+    fcntl = None
+
+T = TypeVar("T")
+
+class RateLimiter:
+    """Token-bucket rate limiter implemented as GCRA.
+
+    The whole bucket state is one timestamp, the theoretical arrival time of
+    the next call, so every check is O(1). No window of `period` seconds ever
+    admits more than `calls` calls. Up to `burst` calls (default 1) may go
+    through at once; a larger burst spaces the remaining calls further apart,
+    `period / (calls - burst + 1)`, to stay within that cap. With
+    `shared_path` the timestamp lives in a small file guarded by an exclusive
+    lock, so every process on the host using the same path draws from one
+    quota.
+    """
+
+    def __init__(self, calls: int, period: float, burst: int = 1,
+                 shared_path: Optional[Path] = None):
+        if calls <= 0 or period <= 0:
+            raise ValueError("calls and period must be positive")
+        if not 1 <= burst <= calls:
+            raise ValueError("burst must be between 1 and calls")
+        self.calls = calls
+        self.period = period
+        self.interval = period / (calls - burst + 1)
+        self.tolerance = self.interval * (burst - 1)
+        self.shared_path = Path(shared_path) if shared_path else None
+        self._tat = 0.0
+        # Keeps reservations in arrival order while the file lock is taken off the loop
+        self._order = asyncio.Lock()
+        if self.shared_path is not None:
+            if fcntl is None:
+                raise RuntimeError("A shared rate limiter needs fcntl file locking")
+            self.shared_path.parent.mkdir(parents=True, exist_ok=True)
+
+    def can_call(self) -> Tuple[bool, float]:
+        """Take a call slot if one is free now; otherwise return the wait until one is"""
+        def decide(tat: float, now: float) -> Tuple[float, Tuple[bool, float]]:
+            start = max(now, tat - self.tolerance)
+            if start > now:
+                return tat, (False, start - now)
+            return max(tat, now) + self.interval, (True, 0)
+        return self._transact(decide)
+
+    def reserve(self) -> float:
+        """Claim the next call slot and return how long to wait before using it"""
+        def decide(tat: float, now: float) -> Tuple[float, float]:
+            start = max(now, tat - self.tolerance)
+            return max(tat, start) + self.interval, start - now
+        return self._transact(decide)
+
+    async def acquire(self) -> float:
+        """Wait for a call slot; callers are served in the order they arrive.
+
+        Slots are handed out on entry, so a cancelled waiter forfeits its slot
+        rather than letting later callers exceed the limit. Returns the time
+        waited in seconds.
+        """
+        if self.shared_path is None:
+            wait = self.reserve()
+        else:
+            # flock blocks while another process holds the quota file
+            async with self._order:
+                wait = await asyncio.to_thread(self.reserve)
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
+
+    def _transact(self, decide: Callable[[float, float], Tuple[float, T]]) -> T:
+        if self.shared_path is None:
+            self._tat, result = decide(self._tat, time.monotonic())
+            return result
+
+        # Wall-clock time so that every process agrees on the timeline
+        fd = os.open(self.shared_path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            raw = os.pread(fd, 8, 0)
+            tat = struct.unpack("d", raw)[0] if len(raw) == 8 else 0.0
+            tat, result = decide(tat, time.time())
+            os.pwrite(fd, struct.pack("d", tat), 0)
+            return result
+        finally:
+            os.close(fd)  # Also releases the lock
@@ -1,18 +1,27 @@
-from typing import Any, Dict, Optional, Tuple
-from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple, TypeVar
+from dataclasses import asdict, dataclass
+from pathlib import Path
+import asyncio
 import os
+import random
 import time
 import logging
 from datetime import datetime, timedelta
-import requests
+from urllib.parse import urljoin
+import httpx
 from mcp import Server, Resource, Tool
 from dotenv import load_dotenv
-from cachetools import TTLCache
+from .cache import DiskCache, RefreshingCache
+from .metrics import Metrics
+from .locations import Location, LocationResolver, normalize_query
+from .ratelimit import RateLimiter
 
 load_dotenv()
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+T = TypeVar("T")
+
 @dataclass
 class WeatherData:
     temperature: float
@@ -24,44 +33,196 @@ class WeatherData:
     clouds: int
     timestamp: datetime
 
-class RateLimiter:
-    def __init__(self, calls: int, period: int):
-        self.calls = calls
-        self.period = period
-        self.timestamps = []
+def serialize_weather(weather: WeatherData) -> Dict[str, Any]:
+    data = asdict(weather)
+    data["timestamp"] = weather.timestamp.isoformat()
+    return data
 
-    def can_call(self) -> Tuple[bool, float]:
-        now = time.time()
-        self.timestamps = [ts for ts in self.timestamps if now - ts < self.period]
-        
-        if len(self.timestamps) < self.calls:
-            self.timestamps.append(now)
-            return True, 0
-        
-        return False, self.period - (now - self.timestamps[0])
+def weather_payload(weather: WeatherData) -> Dict[str, Any]:
+    """Client-facing representation shared by the weather resource and tools"""
+    return {
+        "temperature": weather.temperature,
+        "description": weather.description,
+        "humidity": weather.humidity,
+        "wind_speed": weather.wind_speed,
+        "feels_like": weather.feels_like,
+        "pressure": weather.pressure,
+        "clouds": weather.clouds,
+        "last_updated": weather.timestamp.isoformat()
+    }
 
-class WeatherServer(Server):
+def deserialize_weather(data: Dict[str, Any]) -> WeatherData:
+    return WeatherData(**{**data, "timestamp": datetime.fromisoformat(data["timestamp"])})
+
+# Largest city list accepted by get_weather_bulk
+MAX_BULK_CITIES = 200
+
+# The 5-day/3-hour forecast endpoint returns at most this many slots
+FORECAST_SLOTS = 40
+
+def daily_forecasts(slots: List[Dict[str, Any]], days: int) -> List[Dict[str, Any]]:
+    """Downsample 3-hourly forecast slots to one entry per day.
+    
+    Each day is represented by its slot closest to midday, extended with the
+    day's minimum and maximum temperature across all of its slots. Days whose
+    slots do not span midday are skipped: a series fetched in the evening
+    starts with a few late slots of today and, since it covers a fixed five
+    days, ends with a full extra day that takes today's place.
+    """
+    by_date: Dict[str, List[Dict[str, Any]]] = {}
+    for slot in slots:
+        by_date.setdefault(slot["time"].split()[0], []).append(slot)
+    
+    forecasts = []
+    for date, day_slots in by_date.items():
+        if len(forecasts) == days:
+            break
+        hours = [int(slot["time"].split()[1][:2]) for slot in day_slots]
+        if not min(hours) <= 12 <= max(hours):
+            continue
+        midday = min(zip(hours, day_slots), key=lambda entry: abs(entry[0] - 12))[1]
+        forecast = {"date": date, **{k: v for k, v in midday.items() if k != "time"}}
+        temperatures = [slot["temperature"] for slot in day_slots]
+        forecast["temp_min"] = min(temperatures)
+        forecast["temp_max"] = max(temperatures)
+        forecasts.append(forecast)
+    return forecasts
+
+class SingleFlight:
+    """Coalesces concurrent calls for the same key into one in-flight call.
+    
+    Every caller waiting on a key receives the shared call's result or
+    exception. A cancelled waiter does not cancel the call for the others.
+    """
+    
     def __init__(self):
+        self.calls: Dict[str, asyncio.Future] = {}
+    
+    async def do(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        future = self.calls.get(key)
+        if future is None:
+            future = asyncio.ensure_future(fn())
+            self.calls[key] = future
+            future.add_done_callback(lambda done: self._forget(key, done))
+        return await asyncio.shield(future)
+    
+    def _forget(self, key: str, future: asyncio.Future):
+        if self.calls.get(key) is future:
+            del self.calls[key]
+        # Mark the exception retrieved even if every waiter was cancelled
+        if not future.cancelled():
+            future.exception()
+
+class UpstreamClient:
+    """Async HTTP client with a keep-alive connection pool and jittered backoff"""
+    
+    # Statuses worth retrying; other errors are returned to the caller immediately
+    RETRY_STATUSES = {429, 500, 502, 503, 504}
+    
+    def __init__(self, timeout: float = 10.0, max_connections: int = 20,
+                 max_keepalive_connections: int = 10, retries: int = 3,
+                 backoff: float = 0.5, max_backoff: float = 8.0):
+        self.timeout = httpx.Timeout(timeout)
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections
+        )
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self._client: Optional[httpx.AsyncClient] = None
+    
+    @property
+    def client(self) -> httpx.AsyncClient:
+        # Created lazily so the pool belongs to the loop that first uses it
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(timeout=self.timeout, limits=self.limits)
+        return self._client
+    
+    def retry_delay(self, attempt: int, response: Optional[httpx.Response] = None) -> float:
+        """Full-jitter exponential backoff, honouring Retry-After when given"""
+        if response is not None and "Retry-After" in response.headers:
+            try:
+                return min(self.max_backoff, float(response.headers["Retry-After"]))
+            except ValueError:
+                pass
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+    
+    async def get(self, url: str, params: Dict[str, Any],
+                  timeout: Optional[float] = None) -> httpx.Response:
+        """One GET on the pooled client; retries are up to the caller"""
+        return await self.client.get(
+            url, params=params,
+            timeout=httpx.Timeout(timeout) if timeout is not None else self.timeout
+        )
+    
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+class WeatherServer(Server):
+    def __init__(self, base_url: Optional[str] = None, timeout: float = 10.0,
+                 retries: int = 3, max_connections: int = 20,
+                 weather_ttl: Tuple[float, float] = (600, 1800),
+                 forecast_ttl: Tuple[float, float] = (1800, 3600),
+                 hot_hits: int = 5,
+                 cache_path: Optional[Path] = None,
+                 disk_cache_bytes: int = 64 * 1024 * 1024,
+                 rate_limit_path: Optional[Path] = None,
+                 bulk_concurrency: int = 10,
+                 geo_url: Optional[str] = None):
         super().__init__()
+        # Counters and latency histograms behind the `metrics` resource
+        self.metrics = Metrics()
         self.api_key = os.getenv("OPENWEATHER_API_KEY")
         if not self.api_key:
             raise ValueError("OPENWEATHER_API_KEY environment variable is required")
+        self.base_url = (base_url or os.getenv("OPENWEATHER_BASE_URL")
+                         or "http://api.openweathermap.org/data/2.5").rstrip("/")
+        # The geocoding API lives next to the data API on the same host
+        self.geo_url = (geo_url or os.getenv("OPENWEATHER_GEO_URL")
+                        or urljoin(self.base_url, "/geo/1.0")).rstrip("/")
+        # Shared keep-alive pool for all upstream calls
+        self.http = UpstreamClient(timeout=timeout, retries=retries,
+                                   max_connections=max_connections)
         
-        # Cache for weather data (30 minutes TTL)
-        self.weather_cache = TTLCache(maxsize=100, ttl=1800)
-        # Cache for forecast data (1 hour TTL)
-        self.forecast_cache = TTLCache(maxsize=100, ttl=3600)
+        # Cache for weather data (refresh after 10 minutes, expire after 30)
+        self.weather_cache = RefreshingCache(maxsize=100, soft_ttl=weather_ttl[0],
+                                             hard_ttl=weather_ttl[1], hot_hits=hot_hits,
+                                             name="weather")
+        # Cache for forecast data (refresh after 30 minutes, expire after 1 hour)
+        self.forecast_cache = RefreshingCache(maxsize=100, soft_ttl=forecast_ttl[0],
+                                              hard_ttl=forecast_ttl[1], hot_hits=hot_hits,
+                                              name="forecast")
         # Rate limiter (60 calls per minute)
-        self.rate_limiter = RateLimiter(calls=60, period=60)
+        # Point several server processes at one file to share the upstream quota
+        rate_limit_path = rate_limit_path or os.getenv("OPENWEATHER_RATE_LIMIT_FILE")
+        self.rate_limiter = RateLimiter(calls=60, period=60, shared_path=rate_limit_path)
+        # Persistent L2 behind both in-memory caches, so restarts start warm
+        cache_path = cache_path or os.getenv("WEATHER_CACHE_PATH")
+        self.disk_cache = DiskCache(Path(cache_path), max_bytes=disk_cache_bytes) if cache_path else None
+        # Concurrent cache misses for one key share a single upstream call
+        self.inflight = SingleFlight()
+        # City strings resolve to canonical locations, which key both caches
+        self.locations = LocationResolver(self.geocode, disk_cache=self.disk_cache,
+                                          inflight=self.inflight, metrics=self.metrics)
+        # Background refreshes, kept referenced until they finish
+        self.refreshes: set = set()
+        self.bulk_concurrency = bulk_concurrency
         
         # Register resources
         self.register_resource("current_weather", self.get_current_weather)
+        self.register_resource("metrics", self.get_metrics)
         
         # Register tools
         self.register_tool(
             Tool(
                 name="get_forecast",
-                description="Get weather forecast for a specific city",
+                description=("Get weather forecast for a specific city, one entry per day "
+                             "represented by its midday forecast with the day's min and max "
+                             "temperature. Days the forecast does not cover through midday, "
+                             "such as the rest of today when asked in the evening, are skipped"),
                 parameters={
                     "city": {
                         "type": "string",
@@ -77,40 +238,193 @@ class WeatherServer(Server):
                 handler=self.get_forecast
             )
         )
+        self.register_tool(
+            Tool(
+                name="get_weather_bulk",
+                description="Get current weather for many cities in one call",
+                parameters={
+                    "cities": {
+                        "type": "array",
+                        "items": {"type": "string"},
+                        "description": f"City names (at most {MAX_BULK_CITIES})",
+                        "maxItems": MAX_BULK_CITIES
+                    }
+                },
+                handler=self.get_weather_bulk
+            )
+        )
 
-    async def make_api_call(self, url: str, params: Dict[str, Any]) -> Dict[str, Any]:
-        """Make rate-limited API call"""
-        can_call, wait_time = self.rate_limiter.can_call()
+    async def make_api_call(self, url: str, params: Dict[str, Any],
+                            timeout: Optional[float] = None) -> Dict[str, Any]:
+        """Make rate-limited API call without blocking the event loop.
         
-        if not can_call:
-            logger.warning(f"Rate limit reached, waiting {wait_time:.2f} seconds")
-            time.sleep(wait_time)
+        Transport errors and retryable statuses are retried with backoff, and
+        every attempt, retries included, takes its own rate-limit token.
+        """
+        endpoint = url.rsplit("/", 1)[-1]
+        retries = self.http.retries
+        for attempt in range(retries + 1):
+            wait_time = await self.rate_limiter.acquire()
+            self.metrics.observe("weather_rate_limit_wait_seconds", wait_time)
+            if wait_time > 0:
+                logger.warning(f"Rate limit reached, waited {wait_time:.2f} seconds")
+            
+            response = None
+            started = time.perf_counter()
+            try:
+                try:
+                    response = await self.http.get(url, params, timeout=timeout)
+                    if response.status_code in self.http.RETRY_STATUSES and attempt < retries:
+                        self.metrics.inc("weather_upstream_requests_total", endpoint=endpoint,
+                                         outcome="retry")
+                    else:
+                        response.raise_for_status()
+                        try:
+                            data = response.json()
+                        except ValueError as e:
+                            raise httpx.DecodingError(f"Invalid JSON from upstream: {e}",
+                                                      request=response.request) from e
+                        self.metrics.inc("weather_upstream_requests_total", endpoint=endpoint,
+                                         outcome="ok")
+                        return data
+                finally:
+                    self.metrics.observe("weather_upstream_latency_seconds",
+                                         time.perf_counter() - started, endpoint=endpoint)
+            except httpx.TransportError as e:
+                if attempt == retries:
+                    self._upstream_failed(endpoint, e)
+                    raise
+                self.metrics.inc("weather_upstream_requests_total", endpoint=endpoint, outcome="retry")
+            except httpx.HTTPError as e:
+                self._upstream_failed(endpoint, e)
+                raise
+            
+            delay = self.http.retry_delay(attempt, response)
+            logger.warning(f"Upstream call failed (attempt {attempt + 1}), retrying in {delay:.2f}s")
+            await asyncio.sleep(delay)
+
+    def _upstream_failed(self, endpoint: str, error: Exception):
+        self.metrics.inc("weather_upstream_requests_total", endpoint=endpoint, outcome="error")
+        logger.error(f"API call failed: {str(error)}")
+
+    async def geocode(self, query: str) -> List[Dict[str, Any]]:
+        """Look a location string up with the geocoding API"""
+        url = f"{self.geo_url}/direct"
+        return await self.make_api_call(url, {"q": query, "limit": 1, "appid": self.api_key})
+
+    async def aclose(self):
+        """Stop background refreshes, then close the upstream connection pool"""
+        tasks = list(self.refreshes)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await self.http.aclose()
+        if self.disk_cache is not None:
+            self.disk_cache.close()
+
+    async def cached_fetch(self, cache: RefreshingCache, key: str,
+                           fetch: Callable[[], Awaitable[T]],
+                           decode: Callable[[Any], T] = lambda data: data) -> Tuple[T, bool]:
+        """Look a key up in L1, then L2, then upstream; returns (value, was_cached).
         
-        try:
-            response = requests.get(url, params=params, timeout=10)
-            response.raise_for_status()
-            return response.json()
-        except requests.RequestException as e:
-            logger.error(f"API call failed: {str(e)}")
-            raise
-
-    def get_weather_data(self, city: str = "London") -> WeatherData:
-        """Fetch current weather data from OpenWeatherMap API with caching"""
-        cache_key = f"weather:{city.lower()}"
+        Entries found in L2 are promoted into L1 with their original age, so
+        soft-TTL refreshes still apply to data that survived a restart.
+        """
+        value, refresh = cache.lookup(key)
+        result = "stale" if refresh else "hit"
+        if value is None and self.disk_cache is not None:
+            stored = await asyncio.to_thread(self.disk_cache.get, key)
+            if stored is not None and stored[1] < cache.hard_ttl:
+                data, age = stored
+                value = decode(data)
+                cache.store(key, value, age=age)
+                refresh = age >= cache.soft_ttl
+                result = "disk_hit"
+        
+        if value is None:
+            result = "miss"
+        self.metrics.inc("weather_cache_lookups_total", cache=cache.name, result=result)
+        if value is not None:
+            if refresh:
+                self.refresh_in_background(key, fetch)
+            return value, True
+        return await self.inflight.do(key, fetch), False
+
+    async def store(self, cache: RefreshingCache, key: str, value: Any, encoded: Any):
+        """Write a fresh value to L1 and, if configured, L2"""
+        cache.store(key, value)
+        if self.disk_cache is not None:
+            await asyncio.to_thread(self.disk_cache.set, key, encoded, cache.hard_ttl)
+
+    def refresh_in_background(self, key: str, fetch: Callable[[], Awaitable[Any]]):
+        """Refresh a cache key without making the current caller wait"""
+        if key in self.inflight.calls:
+            return
+        
+        async def refresh():
+            try:
+                await self.inflight.do(key, fetch)
+            except Exception as e:
+                logger.warning(f"Background refresh of {key} failed: {str(e)}")
         
-        if cache_key in self.weather_cache:
-            logger.info(f"Cache hit for {city} weather data")
-            return self.weather_cache[cache_key]
+        task = asyncio.ensure_future(refresh())
+        self.refreshes.add(task)
+        task.add_done_callback(self.refreshes.discard)
+
+    def collect_metrics(self) -> Metrics:
+        """Refresh point-in-time gauges and return the registry"""
+        caches = {
+            self.weather_cache.name: self.weather_cache.entries,
+            self.forecast_cache.name: self.forecast_cache.entries,
+            "locations": self.locations.resolved
+        }
+        for name, entries in caches.items():
+            self.metrics.set("weather_cache_entries", len(entries), cache=name)
+            self.metrics.set("weather_cache_evictions", entries.evictions, cache=name)
+            self.metrics.set("weather_cache_expirations", entries.expirations, cache=name)
+        if self.disk_cache is not None:
+            self.metrics.set("weather_disk_cache_bytes", self.disk_cache.size_bytes())
+        self.metrics.set("weather_inflight_calls", len(self.inflight.calls))
+        return self.metrics
+
+    async def get_metrics(self, params: Optional[Dict[str, Any]] = None) -> Resource:
+        """Resource handler for service metrics, as JSON or Prometheus text"""
+        metrics = self.collect_metrics()
+        if params and params.get("format") == "prometheus":
+            return Resource(data=metrics.render_prometheus(),
+                            metadata={"content_type": "text/plain; version=0.0.4"})
+        return Resource(data=metrics.snapshot(), metadata={"format": "json"})
+
+    async def lookup_weather(self, city: str) -> Tuple[Location, WeatherData, bool]:
+        """Resolve a city and return (location, weather, whether it came from cache)"""
+        location = await self.locations.resolve(city)
+        cache_key = f"weather:{location.id}"
         
-        logger.info(f"Fetching weather data for {city}")
-        url = "http://api.openweathermap.org/data/2.5/weather"
+        weather, cached = await self.cached_fetch(
+            self.weather_cache, cache_key,
+            lambda: self._fetch_weather(location, cache_key),
+            deserialize_weather
+        )
+        if cached:
+            logger.info(f"Cache hit for {location.id} weather data")
+        return location, weather, cached
+
+    async def get_weather_data(self, city: str = "London") -> WeatherData:
+        """Fetch current weather data from OpenWeatherMap API with caching"""
+        _, weather, _ = await self.lookup_weather(city)
+        return weather
+
+    async def _fetch_weather(self, location: Location, cache_key: str) -> WeatherData:
+        logger.info(f"Fetching weather data for {location.id}")
+        url = f"{self.base_url}/weather"
         params = {
-            "q": city,
+            "lat": location.lat,
+            "lon": location.lon,
             "appid": self.api_key,
             "units": "metric"
         }
         
-        data = self.make_api_call(url, params)
+        data = await self.make_api_call(url, params)
         
         weather_data = WeatherData(
             temperature=data["main"]["temp"],
@@ -123,80 +437,132 @@ class WeatherServer(Server):
             timestamp=datetime.fromtimestamp(data["dt"])
         )
         
-        self.weather_cache[cache_key] = weather_data
+        await self.store(self.weather_cache, cache_key, weather_data,
+                         serialize_weather(weather_data))
         return weather_data
 
     async def get_current_weather(self, params: Optional[Dict[str, Any]] = None) -> Resource:
         """Resource handler for current weather"""
         try:
             city = params.get("city", "London") if params else "London"
-            weather = self.get_weather_data(city)
+            location, weather, cached = await self.lookup_weather(city)
             
             return Resource(
-                data={
-                    "temperature": weather.temperature,
-                    "description": weather.description,
-                    "humidity": weather.humidity,
-                    "wind_speed": weather.wind_speed,
-                    "feels_like": weather.feels_like,
-                    "pressure": weather.pressure,
-                    "clouds": weather.clouds,
-                    "last_updated": weather.timestamp.isoformat()
-                },
+                data=weather_payload(weather),
                 metadata={
                     "city": city,
+                    "location": location.id,
                     "unit": "metric",
-                    "cached": city.lower() in self.weather_cache
+                    "cached": cached
                 }
             )
         except Exception as e:
             logger.error(f"Error getting weather: {str(e)}")
             return Resource(error=str(e))
 
-    async def get_forecast(self, city: str, days: int) -> Dict[str, Any]:
-        """Tool handler for weather forecast with caching"""
-        cache_key = f"forecast:{city.lower()}:{days}"
+    async def get_weather_bulk(self, cities: List[str]) -> Dict[str, Any]:
+        """Tool handler for current weather of many cities at once.
         
-        if cache_key in self.forecast_cache:
-            logger.info(f"Cache hit for {city} forecast data")
-            return self.forecast_cache[cache_key]
+        Cached cities are answered immediately. Misses are de-duplicated and
+        fetched concurrently, at most `bulk_concurrency` at a time and still
+        paced by the rate limiter. One city failing does not fail the others.
+        """
+        if len(cities) > MAX_BULK_CITIES:
+            return {"error": f"At most {MAX_BULK_CITIES} cities per request, got {len(cities)}"}
         
-        logger.info(f"Fetching forecast data for {city}")
-        url = "http://api.openweathermap.org/data/2.5/forecast"
-        params = {
-            "q": city,
-            "appid": self.api_key,
-            "units": "metric",
-            "cnt": days * 8
-        }
+        # One lookup per distinct query; spellings that resolve to the same
+        # location then share a single fetch through the in-flight table
+        queries: Dict[str, Any] = {}
+        for city in cities:
+            try:
+                queries[city] = normalize_query(city)
+            except ValueError as e:
+                queries[city] = e
+        distinct = list(dict.fromkeys(q for q in queries.values() if isinstance(q, str)))
+        
+        semaphore = asyncio.Semaphore(self.bulk_concurrency)
         
+        async def lookup(query: str) -> Tuple[Location, WeatherData, bool]:
+            location = self.locations.resolved.get(query)
+            if location is not None and f"weather:{location.id}" in self.weather_cache:
+                return await self.lookup_weather(query)
+            async with semaphore:
+                return await self.lookup_weather(query)
+        
+        outcomes = await asyncio.gather(
+            *(lookup(query) for query in distinct), return_exceptions=True
+        )
+        by_query = dict(zip(distinct, outcomes))
+        
+        results: Dict[str, Any] = {}
+        errors: Dict[str, str] = {}
+        for city, query in queries.items():
+            outcome = query if isinstance(query, Exception) else by_query[query]
+            if isinstance(outcome, BaseException):
+                errors[city] = str(outcome)
+            else:
+                results[city] = weather_payload(outcome[1])
+        return {
+            "results": results,
+            "errors": errors,
+            "unit": "metric",
+            "unique_cities": len({
+                outcome[0].id for outcome in outcomes if not isinstance(outcome, BaseException)
+            })
+        }
+
+    async def get_forecast(self, city: str, days: int) -> Dict[str, Any]:
+        """Tool handler for weather forecast with caching"""
         try:
-            data = self.make_api_call(url, params)
-            
-            daily_forecasts = []
-            for i in range(0, len(data["list"]), 8):
-                day_data = data["list"][i]
-                forecast = {
-                    "date": day_data["dt_txt"].split()[0],
-                    "temperature": day_data["main"]["temp"],
-                    "feels_like": day_data["main"]["feels_like"],
-                    "description": day_data["weather"][0]["description"],
-                    "humidity": day_data["main"]["humidity"],
-                    "pressure": day_data["main"]["pressure"],
-                    "wind_speed": day_data["wind"]["speed"],
-                    "clouds": day_data["clouds"]["all"]
-                }
-                daily_forecasts.append(forecast)
-            
-            result = {
+            location = await self.locations.resolve(city)
+            # Every forecast length is cut from one cached 5-day series per location
+            cache_key = f"forecast:{location.id}"
+            series, cached = await self.cached_fetch(
+                self.forecast_cache, cache_key,
+                lambda: self._fetch_forecast(location, cache_key)
+            )
+            if cached:
+                logger.info(f"Cache hit for {location.id} forecast data")
+            return {
                 "city": city,
-                "forecasts": daily_forecasts,
-                "generated_at": datetime.now().isoformat()
+                "location": location.id,
+                "forecasts": daily_forecasts(series["slots"], days),
+                "generated_at": series["generated_at"]
             }
-            
-            self.forecast_cache[cache_key] = result
-            return result
-            
         except Exception as e:
             logger.error(f"Error getting forecast: {str(e)}")
-            return {"error": str(e)} 
\ No newline at end of file
+            return {"error": str(e)} 
+
+    async def _fetch_forecast(self, location: Location, cache_key: str) -> Dict[str, Any]:
+        logger.info(f"Fetching forecast data for {location.id}")
+        url = f"{self.base_url}/forecast"
+        params = {
+            "lat": location.lat,
+            "lon": location.lon,
+            "appid": self.api_key,
+            "units": "metric",
+            "cnt": FORECAST_SLOTS
+        }
+        
+        data = await self.make_api_call(url, params)
+        
+        slots = [
+            {
+                "time": slot["dt_txt"],
+                "temperature": slot["main"]["temp"],
+                "feels_like": slot["main"]["feels_like"],
+                "description": slot["weather"][0]["description"],
+                "humidity": slot["main"]["humidity"],
+                "pressure": slot["main"]["pressure"],
+                "wind_speed": slot["wind"]["speed"],
+                "clouds": slot["clouds"]["all"]
+            }
+            for slot in data["list"]
+        ]
+        series = {
+            "slots": slots,
+            "generated_at": datetime.now().isoformat()
+        }
+        
+        await self.store(self.forecast_cache, cache_key, series, series)
+        return series
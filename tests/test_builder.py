@@ -0,0 +1,65 @@
+import time
+import uuid
+import pytest
+from megadev.builder import CONFIG_RANGES, OrganizationBuilder, OrganizationSpec
+from megadev.hierarchy import ReportingGraph
+from megadev.models import EDUCATION_LEVELS, SKILLS
+from megadev.organization import OrganizationRegistry
+
+@pytest.fixture
+def spec():
+    return OrganizationSpec(name="Eng", headcount=1003, division_size=250, squad_size=4,
+                            span_of_control=3)
+
+def test_department_shape(spec):
+    department = OrganizationBuilder(seed=1).build_department(spec)
+    
+    assert department.size == 1003
+    assert [division.size for division in department.divisions] == [250, 250, 250, 250, 3]
+    assert all(len(squad.agents) <= 4 for d in department.divisions for squad in d.squads)
+    assert len(department.divisions[0].squads) == 63
+    
+    registry = OrganizationRegistry([department])
+    assert len(registry) == 1003
+
+def test_agents_are_valid(spec):
+    department = OrganizationBuilder(seed=2).build_department(spec)
+    agents = [agent for d in department.divisions for s in d.squads for agent in s.agents]
+    
+    assert len({agent.id for agent in agents}) == len(agents)
+    assert all(uuid.UUID(agent.id).version == 4 for agent in agents)
+    for name, (low, high) in CONFIG_RANGES.items():
+        assert all(low <= getattr(agent.config, name) <= high for agent in agents)
+    assert all(isinstance(agent.config.attention_span, int) for agent in agents)
+    background = agents[0].background
+    assert background.education in EDUCATION_LEVELS
+    assert 2 <= len(background.skills) <= 5 and set(background.skills) <= set(SKILLS)
+
+def test_reporting_lines(spec):
+    department = OrganizationBuilder(seed=3).build_department(spec)
+    graph = ReportingGraph.from_department(department)
+    leader = department.leader
+    
+    assert graph.headcount(leader.id) == 1002
+    assert graph.span_of_control(department.divisions[1].leader.id) == 3
+    assert max(graph.span_of_control(agent_id) for agent_id in graph.ids) == 3 + 4
+    for division in department.divisions:
+        for agent in division.squads[-1].agents:
+            if agent.supervisor_id:
+                assert agent.id in graph.direct_reports(agent.supervisor_id)
+
+def test_seeded_builds_are_reproducible(spec):
+    first = OrganizationBuilder(seed=4).build_department(spec)
+    second = OrganizationBuilder(seed=4).build_department(spec)
+    
+    agents = lambda d: [(a.id, a.config) for s in d.divisions[0].squads for a in s.agents]
+    assert agents(first) == agents(second)
+
+def test_full_department_builds_quickly():
+    started = time.perf_counter()
+    department = OrganizationBuilder(seed=5).build_department(OrganizationSpec())
+    elapsed = time.perf_counter() - started
+    
+    assert department.size == 100_000
+    assert len(department.divisions) == 10
+    assert elapsed < 5  # About a second on a typical machine
@@ -0,0 +1,51 @@
+import json
+from megadev.cache import ResponseCache, estimate_bytes
+
+def test_hit_requires_matching_version():
+    cache = ResponseCache()
+    cache.put("population", {"a": 1}, 1, "response", {"squads": []})
+
+    assert cache.get("population", {"a": 1}, 1).response == "response"
+    assert cache.get("population", {"a": 1}, 2) is None
+    assert cache.get("population", {"a": 2}, 1) is None
+    assert cache.hits == 1 and cache.misses == 2
+
+def test_size_is_charged_once():
+    cache = ResponseCache()
+    entry = cache.put("best_squad", None, 1, "response", {"fitness": 1.5})
+
+    assert entry.size == len('{"fitness": 1.5}')
+    assert cache.get("best_squad", {}, 1) is entry
+    assert cache.bytes == entry.size
+
+def test_size_estimate_samples_long_lists():
+    squads = [{"id": f"{i:036d}", "fitness": 0.5, "agents": 5} for i in range(10_000)]
+    data = {"generation": 3, "squads": squads}
+
+    actual = len(json.dumps(data))
+    assert abs(estimate_bytes(data) - actual) < actual * 0.01
+
+def test_memory_budget_evicts_least_recently_used():
+    cache = ResponseCache(max_bytes=50)
+    cache.put("r", {"i": 1}, 0, 1, {"value": "x" * 10})
+    cache.put("r", {"i": 2}, 0, 2, {"value": "x" * 10})
+    cache.get("r", {"i": 1}, 0)
+    cache.put("r", {"i": 3}, 0, 3, {"value": "x" * 10})
+
+    assert cache.get("r", {"i": 2}, 0) is None
+    assert cache.get("r", {"i": 1}, 0) is not None
+    assert cache.evictions == 1
+    assert cache.bytes <= 50
+
+    cache.put("r", {"i": 4}, 0, 4, {"value": "x" * 100})
+    assert cache.get("r", {"i": 4}, 0) is None
+
+def test_invalidate_keeps_current_version():
+    cache = ResponseCache()
+    cache.put("r", None, 1, "old", {})
+    cache.put("r", None, 2, "new", {})
+
+    cache.invalidate(keep_version=2)
+    assert len(cache) == 1
+    assert cache.get("r", None, 2).response == "new"
+    assert cache.bytes == 2
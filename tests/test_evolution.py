@@ -1,3 +1,4 @@
+import json
 import pytest
 from megadev.evolution import EvolutionEngine
 from megadev.models import AgentConfig, Agent, Squad
@@ -75,4 +76,51 @@ def test_multiple_generations(evolution_engine):
             squad.fitness_score = float(len(squad.agents))
         
         population = evolution_engine.evolve_population(population)
-        assert evolution_engine.generation == gen + 1 
\ No newline at end of file
+        assert evolution_engine.generation == gen + 1 
+
+
+def _evolve(engine, population, generations):
+    for _ in range(generations):
+        for i, squad in enumerate(population):
+            squad.fitness_score = float(i % 3)
+        population = engine.evolve_population(population)
+    return population
+
+
+def _genomes(population):
+    return [(squad.id, [(agent.id, vars(agent.config)) for agent in squad.agents])
+            for squad in population]
+
+
+def test_seeded_engines_are_reproducible():
+    first = EvolutionEngine(population_size=4, elite_size=1, seed=7)
+    second = EvolutionEngine(population_size=4, elite_size=1, seed=7)
+    
+    a = _evolve(first, first.create_initial_population(), 3)
+    b = _evolve(second, second.create_initial_population(), 3)
+    assert _genomes(a) == _genomes(b)
+
+
+def test_checkpoint_restore_continues_identically():
+    engine = EvolutionEngine(population_size=4, elite_size=1, seed=11)
+    engine.stream("fitness").random()
+    population = _evolve(engine, engine.create_initial_population(), 2)
+    
+    state = json.loads(json.dumps(engine.checkpoint()))
+    restored = EvolutionEngine.restore(state)
+    assert restored.generation == 2
+    assert restored.stream("fitness").random() == engine.stream("fitness").random()
+    
+    assert _genomes(_evolve(restored, list(population), 2)) == \
+        _genomes(_evolve(engine, list(population), 2))
+
+
+def test_streams_are_independent():
+    engine = EvolutionEngine(seed=3)
+    worker = [engine.stream("worker-1").random() for _ in range(3)]
+    
+    other = EvolutionEngine(seed=3)
+    other.stream("worker-0").random()
+    other.rng.random()
+    assert [other.stream("worker-1").random() for _ in range(3)] == worker
+    assert engine.stream("worker-0") is not engine.stream("worker-1")
@@ -0,0 +1,70 @@
+import dataclasses
+import pytest
+from megadev.fitness_cache import FitnessCache, FitnessFunction
+from megadev.models import Agent
+from megadev.server import MegaDevServer
+
+def counting_function(noise=None):
+    calls = []
+    def evaluate(config):
+        calls.append(config)
+        return config.learning_rate + config.attention_span
+    return FitnessFunction("test", evaluate, noise), calls
+
+def test_identical_configs_are_evaluated_once():
+    cache = FitnessCache()
+    function, calls = counting_function()
+    config = Agent.create_random("A").config
+    twin = dataclasses.replace(config, learning_rate=config.learning_rate + 1e-12)
+
+    assert cache.score(config, function) == cache.score(twin, function)
+    assert len(calls) == 1
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+
+    other, other_calls = counting_function()
+    cache.score(config, dataclasses.replace(other, id="other"))
+    assert len(other_calls) == 1  # Keys include the function id
+
+def test_lru_eviction():
+    cache = FitnessCache(max_entries=2)
+    function, calls = counting_function()
+    configs = [Agent.create_random(f"A{i}").config for i in range(3)]
+
+    cache.score(configs[0], function)
+    cache.score(configs[1], function)
+    cache.score(configs[0], function)  # Now most recently used
+    cache.score(configs[2], function)
+
+    assert cache.evictions == 1
+    cache.score(configs[0], function)
+    assert len(calls) == 3
+    cache.score(configs[1], function)
+    assert len(calls) == 4
+
+def test_noise_is_reapplied_to_cached_value():
+    factors = iter([0.5, 2.0])
+    function, calls = counting_function(noise=lambda: next(factors))
+    cache = FitnessCache()
+    config = Agent.create_random("A").config
+    base = config.learning_rate + config.attention_span
+
+    assert cache.score(config, function) == pytest.approx(base * 0.5)
+    assert cache.score(config, function) == pytest.approx(base * 2.0)
+    assert len(calls) == 1
+
+@pytest.mark.asyncio
+async def test_server_memoizes_elites(tmp_path):
+    function, calls = counting_function()
+    server = MegaDevServer(session_dir=tmp_path, fitness_function=function)
+    try:
+        await server.initialize_population(population_size=10, squad_size=5)
+
+        await server.evolve_generation()
+        first = len(calls)
+        result = await server.evolve_generation()
+
+        assert result["status"] == "success"
+        assert server.fitness_cache.hits >= 2 * 5  # Both elite squads were not re-evaluated
+        assert len(calls) - first <= 40
+    finally:
+        await server.close()
@@ -0,0 +1,80 @@
+import copy
+import random
+import pytest
+from megadev.fitness_index import FitnessIndex
+from megadev.models import Squad
+
+@pytest.fixture
+def squads():
+    population = [Squad.create_random(f"Squad-{i}", size=1) for i in range(50)]
+    for squad in population:
+        squad.fitness_score = random.random()
+    return population
+
+def ranked(squads):
+    return sorted(squads, key=lambda s: s.fitness_score, reverse=True)
+
+def test_rebuild_matches_sort(squads):
+    index = FitnessIndex(squads)
+
+    assert len(index) == len(squads)
+    assert index.best() is ranked(squads)[0]
+    assert index.top(10) == ranked(squads)[:10]
+    assert list(index) == ranked(squads)
+
+def test_tracks_fitness_assignment(squads):
+    index = FitnessIndex(squads)
+    version = index.version
+
+    squads[7].fitness_score = 10.0
+    assert index.best() is squads[7]
+    assert index.rank(squads[7].id) == 1
+    assert index.version > version
+
+    squads[7].fitness_score = -1.0
+    assert index.rank(squads[7].id) == len(squads)
+    assert list(index) == ranked(squads)
+
+def test_rank_select_and_percentile(squads):
+    index = FitnessIndex(squads)
+
+    for rank, squad in enumerate(ranked(squads), 1):
+        assert index.rank(squad.id) == rank
+        assert index.select(rank) is squad
+
+    best = index.best()
+    assert index.percentile(best.id) == 100.0
+    assert index.percentile(index.select(len(squads)).id) == pytest.approx(100.0 / len(squads))
+    assert index.rank("missing") is None
+    assert index.select(0) is None
+
+def test_remove_and_truncate(squads):
+    index = FitnessIndex(squads)
+    worst = ranked(squads)[-1]
+
+    assert index.remove(worst.id) is worst
+    assert worst.id not in index
+    worst.fitness_score = 100.0  # No longer tracked
+    assert index.best() is not worst
+
+    removed = index.truncate(10)
+    assert len(index) == 10
+    assert len(removed) == len(squads) - 11
+    assert list(index) == ranked(squads)[1:11]
+
+    removed[0].fitness_score = 100.0
+    assert removed[0].id not in index
+
+def test_ties_keep_insertion_order():
+    population = [Squad.create_random(f"Squad-{i}", size=1) for i in range(5)]
+    index = FitnessIndex(population)
+
+    assert list(index) == population
+
+def test_copies_are_not_tracked(squads):
+    index = FitnessIndex(squads)
+    clone = copy.deepcopy(squads[0])
+
+    clone.fitness_score = 100.0
+    assert index.best() is not clone
+    assert len(index) == len(squads)
@@ -0,0 +1,83 @@
+import numpy as np
+import pytest
+from megadev.hierarchy import ROOT, ReportingGraph
+from megadev.models import Agent, Squad
+from megadev.organization import Department, Division
+
+def _org_chart():
+    #        ceo
+    #      /     \
+    #   cto       cfo
+    #  /   \        \
+    # dev1 dev2   analyst
+    #  |
+    # intern
+    ids = ["ceo", "cto", "cfo", "dev1", "dev2", "analyst", "intern"]
+    parent = [ROOT, 0, 0, 1, 1, 2, 3]
+    return ReportingGraph(ids, np.array(parent))
+
+def test_direct_and_indirect_reports():
+    graph = _org_chart()
+    
+    assert graph.supervisor("dev1") == "cto"
+    assert graph.supervisor("ceo") is None
+    assert graph.direct_reports("cto") == ["dev1", "dev2"]
+    assert graph.span_of_control("ceo") == 2
+    assert graph.span_of_control("intern") == 0
+    assert sorted(graph.descendants("cto")) == ["dev1", "dev2", "intern"]
+    assert graph.headcount("ceo") == 6
+
+def test_chain_of_command():
+    graph = _org_chart()
+    
+    assert graph.chain_of_command("intern") == ["dev1", "cto", "ceo"]
+    assert graph.depth("intern") == 3
+    assert graph.reports_to("intern", "cto")
+    assert not graph.reports_to("analyst", "cto")
+    assert not graph.reports_to("cto", "cto")
+
+def test_reassign_moves_subtree():
+    graph = _org_chart()
+    graph.reassign({"dev1": "cfo"})
+    
+    assert graph.chain_of_command("intern") == ["dev1", "cfo", "ceo"]
+    assert graph.headcount("cfo") == 3
+    assert graph.direct_reports("cto") == ["dev2"]
+
+def test_cycles_rejected():
+    graph = _org_chart()
+    with pytest.raises(ValueError, match="cycle"):
+        graph.reassign({"cto": "intern"})
+    assert graph.supervisor("cto") == "ceo"
+    
+    with pytest.raises(ValueError, match="cycle"):
+        ReportingGraph(["a", "b"], np.array([1, 0]))
+
+def test_from_department_keeps_agents_in_sync():
+    lead = Agent.create_random("Lead")
+    squad = Squad.create_random("Squad", size=3)
+    for agent in squad.agents:
+        agent.supervisor_id = lead.id
+        lead.subordinate_ids.append(agent.id)
+    division = Division(name="Division", squads=[squad], leader=lead)
+    graph = ReportingGraph.from_department(Department(name="Department", divisions=[division]))
+    
+    assert graph.headcount(lead.id) == 3
+    
+    member, other = squad.agents[:2]
+    graph.reassign({member.id: other.id})
+    assert member.supervisor_id == other.id
+    assert member.id in other.subordinate_ids
+    assert member.id not in lead.subordinate_ids
+
+def test_large_hierarchy():
+    rng = np.random.default_rng(0)
+    n = 100_000
+    parent = np.concatenate([[ROOT], rng.integers(0, np.arange(1, n) // 2 + 1)])
+    graph = ReportingGraph([f"agent-{i}" for i in range(n)], parent)
+    
+    assert graph.headcount("agent-0") == n - 1
+    assert graph.size.sum() == (graph.depth_of + 1).sum()
+    leaf = f"agent-{n - 1}"
+    chain = graph.chain_of_command(leaf)
+    assert len(chain) == graph.depth(leaf) and chain[-1] == "agent-0"
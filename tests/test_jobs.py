@@ -0,0 +1,69 @@
+import asyncio
+import threading
+import pytest
+from megadev.jobs import JobManager
+
+@pytest.fixture
+def manager():
+    manager = JobManager(max_workers=1, notify_interval=0)
+    yield manager
+    manager.shutdown()
+
+@pytest.mark.asyncio
+async def test_job_completes_with_progress(manager):
+    updates = []
+
+    def work(report):
+        for i in range(1, 4):
+            report(i, 3)
+        return {"value": 42}
+
+    job = manager.submit("test", work, on_progress=lambda j: updates.append(j.progress))
+    await manager.wait(job.id)
+    await asyncio.sleep(0)  # Let threadsafe callbacks run
+
+    assert job.status == "completed"
+    assert job.result == {"value": 42}
+    assert job.progress == 3 and job.total == 3
+    assert updates[-1] == 3
+    assert job.to_dict()["status"] == "completed"
+
+@pytest.mark.asyncio
+async def test_job_failure_is_recorded(manager):
+    def work(report):
+        raise RuntimeError("boom")
+
+    job = manager.submit("test", work)
+    await manager.wait(job.id)
+
+    assert job.status == "failed"
+    assert job.error == "boom"
+
+@pytest.mark.asyncio
+async def test_running_job_can_be_cancelled(manager):
+    started = threading.Event()
+
+    def work(report):
+        started.set()
+        while True:
+            report(0)
+
+    job = manager.submit("test", work)
+    await asyncio.get_running_loop().run_in_executor(None, started.wait)
+
+    assert manager.cancel(job.id) is True
+    await manager.wait(job.id)
+    assert job.status == "cancelled"
+    assert manager.cancel(job.id) is False
+
+@pytest.mark.asyncio
+async def test_event_loop_stays_responsive(manager):
+    release = threading.Event()
+    job = manager.submit("test", lambda report: release.wait(5))
+
+    # The loop keeps running other coroutines while the job blocks its worker
+    await asyncio.sleep(0.01)
+    assert job.status == "running"
+    release.set()
+    await manager.wait(job.id)
+    assert job.status == "completed"
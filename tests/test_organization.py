@@ -0,0 +1,94 @@
+import copy
+import pickle
+from dataclasses import asdict
+import pytest
+from megadev.models import Agent, Squad
+from megadev.organization import Department, Division, OrganizationRegistry
+
+@pytest.fixture
+def organization():
+    department = Department(name="Engineering")
+    for d in range(2):
+        division = Division(name=f"Division-{d}")
+        division.squads = [Squad.create_random(f"Squad-{d}-{s}", size=3) for s in range(4)]
+        department.divisions.append(division)
+    return department, OrganizationRegistry([department])
+
+def test_sizes_match_the_tree(organization):
+    department, registry = organization
+    
+    assert len(registry) == department.size == 24
+    assert [division.size for division in department.divisions] == [12, 12]
+    assert registry.size(department.divisions[0].squads[0].id) == 3
+
+def test_lookup_by_id(organization):
+    department, registry = organization
+    division = department.divisions[1]
+    squad = division.squads[2]
+    agent = squad.agents[1]
+    
+    placement = registry.locate(agent.id)
+    assert placement.department is department
+    assert placement.division is division
+    assert placement.squad is squad
+    assert registry.agent(agent.id) is agent
+    assert registry.squad(squad.id) is squad
+    assert agent.id in registry and division.id in registry
+    assert registry.locate("missing") is None
+
+def test_counts_follow_changes(organization):
+    department, registry = organization
+    division = department.divisions[0]
+    squad = division.squads[0]
+    
+    recruit = Agent.create_random("Recruit")
+    registry.add_agent(squad.id, recruit)
+    assert registry.size(squad.id) == 4
+    assert division.size == 13 and department.size == 25
+    assert registry.locate(recruit.id).squad is squad
+    
+    registry.remove_agent(recruit.id)
+    assert recruit not in squad.agents
+    assert division.size == 12
+    
+    removed = registry.remove_squad(squad.id)
+    assert removed not in division.squads
+    assert division.size == 9 and department.size == 21
+    assert removed.agents[0].id not in registry
+    
+    registry.add_squad(department.divisions[1], removed)
+    assert department.divisions[1].size == 15 and department.size == 24
+
+def test_supervisor_lookup(organization):
+    department, registry = organization
+    lead, member = department.divisions[0].squads[0].agents[:2]
+    member.supervisor_id = lead.id
+    
+    assert registry.supervisor(member.id) is lead
+    assert registry.supervisor(lead.id) is None
+
+def test_duplicates_rejected(organization):
+    department, registry = organization
+    squad = department.divisions[0].squads[0]
+    
+    with pytest.raises(ValueError):
+        registry.add_agent(squad.id, squad.agents[0])
+    with pytest.raises(ValueError):
+        registry.add_squad(department.divisions[1], squad)
+
+def test_registered_units_serialize_alone(organization):
+    department, registry = organization
+    alone = len(pickle.dumps(department))
+    for d in range(3):
+        other = Department(name=f"Other-{d}")
+        other.divisions = [Division(name="Division", squads=[
+            Squad.create_random(f"Other-{d}-{s}", size=3) for s in range(8)
+        ])]
+        registry.add_department(other)
+    
+    assert len(pickle.dumps(department)) < alone * 1.05
+    assert len(pickle.dumps(department.divisions[0])) < alone / 1.5
+    assert "registry" not in asdict(department)
+    restored = pickle.loads(pickle.dumps(department))
+    assert restored.registry is None and restored.size == department.size
+    assert copy.deepcopy(department.divisions[0]).registry is None
@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+from megadev.models import Squad
+from megadev.parallel import ShardedScorer
+from megadev.scoring import ConfigMatrix, challenge_scores, top_k_slots
+
+@pytest.fixture(scope="module")
+def matrix():
+    return ConfigMatrix([Squad.create_random(f"Squad-{i}", size=2 + i % 3) for i in range(400)])
+
+def test_seeded_scores_do_not_depend_on_row_split(matrix):
+    slots = np.arange(len(matrix))
+    whole = challenge_scores(matrix, 2, slots=slots, seed=11)
+    parts = np.concatenate([
+        challenge_scores(matrix, 2, slots=part, seed=11) for part in np.array_split(slots, 7)
+    ])
+
+    assert np.array_equal(whole, parts)
+    assert not np.array_equal(whole, challenge_scores(matrix, 2, slots=slots, seed=12))
+
+def test_only_live_rows_are_scored(matrix):
+    slots = np.array([3, 40, 41, 399])
+    expected = challenge_scores(matrix, 1, seed=9)[slots]
+
+    live = np.zeros(len(matrix.values), dtype=bool)
+    for slot in slots:
+        live[matrix.starts[slot]:matrix.starts[slot] + matrix.counts[slot]] = True
+    values = matrix.values.copy()
+    values[~live] = np.nan
+    sparse = ConfigMatrix.from_arrays(values, matrix.starts, matrix.counts)
+
+    assert np.array_equal(challenge_scores(sparse, 1, slots=slots, seed=9), expected)
+
+def test_sharded_top_k_is_deterministic_across_worker_counts(matrix):
+    slots = np.arange(0, len(matrix), 3)
+    results = []
+    for workers in (1, 3):
+        scorer = ShardedScorer(matrix, seed=5, workers=workers)
+        try:
+            results.append(scorer.top_k(4, slots, 20))
+        finally:
+            scorer.close()
+
+    expected = top_k_slots(slots, challenge_scores(matrix, 4, slots=slots, seed=5), 20)
+    for survivors, scores in results:
+        assert np.array_equal(survivors, expected[0])
+        assert np.array_equal(scores, expected[1])
+    assert np.all(np.diff(expected[1]) <= 0)
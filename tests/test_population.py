@@ -0,0 +1,69 @@
+import random
+import numpy as np
+import pytest
+from megadev.fitness_index import FitnessIndex
+from megadev.models import Squad
+from megadev.population import Population
+
+@pytest.fixture
+def squads():
+    population = [Squad.create_random(f"Squad-{i}", size=1) for i in range(20)]
+    for squad in population:
+        squad.fitness_score = random.random()
+    return population
+
+def test_eliminate_keeps_stable_slots(squads):
+    population = Population(squads)
+    assert population == squads
+
+    assert population.eliminate([squads[3], squads[7].id, squads[3]]) == 2
+
+    assert len(population) == 18
+    assert squads[3] not in population and squads[4] in population
+    assert population.slot(squads[7].id) == 7
+    assert population.at(7) is squads[7] and not population.is_live(7)
+    assert population[3] is squads[4]
+    assert population[:3] == squads[:3]
+    assert list(population) == [s for i, s in enumerate(squads) if i not in (3, 7)]
+    assert population.capacity == 20
+
+def test_keep_top_shrinks_population_and_index(squads):
+    index = FitnessIndex(squads)
+    population = Population(squads, index=index)
+    version = population.version
+    ranked = sorted(squads, key=lambda s: s.fitness_score, reverse=True)
+
+    dropped = population.keep_top(5)
+
+    assert len(dropped) == 15
+    assert len(population) == len(index) == 5
+    assert set(s.id for s in population) == set(s.id for s in ranked[:5])
+    assert population.version > version
+
+    population.eliminate([ranked[0]])
+    assert index.best() is ranked[1]
+
+def test_retain_eliminates_unlisted_slots():
+    squads = [Squad.create_random(f"Squad-{i}", size=1) for i in range(10)]
+    index = FitnessIndex(squads)
+    population = Population(squads, index=index)
+
+    population.retain(np.array([1, 4, 6]))
+
+    assert [population.slot(s.id) for s in population] == [1, 4, 6]
+    assert len(index) == 3 and squads[4].id in index
+
+
+def test_retain_with_scores_rebuilds_index_once(monkeypatch):
+    squads = [Squad.create_random(f"Squad-{i}", size=1) for i in range(10)]
+    index = FitnessIndex(squads)
+    population = Population(squads, index=index)
+    rebuilds = []
+    monkeypatch.setattr(index, "rebuild", lambda s, rebuild=index.rebuild: rebuilds.append(1) or rebuild(s))
+    monkeypatch.setattr(index, "update", lambda squad: pytest.fail("per-squad update"))
+
+    population.retain(np.array([1, 4, 6]), [0.5, 2.0, 1.0])
+
+    assert len(rebuilds) == 1
+    assert [s.fitness_score for s in (squads[1], squads[4], squads[6])] == [0.5, 2.0, 1.0]
+    assert list(index) == [squads[4], squads[6], squads[1]]
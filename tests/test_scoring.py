@@ -0,0 +1,77 @@
+import numpy as np
+import pytest
+from megadev.fitness_index import FitnessIndex
+from megadev.models import Squad
+from megadev.scoring import CHALLENGE_WEIGHTS, ConfigMatrix, challenge_scores, stream_top_k
+
+def reference_score(squad, round_number):
+    weights = CHALLENGE_WEIGHTS[round_number % 3]
+    return np.mean([
+        sum(getattr(agent.config, name) * weight for name, weight in weights.items())
+        for agent in squad.agents
+    ])
+
+@pytest.fixture
+def squads():
+    return [Squad.create_random(f"Squad-{i}", size=1 + i % 4) for i in range(30)]
+
+@pytest.mark.parametrize("round_number", [0, 1, 2])
+def test_matches_per_agent_loop_without_noise(squads, round_number):
+    matrix = ConfigMatrix(squads)
+
+    scores = challenge_scores(matrix, round_number, noise=(1.0, 1.0))
+
+    expected = [reference_score(squad, round_number) for squad in squads]
+    assert np.allclose(scores, expected)
+
+def test_slots_and_noise(squads):
+    matrix = ConfigMatrix(squads)
+    slots = np.array([2, 5, 11])
+
+    plain = challenge_scores(matrix, 1, noise=(1.0, 1.0), slots=slots)
+    noisy = challenge_scores(matrix, 1, np.random.default_rng(7), slots=slots)
+    again = challenge_scores(matrix, 1, np.random.default_rng(7), slots=slots)
+
+    assert len(plain) == 3
+    assert np.all(noisy >= plain * 0.8) and np.all(noisy <= plain * 1.2)
+    assert np.array_equal(noisy, again)
+
+def test_bulk_assign_keeps_index_sorted(squads):
+    index = FitnessIndex(squads)
+    other = FitnessIndex(squads[:5])
+    scores = np.random.default_rng(1).random(len(squads))
+
+    index.assign(squads, scores)
+
+    assert [squad.fitness_score for squad in squads] == list(scores)
+    assert [s.fitness_score for s in index] == sorted(scores, reverse=True)
+    assert other.best().fitness_score == max(scores[:5])  # Other trackers still notified
+
+@pytest.mark.parametrize("untracked", [1, 5])  # Per-squad updates, then a bulk rebuild
+def test_assign_indexes_untracked_squads(squads, untracked):
+    index = FitnessIndex(squads[:25])
+    other = FitnessIndex(squads[:1])
+    batch = squads[:1] + squads[-untracked:] + [Squad.create_random("Newcomer", size=1)]
+    scores = np.arange(len(batch), dtype=float)
+
+    index.assign(batch, scores)
+
+    assert len(index) == 25 + untracked + 1
+    assert all(squad.id in index for squad in batch)
+    assert index.best() is batch[-1]
+    assert list(index) == sorted(index, key=lambda s: s.fitness_score, reverse=True)
+    assert other.best().fitness_score == 0.0  # Shared squads still notify other trackers
+
+def test_stream_top_k_matches_full_sort():
+    field = [Squad.create_random(f"Squad-{i}", size=1) for i in range(100)]
+    values = {squad.id: value for squad, value in zip(field, np.random.default_rng(3).random(100))}
+    values[field[10].id] = values[field[11].id] = 2.0  # A tie at the top
+    chunks = [field[start:start + 16] for start in range(0, 100, 16)]
+
+    survivors = stream_top_k(iter(chunks), 10,
+                             lambda chunk: np.array([values[s.id] for s in chunk]))
+
+    expected = sorted(field, key=lambda s: values[s.id], reverse=True)[:10]
+    assert [squad for _, squad in survivors] == expected
+    assert survivors[0] == (2.0, field[10])
+    assert stream_top_k(iter(chunks), 0, lambda chunk: np.zeros(len(chunk))) == []
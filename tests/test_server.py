@@ -1,10 +1,29 @@
 import pytest
+from megadev.jobs import JobCancelled
 from megadev.server import MegaDevServer
 from megadev.models import Squad, Agent
+from megadev.persistence import SimulationPersistence
+from megadev.sessions import estimate_population_bytes
 
 @pytest.fixture
 async def server():
-    return MegaDevServer()
+    server = MegaDevServer()
+    yield server
+    await server.close()
+
+
+@pytest.fixture
+async def make_server():
+    """Build servers with custom settings, closing every one after the test"""
+    servers = []
+
+    def make(**kwargs):
+        server = MegaDevServer(**kwargs)
+        servers.append(server)
+        return server
+    yield make
+    for server in servers:
+        await server.close()
 
 @pytest.mark.asyncio
 async def test_server_initialization(server):
@@ -99,4 +118,288 @@ async def test_multiple_evolution_cycles(server):
     for i in range(3):
         result = await server.evolve_generation()
         assert result["generation"] == i + 1
-        assert server.generation == i + 1 
\ No newline at end of file
+        assert server.generation == i + 1 
+
+
+@pytest.mark.asyncio
+async def test_get_leaderboard(server):
+    await server.initialize_population(population_size=4, squad_size=2)
+    
+    for i, squad in enumerate(server.population):
+        squad.fitness_score = float(i)
+    
+    resource = await server.get_leaderboard({"limit": 2, "squad_id": server.population[0].id})
+    
+    assert [s["fitness"] for s in resource.data["squads"]] == [3.0, 2.0]
+    assert resource.data["squads"][0]["rank"] == 1
+    assert resource.data["squads"][0]["percentile"] == 100.0
+    assert resource.data["squad"]["rank"] == 4
+    assert resource.data["squad"]["percentile"] == 25.0
+
+
+@pytest.mark.asyncio
+async def test_get_leaderboard_empty(server):
+    resource = await server.get_leaderboard()
+    assert resource.error == "No population initialized"
+
+
+@pytest.mark.asyncio
+async def test_get_leaderboard_rejects_non_integer_limit(server):
+    await server.initialize_population(population_size=4, squad_size=2)
+    
+    for limit in ("ten", None, [3]):
+        resource = await server.get_leaderboard({"limit": limit})
+        assert resource.error == "limit must be an integer"
+
+
+@pytest.mark.asyncio
+async def test_start_evolution_job(server):
+    await server.initialize_population(population_size=4, squad_size=3)
+    submitted = await server.start_evolution()
+    
+    assert submitted["status"] == "submitted"
+    await server.jobs.wait(submitted["job_id"])
+    
+    status = await server.job_status(submitted["job_id"])
+    assert status["status"] == "completed"
+    assert status["result"]["generation"] == 1
+    assert server.generation == 1
+
+
+@pytest.mark.parametrize("cancel_at", [1, 5])  # While scoring, then while breeding
+@pytest.mark.asyncio
+async def test_cancelled_step_leaves_population_untouched(make_server, tmp_path, cancel_at):
+    server = make_server(checkpoint_dir=tmp_path)
+    await server.initialize_population(population_size=4, squad_size=3)
+    await server.evolve_generation()
+    session = server.sessions.get("default")
+    before = [(s.id, s.fitness_score, [a.fitness_score for a in s.agents]) for s in server.population]
+    ranking = [s.id for s in server.fitness_index]
+
+    def report(progress, total=None, update=None):
+        if progress >= cancel_at:
+            raise JobCancelled("test")
+
+    with pytest.raises(JobCancelled):
+        server._evolve_step(session, report)
+
+    assert [(s.id, s.fitness_score, [a.fitness_score for a in s.agents])
+            for s in server.population] == before
+    assert [s.id for s in server.fitness_index] == ranking
+    assert server.generation == 1
+
+
+@pytest.mark.asyncio
+async def test_close_cancels_jobs_and_stops_executor(tmp_path):
+    server = MegaDevServer(checkpoint_dir=tmp_path)
+    await server.initialize_population(population_size=4, squad_size=3)
+    submitted = await server.evolve_generations(generations=10_000, background=True)
+
+    await server.close()
+
+    job = server.jobs.get(submitted["job_id"])
+    assert job.status == "cancelled"
+    assert server.generation < 10_000
+    with pytest.raises(RuntimeError):
+        server.jobs.executor.submit(print)
+
+
+@pytest.mark.asyncio
+async def test_job_status_unknown(server):
+    result = await server.job_status("missing")
+    assert result["error"] == "Unknown job: missing"
+    
+    result = await server.cancel_job("missing")
+    assert result["error"] == "Unknown job: missing"
+
+
+@pytest.mark.asyncio
+async def test_evolve_generations(make_server, tmp_path):
+    server = make_server(checkpoint_dir=tmp_path)
+    await server.initialize_population(population_size=4, squad_size=3)
+    result = await server.evolve_generations(generations=4, checkpoint_every=2)
+    
+    assert result["status"] == "success"
+    assert result["generations_run"] == 4
+    assert result["stop_reason"] == "generations"
+    assert server.generation == 4
+    assert [s["generation"] for s in result["stats"]] == [1, 2, 3, 4]
+    assert {"best", "mean", "std", "diversity", "wall_time"} <= set(result["stats"][0])
+    assert len(result["checkpoints"]) == 2
+    
+    generation, squads = server.checkpoints.load_population(result["checkpoints"][-1])
+    assert generation == 4
+    assert len(squads) == 4
+
+
+@pytest.mark.asyncio
+async def test_resume_checkpoint_reproduces_run(make_server, tmp_path):
+    server = make_server(checkpoint_dir=tmp_path / "checkpoints", session_dir=tmp_path / "a")
+    await server.initialize_population(population_size=4, squad_size=3, seed=5)
+    result = await server.evolve_generations(generations=4, checkpoint_every=2)
+    
+    resumed = make_server(checkpoint_dir=tmp_path / "checkpoints", session_dir=tmp_path / "b")
+    restored = await resumed.resume_checkpoint(result["checkpoints"][0])
+    assert restored["generation"] == 2
+    rerun = await resumed.evolve_generations(generations=2)
+    
+    assert resumed.generation == 4
+    untimed = lambda stats: [{k: v for k, v in s.items() if k != "wall_time"} for s in stats]
+    assert untimed(rerun["stats"]) == untimed(result["stats"][2:])
+    assert [(s.id, s.fitness_score) for s in resumed.population] == \
+        [(s.id, s.fitness_score) for s in server.population]
+
+
+@pytest.mark.asyncio
+async def test_resume_checkpoint_errors(make_server, tmp_path):
+    server = make_server(checkpoint_dir=tmp_path)
+    result = await server.resume_checkpoint(str(tmp_path / "missing.json"))
+    assert "error" in result
+    
+    path = server.checkpoints.save_population([], 0)
+    result = await server.resume_checkpoint(str(path))
+    assert result["error"] == "Checkpoint has no engine state to resume from"
+
+
+@pytest.mark.asyncio
+async def test_resume_checkpoint_refuses_paths_outside_checkpoint_dir(make_server, tmp_path):
+    server = make_server(checkpoint_dir=tmp_path / "checkpoints")
+    outside = tmp_path / "outside.json"
+    server.checkpoints.save_population([], 0).rename(outside)
+    for path in (f"{tmp_path}/checkpoints/../outside.json", str(outside), "/etc/passwd"):
+        result = await server.resume_checkpoint(path)
+        assert result["error"] == "Checkpoint must be inside the checkpoint directory"
+
+
+def test_failed_checkpoint_write_keeps_previous_file(tmp_path, monkeypatch):
+    checkpoints = SimulationPersistence(tmp_path)
+    path = checkpoints.save_population([], 3)
+
+    def fail(data, f):
+        f.write('{"generation": ')
+        raise OSError("disk full")
+
+    monkeypatch.setattr("megadev.persistence.json.dump", fail)
+    with pytest.raises(OSError):
+        checkpoints.save_population([], 3)
+
+    assert checkpoints.load_population(path) == (3, [])
+    assert list(tmp_path.iterdir()) == [path]
+
+
+@pytest.mark.asyncio
+async def test_evolve_generations_stops_at_target(server):
+    await server.initialize_population(population_size=4, squad_size=3)
+    result = await server.evolve_generations(generations=50, target_fitness=0.0)
+    
+    assert result["generations_run"] == 1
+    assert result["stop_reason"] == "target_fitness"
+
+
+@pytest.mark.asyncio
+async def test_evolve_generations_validates_arguments(server):
+    await server.initialize_population(population_size=4, squad_size=3)
+    
+    assert await server.evolve_generations(generations=0) == \
+        {"error": "generations must be at least 1"}
+    assert await server.evolve_generations(generations=2, checkpoint_every=-1) == \
+        {"error": "checkpoint_every must not be negative"}
+    assert server.jobs.list() == []
+
+
+@pytest.mark.asyncio
+async def test_resources_served_from_cache_until_population_changes(server):
+    await server.initialize_population(population_size=3, squad_size=2)
+    
+    first = await server.get_population()
+    assert await server.get_population() is first
+    
+    server.population[0].fitness_score = 5.0
+    updated = await server.get_population()
+    assert updated is not first
+    assert updated.data["squads"][0]["fitness"] == 5.0
+    
+    await server.evolve_generation()
+    evolved = await server.get_population()
+    assert evolved.data["generation"] == 1
+    assert await server.get_population() is evolved
+
+
+@pytest.mark.asyncio
+async def test_sessions_are_isolated(make_server, tmp_path):
+    server = make_server(session_dir=tmp_path)
+    await server.initialize_population(population_size=4, squad_size=3, session="alice")
+    await server.initialize_population(population_size=3, squad_size=3, session="bob")
+    
+    result = await server.evolve_generation(session="alice")
+    assert result["generation"] == 1
+    
+    alice = await server.get_population({"session": "alice"})
+    bob = await server.get_population({"session": "bob"})
+    assert alice.data["generation"] == 1
+    assert bob.data["generation"] == 0
+    assert bob.data["population_size"] == 3
+    assert server.population == []
+    
+    listed = await server.list_sessions()
+    assert {s["name"] for s in listed["sessions"]} >= {"alice", "bob"}
+    
+    assert (await server.drop_session("bob"))["status"] == "success"
+    resource = await server.get_population({"session": "bob"})
+    assert resource.error == "Unknown session: bob"
+
+
+@pytest.mark.asyncio
+async def test_population_quota(make_server, tmp_path):
+    server = make_server(session_dir=tmp_path, max_session_bytes=1024)
+    result = await server.initialize_population(population_size=100, squad_size=5)
+    assert "quota" in result["error"]
+
+
+@pytest.mark.asyncio
+async def test_population_quota_uses_requested_squad_size(make_server, tmp_path):
+    server = make_server(session_dir=tmp_path,
+                         max_session_bytes=estimate_population_bytes(10, 5))
+    result = await server.initialize_population(population_size=10, squad_size=10)
+    assert "quota" in result["error"]
+    assert "default" not in server.sessions
+
+
+@pytest.mark.asyncio
+async def test_reading_state_creates_no_session(make_server, tmp_path):
+    server = make_server(session_dir=tmp_path)
+
+    assert len(server.population) == 0
+    assert server.generation == 0
+    assert "default" not in server.sessions
+
+
+@pytest.mark.asyncio
+async def test_resume_checkpoint_respects_quota(make_server, tmp_path):
+    server = make_server(checkpoint_dir=tmp_path)
+    await server.initialize_population(population_size=20, squad_size=5)
+    result = await server.evolve_generations(generations=1, checkpoint_every=1)
+
+    limited = make_server(checkpoint_dir=tmp_path, session_dir=tmp_path / "limited",
+                          max_session_bytes=estimate_population_bytes(10, 5))
+    resumed = await limited.resume_checkpoint(result["checkpoints"][0], session="big")
+    assert "quota" in resumed["error"]
+    assert "big" not in limited.sessions
+
+
+@pytest.mark.asyncio
+async def test_eliminations_are_visible_to_server(server):
+    await server.initialize_population(population_size=10, squad_size=5)
+    population = server.population
+    for i, squad in enumerate(population):
+        squad.fitness_score = float(i)
+    before = await server.get_population()
+
+    population.keep_top(4)
+
+    after = await server.get_population()
+    assert server.population is population
+    assert after.data["population_size"] == 4
+    assert before.data["population_size"] == 10
+    leaderboard = await server.get_leaderboard({"limit": 10})
+    assert [s["fitness"] for s in leaderboard.data["squads"]] == [9.0, 8.0, 7.0, 6.0]
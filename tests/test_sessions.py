@@ -0,0 +1,97 @@
+import pytest
+from megadev.sessions import QuotaExceeded, SessionManager, estimate_population_bytes
+
+@pytest.fixture
+def manager(tmp_path):
+    return SessionManager(tmp_path, max_sessions=3)
+
+def populate(session, size=4):
+    session.engine.population_size = size
+    session.population = session.engine.create_initial_population()
+    session.fitness_index.rebuild(session.population)
+
+def test_sessions_are_isolated(manager):
+    alpha = manager.get("alpha")
+    beta = manager.get("beta")
+    populate(alpha)
+
+    assert manager.get("alpha") is alpha
+    assert beta.population == []
+    assert alpha.engine is not beta.engine
+    assert alpha.footprint > 0 and beta.footprint == 0
+
+def test_session_limit_and_names(manager):
+    for name in ("a", "b", "c"):
+        manager.get(name)
+
+    with pytest.raises(QuotaExceeded):
+        manager.get("d")
+    with pytest.raises(ValueError):
+        manager.get("../escape")
+    assert manager.get("missing", create=False) is None
+
+def test_population_quota(tmp_path):
+    manager = SessionManager(tmp_path, max_session_bytes=estimate_population_bytes(10, 5))
+
+    manager.check_population(10, 5)
+    with pytest.raises(QuotaExceeded):
+        manager.check_population(1000, 5)
+
+def test_lru_sessions_spill_to_disk_and_reload(tmp_path):
+    manager = SessionManager(tmp_path, max_resident_bytes=estimate_population_bytes(4, 5))
+    alpha = manager.get("alpha")
+    populate(alpha)
+    alpha.generation = alpha.engine.generation = 3
+    alpha.population[0].fitness_score = 9.0
+    ids = [squad.id for squad in alpha.population]
+
+    beta = manager.get("beta")
+    populate(beta)
+    manager.enforce(keep="beta")
+
+    listed = {info["name"]: info for info in manager.list()}
+    assert listed["alpha"]["resident"] is False
+    assert (tmp_path / "alpha" / "session.json").exists()
+
+    restored = manager.get("alpha")
+    assert restored is not alpha
+    assert [squad.id for squad in restored.population] == ids
+    assert restored.generation == 3 and restored.engine.generation == 3
+    assert restored.fitness_index.best().fitness_score == 9.0
+    assert not (tmp_path / "alpha").exists()
+
+def test_busy_sessions_are_not_spilled(tmp_path):
+    manager = SessionManager(tmp_path, max_resident_bytes=0)
+    alpha = manager.get("alpha")
+    populate(alpha)
+    alpha.busy = 1
+
+    manager.get("beta")
+    assert {info["name"] for info in manager.list() if info["resident"]} >= {"alpha"}
+
+def test_drop_removes_spilled_state(tmp_path):
+    manager = SessionManager(tmp_path)
+    populate(manager.get("alpha"))
+    manager.spill("alpha")
+
+    assert manager.drop("alpha") is True
+    assert "alpha" not in manager
+    assert not (tmp_path / "alpha").exists()
+    assert manager.drop("alpha") is False
+
+def test_peek_neither_creates_nor_spills(tmp_path):
+    manager = SessionManager(tmp_path, max_resident_bytes=0)
+    alpha = manager.get("alpha")
+    populate(alpha)
+    alpha.busy = 1
+    populate(manager.get("beta"))
+    manager.spill("beta")
+
+    assert manager.peek("missing") is None
+    assert "missing" not in manager
+    assert len(manager.peek("beta").population) == 4
+    assert manager.peek("alpha") is alpha
+    # The spilled session was read in place, so the resident set did not grow
+    assert {info["name"] for info in manager.list() if info["resident"]} == {"alpha"}
+    assert len(manager.peek("beta").population) == 4
+    assert len(manager.get("beta").population) == 4
@@ -1,8 +1,10 @@
 import pytest
 from datetime import datetime, timedelta
-from src.megadev.simulation import SimulationClock, SimulationEngine
+from src.megadev.builder import OrganizationBuilder, OrganizationSpec
+from src.megadev.simulation import (SimulationClock, SimulationEngine, ShardedSimulationEngine,
+                                    create_engine)
 from src.megadev.models import Agent, Squad
-from src.megadev.organization import Division, Department
+from src.megadev.organization import Division, Department, OrganizationRegistry
 
 def test_simulation_clock():
     clock = SimulationClock(current_time=datetime(2024, 1, 1, 9, 0))
@@ -49,3 +51,94 @@ def test_simulation_engine():
     engine.resume()
     engine.tick()
     assert agent.needs.hunger > current_hunger  # Should change after resume
+
+def _departments(count=3, headcount=40):
+    builder = OrganizationBuilder(seed=0)
+    return [
+        builder.build_department(OrganizationSpec(name=f"Dept-{i}", headcount=headcount,
+                                                  division_size=20, squad_size=4))
+        for i in range(count)
+    ]
+
+def test_sharded_engine_matches_serial():
+    serial = SimulationEngine()
+    for department in _departments():
+        serial.add_department(department)
+    
+    with ShardedSimulationEngine(workers=2, seed=1) as sharded:
+        for department in _departments():
+            sharded.add_department(department)
+        assert sorted(sharded.shard_of(d.id) for d in sharded.departments) == [0, 0, 1]
+        started = sharded.clock.current_time
+        
+        for _ in range(3):
+            serial.tick()
+            sharded.tick()
+        
+        assert sharded.clock.current_time - started == timedelta(minutes=45)
+        assert sharded.stats["agents"] == serial.stats["agents"] == 120
+        assert sharded.stats["mean_hunger"] == pytest.approx(serial.stats["mean_hunger"])
+        hunger = [a.needs.hunger for d in sharded.departments for v in d.divisions
+                  for s in v.squads for a in s.agents]
+        assert len(hunger) == 120
+        assert all(h == pytest.approx(7.5) for h in hunger)
+
+def test_sharded_engine_pause():
+    with ShardedSimulationEngine(workers=2) as engine:
+        engine.add_department(_departments(count=1)[0])
+        engine.pause()
+        engine.tick()
+        assert engine.stats is None
+        
+        engine.resume()
+        engine.tick()
+        assert engine.stats["mean_hunger"] == pytest.approx(2.5)
+
+def test_squads_transfer_between_shards():
+    source, target = _departments(count=2)
+    squad = source.divisions[0].squads[0]
+    
+    with ShardedSimulationEngine(workers=2) as engine:
+        engine.add_department(source)
+        engine.add_department(target)
+        assert engine.shard_of(source.id) != engine.shard_of(target.id)
+        
+        engine.transfer_squad(squad.id, source.id, target.id)
+        engine.tick()
+        engine.tick()
+        departments = {d.id: d for d in engine.departments}
+        
+        assert departments[source.id].size == 36
+        assert departments[target.id].size == 44
+        moved = departments[target.id].divisions[0].squads[-1]
+        assert moved.id == squad.id
+        # Updated on every tick, including the one it moved on
+        assert moved.agents[0].needs.hunger == pytest.approx(5.0)
+        assert engine.stats["agents"] == 80
+
+def test_registered_departments_balance_on_real_headcount():
+    source, target, late = _departments(count=3)
+    OrganizationRegistry([source, target, late])
+    
+    with ShardedSimulationEngine(workers=2) as engine:
+        engine.add_department(target)
+        engine.add_department(source)
+        for squad in source.divisions[0].squads[:2]:
+            engine.transfer_squad(squad.id, source.id, target.id)
+        engine.tick()
+        departments = {d.id: d for d in engine.departments}
+        
+        assert departments[source.id].size == 32
+        assert departments[target.id].size == 48
+        assert sum(len(s.agents) for v in departments[target.id].divisions for s in v.squads) == 48
+        # The lighter shard now holds the source department
+        engine.add_department(late)
+        assert engine.shard_of(late.id) == engine.shard_of(source.id)
+
+def test_create_engine():
+    assert isinstance(create_engine(workers=1), SimulationEngine)
+    engine = create_engine(workers=2)
+    try:
+        assert isinstance(engine, ShardedSimulationEngine)
+    finally:
+        engine.close()
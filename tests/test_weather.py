@@ -1,15 +1,105 @@
 import pytest
+import pytest_asyncio
+import asyncio
+import json
 import os
-from unittest.mock import patch, MagicMock
+import threading
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
 from weather_service.server import WeatherServer, WeatherData, RateLimiter
+from weather_service.cache import DiskCache, RefreshingCache
+from weather_service.locations import normalize_query
+from weather_service.metrics import Histogram
 import time
-import requests
+import httpx
+
+class StubAPI:
+    """Local stand-in for the OpenWeatherMap API"""
+
+    def __init__(self):
+        self.routes = {}
+        self.requests = []
+        self.delay = 0.0
+        # Statuses returned (one per request) before the route's normal response
+        self.failures = []
+
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                stub.requests.append((url.path, parse_qs(url.query)))
+                time.sleep(stub.delay)
+
+                if stub.failures:
+                    status, reason = stub.failures.pop(0)
+                    body = b"{}"
+                elif url.path in stub.routes:
+                    status, reason = 200, "OK"
+                    route = stub.routes[url.path]
+                    # Raw bytes are sent as-is, e.g. to serve a broken body
+                    body = route if isinstance(route, bytes) else json.dumps(route).encode()
+                elif url.path == "/geo/1.0/direct":
+                    status, reason = 200, "OK"
+                    body = json.dumps(stub.geocode(parse_qs(url.query)["q"][0])).encode()
+                else:
+                    status, reason = 404, "Not Found"
+                    body = b"{}"
+
+                self.send_response(status, reason)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        class HTTPServer(ThreadingHTTPServer):
+            # The default backlog of 5 drops concurrent connects, stalling them for a second
+            request_queue_size = 128
+
+        self.httpd = HTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+        self.thread = threading.Thread(target=self.httpd.serve_forever, args=(0.05,), daemon=True)
+        self.thread.start()
+
+    @staticmethod
+    def geocode(query):
+        """Resolve every city to a single match, in GB unless a country is given"""
+        name, _, country = query.partition(",")
+        return [{
+            "name": name.strip().title(),
+            "country": (country.strip() or "gb").upper(),
+            "lat": float(sum(map(ord, name.strip().lower())) % 90),
+            "lon": 0.0
+        }]
+
+    def calls(self, path):
+        return sum(1 for requested, _ in self.requests if requested == path)
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
 
 @pytest.fixture
-def weather_server():
+def stub_api():
+    stub = StubAPI()
+    yield stub
+    stub.close()
+
+@pytest_asyncio.fixture
+async def weather_server(stub_api):
     # Ensure we have a mock API key for tests
     os.environ["OPENWEATHER_API_KEY"] = "test_key"
-    return WeatherServer()
+    server = WeatherServer(base_url=stub_api.url, timeout=2.0, retries=2)
+    # The full quota up front, so request spacing doesn't slow unrelated tests
+    server.rate_limiter = RateLimiter(calls=60, period=60, burst=60)
+    yield server
+    await server.aclose()
 
 @pytest.fixture
 def mock_weather_response():
@@ -40,129 +130,547 @@ def mock_forecast_response():
                 "dt_txt": "2024-03-20 12:00:00",
                 "main": {
                     "temp": 22.5,
-                    "humidity": 70
+                    "feels_like": 22.0,
+                    "humidity": 70,
+                    "pressure": 1012
                 },
                 "weather": [
                     {"description": "sunny"}
-                ]
+                ],
+                "wind": {"speed": 3.1},
+                "clouds": {"all": 5}
             },
             {
                 "dt_txt": "2024-03-21 12:00:00",
                 "main": {
                     "temp": 21.0,
-                    "humidity": 75
+                    "feels_like": 20.4,
+                    "humidity": 75,
+                    "pressure": 1010
                 },
                 "weather": [
                     {"description": "partly cloudy"}
-                ]
+                ],
+                "wind": {"speed": 4.0},
+                "clouds": {"all": 40}
             }
         ]
     }
 
 @pytest.mark.asyncio
-async def test_get_current_weather(weather_server, mock_weather_response):
-    with patch('requests.get') as mock_get:
-        mock_get.return_value.json.return_value = mock_weather_response
-        mock_get.return_value.raise_for_status = MagicMock()
-        
-        resource = await weather_server.get_current_weather({"city": "London"})
-        
-        assert resource.data["temperature"] == 20.5
-        assert resource.data["description"] == "clear sky"
-        assert resource.data["humidity"] == 65
-        assert resource.data["wind_speed"] == 5.2
-        assert resource.metadata["city"] == "London"
-        assert resource.metadata["unit"] == "metric"
-
-@pytest.mark.asyncio
-async def test_get_forecast(weather_server, mock_forecast_response):
-    with patch('requests.get') as mock_get:
-        mock_get.return_value.json.return_value = mock_forecast_response
-        mock_get.return_value.raise_for_status = MagicMock()
-        
-        result = await weather_server.get_forecast("London", 2)
-        
-        assert result["city"] == "London"
-        assert len(result["forecasts"]) == 2
-        assert result["forecasts"][0]["temperature"] == 22.5
-        assert result["forecasts"][0]["description"] == "sunny"
-        assert result["forecasts"][1]["temperature"] == 21.0
-        assert result["forecasts"][1]["description"] == "partly cloudy"
-
-@pytest.mark.asyncio
-async def test_get_current_weather_error(weather_server):
-    with patch('requests.get') as mock_get:
-        mock_get.side_effect = Exception("API Error")
-        
-        resource = await weather_server.get_current_weather({"city": "InvalidCity"})
-        assert "API Error" in resource.error
-
-@pytest.mark.asyncio
-async def test_get_forecast_error(weather_server):
-    with patch('requests.get') as mock_get:
-        mock_get.side_effect = Exception("API Error")
-        
-        result = await weather_server.get_forecast("InvalidCity", 2)
-        assert "API Error" in result["error"]
+async def test_get_current_weather(weather_server, stub_api, mock_weather_response):
+    stub_api.routes["/weather"] = mock_weather_response
+
+    resource = await weather_server.get_current_weather({"city": "London"})
+
+    assert resource.data["temperature"] == 20.5
+    assert resource.data["description"] == "clear sky"
+    assert resource.data["humidity"] == 65
+    assert resource.data["wind_speed"] == 5.2
+    assert resource.metadata["city"] == "London"
+    assert resource.metadata["unit"] == "metric"
+
+@pytest.mark.asyncio
+async def test_get_forecast(weather_server, stub_api, mock_forecast_response):
+    stub_api.routes["/forecast"] = mock_forecast_response
+
+    result = await weather_server.get_forecast("London", 2)
+
+    assert result["city"] == "London"
+    assert len(result["forecasts"]) == 2
+    assert result["forecasts"][0]["temperature"] == 22.5
+    assert result["forecasts"][0]["description"] == "sunny"
+    assert result["forecasts"][1]["temperature"] == 21.0
+    assert result["forecasts"][1]["description"] == "partly cloudy"
+
+@pytest.mark.asyncio
+async def test_get_current_weather_error(weather_server, stub_api):
+    stub_api.failures.append((404, "API Error"))
+
+    resource = await weather_server.get_current_weather({"city": "InvalidCity"})
+    assert "API Error" in resource.error
+
+@pytest.mark.asyncio
+async def test_get_forecast_error(weather_server, stub_api):
+    stub_api.failures.append((404, "API Error"))
+
+    result = await weather_server.get_forecast("InvalidCity", 2)
+    assert "API Error" in result["error"]
 
 def test_weather_server_initialization_without_api_key():
     os.environ.pop("OPENWEATHER_API_KEY", None)
     with pytest.raises(ValueError) as exc_info:
         WeatherServer()
-    assert "OPENWEATHER_API_KEY environment variable is required" in str(exc_info.value) 
+    assert "OPENWEATHER_API_KEY environment variable is required" in str(exc_info.value)
 
 @pytest.mark.asyncio
 async def test_rate_limiter():
-    limiter = RateLimiter(calls=2, period=1)
-    
+    limiter = RateLimiter(calls=2, period=1, burst=2)
+
     # First two calls should be allowed
     assert limiter.can_call()[0] is True
     assert limiter.can_call()[0] is True
-    
+
     # Third call should be blocked
     can_call, wait_time = limiter.can_call()
     assert can_call is False
     assert wait_time > 0
 
 @pytest.mark.asyncio
-async def test_weather_caching(weather_server, mock_weather_response):
-    with patch('requests.get') as mock_get:
-        mock_get.return_value.json.return_value = mock_weather_response
-        mock_get.return_value.raise_for_status = MagicMock()
-        
-        # First call should hit the API
-        resource1 = await weather_server.get_current_weather({"city": "London"})
-        assert resource1.metadata["cached"] is False
-        
-        # Second call should use cache
-        resource2 = await weather_server.get_current_weather({"city": "London"})
-        assert resource2.metadata["cached"] is True
-        
-        # Verify mock was called only once
-        assert mock_get.call_count == 1
-
-@pytest.mark.asyncio
-async def test_forecast_caching(weather_server, mock_forecast_response):
-    with patch('requests.get') as mock_get:
-        mock_get.return_value.json.return_value = mock_forecast_response
-        mock_get.return_value.raise_for_status = MagicMock()
-        
-        # First call should hit the API
-        result1 = await weather_server.get_forecast("London", 2)
-        
-        # Second call should use cache
-        result2 = await weather_server.get_forecast("London", 2)
-        
-        # Verify mock was called only once
-        assert mock_get.call_count == 1
-        assert "generated_at" in result1
-        assert result1 == result2
-
-@pytest.mark.asyncio
-async def test_api_timeout():
-    server = WeatherServer()
-    with patch('requests.get') as mock_get:
-        mock_get.side_effect = requests.Timeout("Connection timed out")
-        
-        with pytest.raises(requests.RequestException):
-            await server.make_api_call("http://example.com", {})
\ No newline at end of file
+async def test_weather_caching(weather_server, stub_api, mock_weather_response):
+    stub_api.routes["/weather"] = mock_weather_response
+
+    # First call should hit the API
+    resource1 = await weather_server.get_current_weather({"city": "London"})
+    assert resource1.metadata["cached"] is False
+
+    # Second call should use cache
+    resource2 = await weather_server.get_current_weather({"city": "London"})
+    assert resource2.metadata["cached"] is True
+
+    # Verify the API was called only once
+    assert stub_api.calls("/weather") == 1
+
+@pytest.mark.asyncio
+async def test_forecast_caching(weather_server, stub_api, mock_forecast_response):
+    stub_api.routes["/forecast"] = mock_forecast_response
+
+    # First call should hit the API
+    result1 = await weather_server.get_forecast("London", 2)
+
+    # Second call should use cache
+    result2 = await weather_server.get_forecast("London", 2)
+
+    # Verify the API was called only once
+    assert stub_api.calls("/forecast") == 1
+    assert "generated_at" in result1
+    assert result1 == result2
+
+@pytest.mark.asyncio
+async def test_api_timeout(stub_api):
+    os.environ["OPENWEATHER_API_KEY"] = "test_key"
+    server = WeatherServer(base_url=stub_api.url, timeout=0.05, retries=0)
+    stub_api.delay = 0.3
+
+    with pytest.raises(httpx.TimeoutException):
+        await server.make_api_call(f"{stub_api.url}/weather", {})
+
+@pytest.mark.asyncio
+async def test_retries_transient_errors(weather_server, stub_api, mock_weather_response):
+    stub_api.routes["/weather"] = mock_weather_response
+    stub_api.failures.append((503, "Service Unavailable"))
+    weather_server.http.backoff = 0.01
+
+    data = await weather_server.make_api_call(f"{stub_api.url}/weather", {"q": "London"})
+
+    assert data["main"]["temp"] == 20.5
+    assert stub_api.calls("/weather") == 2
+
+@pytest.mark.asyncio
+async def test_retries_take_rate_limit_tokens(weather_server, stub_api, mock_weather_response):
+    stub_api.routes["/weather"] = mock_weather_response
+    stub_api.failures += [(429, "Too Many Requests"), (503, "Service Unavailable")]
+    weather_server.http.backoff = 0.01
+    weather_server.rate_limiter = RateLimiter(calls=3, period=60, burst=3)
+
+    await weather_server.make_api_call(f"{stub_api.url}/weather", {"q": "London"})
+
+    assert stub_api.calls("/weather") == 3
+    assert weather_server.rate_limiter.can_call()[0] is False
+    metrics = weather_server.metrics
+    assert metrics.value("weather_upstream_requests_total", endpoint="weather", outcome="retry") == 2
+    assert metrics.value("weather_upstream_requests_total", endpoint="weather", outcome="ok") == 1
+
+@pytest.mark.asyncio
+async def test_invalid_json_is_an_upstream_error(weather_server, stub_api):
+    stub_api.routes["/weather"] = b"<html>oops</html>"
+
+    with pytest.raises(httpx.DecodingError):
+        await weather_server.make_api_call(f"{stub_api.url}/weather", {"q": "London"})
+
+    assert stub_api.calls("/weather") == 1
+    assert weather_server.metrics.value("weather_upstream_requests_total",
+                                        endpoint="weather", outcome="error") == 1
+
+@pytest.mark.asyncio
+async def test_concurrent_requests_overlap(weather_server, stub_api, mock_weather_response):
+    stub_api.routes["/weather"] = mock_weather_response
+    stub_api.delay = 0.2
+
+    started = time.perf_counter()
+    results = await asyncio.gather(*(
+        weather_server.get_weather_data(f"City{i}") for i in range(10)
+    ))
+    elapsed = time.perf_counter() - started
+
+    assert all(isinstance(result, WeatherData) for result in results)
+    assert elapsed < 1.5  # Serialized calls would take at least 2 seconds
+
+@pytest.mark.asyncio
+async def test_concurrent_misses_share_one_upstream_call(weather_server, stub_api, mock_weather_response):
+    stub_api.routes["/weather"] = mock_weather_response
+    stub_api.delay = 0.1
+
+    results = await asyncio.gather(*(
+        weather_server.get_weather_data("London") for _ in range(20)
+    ))
+
+    assert stub_api.calls("/weather") == 1
+    assert all(result is results[0] for result in results)
+    assert weather_server.inflight.calls == {}
+
+@pytest.mark.asyncio
+async def test_concurrent_misses_share_errors(weather_server, stub_api):
+    await weather_server.locations.resolve("Nowhere")
+    stub_api.failures.append((404, "API Error"))
+    stub_api.delay = 0.1
+
+    results = await asyncio.gather(
+        *(weather_server.get_forecast("Nowhere", 2) for _ in range(5))
+    )
+
+    assert stub_api.calls("/forecast") == 1
+    assert all("API Error" in result["error"] for result in results)
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+def test_refreshing_cache_soft_and_hard_ttl():
+    clock = FakeClock()
+    cache = RefreshingCache(maxsize=10, soft_ttl=10, hard_ttl=30, hot_hits=100, timer=clock)
+    cache.store("london", "sunny")
+
+    assert cache.lookup("london") == ("sunny", False)
+    clock.now = 15
+    assert cache.lookup("london") == ("sunny", True)  # Stale but still served
+    clock.now = 31
+    assert cache.lookup("london") == (None, False)
+
+def test_refreshing_cache_refreshes_hot_keys_early():
+    clock = FakeClock()
+    cache = RefreshingCache(maxsize=10, soft_ttl=10, hard_ttl=30, hot_hits=3,
+                            refresh_ahead=0.5, timer=clock)
+    cache.store("london", "sunny")
+    cache.store("paris", "rain")
+
+    clock.now = 6
+    assert cache.lookup("london") == ("sunny", False)
+    assert cache.lookup("london") == ("sunny", False)
+    assert cache.lookup("london") == ("sunny", True)  # Hot: refreshed before going stale
+    assert cache.lookup("paris") == ("rain", False)
+
+@pytest.mark.asyncio
+async def test_stale_weather_served_while_revalidating(stub_api, mock_weather_response):
+    os.environ["OPENWEATHER_API_KEY"] = "test_key"
+    server = WeatherServer(base_url=stub_api.url, weather_ttl=(0.05, 60))
+    stub_api.routes["/weather"] = mock_weather_response
+    first = await server.get_weather_data("London")
+
+    await asyncio.sleep(0.06)
+    stub_api.delay = 0.2
+    started = time.perf_counter()
+    stale = await server.get_weather_data("London")
+
+    assert stale is first
+    assert time.perf_counter() - started < 0.1  # Did not wait for upstream
+    await asyncio.gather(*server.refreshes)
+    assert stub_api.calls("/weather") == 2
+    assert await server.get_weather_data("London") is not first
+    await server.aclose()
+
+def test_disk_cache_expiry_and_compaction(tmp_path):
+    cache = DiskCache(tmp_path / "cache.db", max_bytes=100)
+    cache.set("old", {"v": "x" * 30}, ttl=60, stored_at=time.time() - 120)
+    cache.set("a", {"v": "a" * 30}, ttl=60)
+    cache.set("b", {"v": "b" * 30}, ttl=60)
+
+    assert cache.get("old") is None  # Expired entries are never served
+    value, age = cache.get("a")
+    assert value == {"v": "a" * 30} and age < 5
+
+    cache.set("c", {"v": "c" * 30}, ttl=60)  # Over budget: "b" is least recently read
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
+    assert cache.size_bytes() <= 100
+    cache.close()
+
+def test_disk_cache_keeps_a_running_size_and_batches_reads(tmp_path):
+    cache = DiskCache(tmp_path / "cache.db", flush_every=3)
+    statements = []
+    cache._db.set_trace_callback(statements.append)
+
+    cache.set("a", "x" * 10, ttl=60)
+    cache.set("b", "y" * 20, ttl=60)
+    cache.set("a", "z" * 5, ttl=60)  # Replacing counts only the new payload
+    cache.delete("b")
+    assert cache.size_bytes() == len('"zzzzz"')
+    assert not any("SUM(" in statement for statement in statements)
+
+    cache.set("c", "c", ttl=60)
+    cache.set("d", "d", ttl=60)
+    statements.clear()
+    cache.get("a")
+    cache.get("c")
+    cache.get("a")
+    assert not any(statement.startswith("UPDATE") for statement in statements)
+    cache.get("d")  # The third distinct key read flushes all three
+    assert sum(statement.startswith("UPDATE") for statement in statements) == 3
+    assert sum(statement == "COMMIT" for statement in statements) == 1
+
+    cache.compact()
+    assert cache.size_bytes() == len('"zzzzz"') + 2 * len('"c"')
+    cache.close()
+
+@pytest.mark.asyncio
+async def test_disk_cache_survives_restart(stub_api, mock_weather_response, mock_forecast_response, tmp_path):
+    os.environ["OPENWEATHER_API_KEY"] = "test_key"
+    stub_api.routes["/weather"] = mock_weather_response
+    stub_api.routes["/forecast"] = mock_forecast_response
+    path = tmp_path / "weather.db"
+
+    first = WeatherServer(base_url=stub_api.url, cache_path=path)
+    weather = await first.get_weather_data("London")
+    forecast = await first.get_forecast("London", 2)
+    await first.aclose()
+
+    restarted = WeatherServer(base_url=stub_api.url, cache_path=path)
+    assert await restarted.get_weather_data("London") == weather
+    assert await restarted.get_forecast("London", 2) == forecast
+    assert stub_api.calls("/weather") == 1
+    assert stub_api.calls("/forecast") == 1
+    assert "weather:london,gb" in restarted.weather_cache  # Promoted into memory
+    await restarted.aclose()
+
+@pytest.mark.asyncio
+async def test_forecast_lengths_share_one_fetch(weather_server, stub_api):
+    def slot(date, hour, temp):
+        return {
+            "dt_txt": f"{date} {hour:02d}:00:00",
+            "main": {"temp": temp, "feels_like": temp, "humidity": 50, "pressure": 1010},
+            "weather": [{"description": f"{date} {hour}"}],
+            "wind": {"speed": 1.0},
+            "clouds": {"all": 0}
+        }
+    stub_api.routes["/forecast"] = {"list": [
+        slot(f"2024-03-{20 + day}", hour, 10 + day + hour / 3)
+        for day in range(5) for hour in range(0, 24, 3)
+    ]}
+
+    results = [await weather_server.get_forecast("London", days) for days in range(1, 6)]
+
+    assert stub_api.calls("/forecast") == 1
+    assert next(params for path, params in stub_api.requests if path == "/forecast")["cnt"] == ["40"]
+    assert [len(result["forecasts"]) for result in results] == [1, 2, 3, 4, 5]
+    day = results[-1]["forecasts"][1]
+    assert day["date"] == "2024-03-21"
+    assert day["description"] == "2024-03-21 12"  # Midday slot represents the day
+    assert day["temp_min"] == 11 and day["temp_max"] == 18
+
+@pytest.mark.asyncio
+async def test_forecast_skips_days_that_miss_midday(weather_server, stub_api):
+    # Fetched at 21:00: one slot left today, and the fifth full day ends at 18:00
+    start = datetime(2024, 3, 20, 21)
+    stub_api.routes["/forecast"] = {"list": [
+        {
+            "dt_txt": (start + timedelta(hours=3 * i)).strftime("%Y-%m-%d %H:%M:%S"),
+            "main": {"temp": float(i), "feels_like": float(i), "humidity": 50, "pressure": 1010},
+            "weather": [{"description": f"slot {i}"}],
+            "wind": {"speed": 1.0},
+            "clouds": {"all": 0}
+        }
+        for i in range(40)
+    ]}
+
+    result = await weather_server.get_forecast("London", 5)
+
+    assert [day["date"] for day in result["forecasts"]] == \
+        ["2024-03-21", "2024-03-22", "2024-03-23", "2024-03-24", "2024-03-25"]
+    assert [day["description"] for day in result["forecasts"]] == \
+        [f"slot {5 + 8 * day}" for day in range(5)]  # Each day's 12:00 slot
+    assert result["forecasts"][-1]["temp_min"] == 33 and result["forecasts"][-1]["temp_max"] == 39
+
+@pytest.mark.asyncio
+async def test_aclose_waits_for_cancelled_refreshes(weather_server):
+    stopped = []
+
+    async def refresh():
+        try:
+            await asyncio.sleep(60)
+        finally:
+            await asyncio.sleep(0.01)  # Cleanup that outlives the cancel request
+            stopped.append(True)
+
+    task = asyncio.ensure_future(refresh())
+    weather_server.refreshes.add(task)
+    await asyncio.sleep(0)
+
+    await weather_server.aclose()
+
+    assert task.cancelled() and stopped == [True]
+
+@pytest.mark.asyncio
+async def test_rate_limiter_acquire_is_fifo():
+    limiter = RateLimiter(calls=10, period=1, burst=1)
+    order = []
+
+    async def call(i):
+        await limiter.acquire()
+        order.append(i)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(call(i) for i in range(4)))
+
+    assert order == [0, 1, 2, 3]
+    assert time.perf_counter() - started >= 0.29  # Three waits of 0.1s each
+
+def test_rate_limiter_shared_across_instances(tmp_path):
+    path = tmp_path / "quota"
+    first = RateLimiter(calls=3, period=60, burst=3, shared_path=path)
+    second = RateLimiter(calls=3, period=60, burst=3, shared_path=path)
+
+    assert first.can_call()[0] is True
+    assert second.can_call()[0] is True
+    assert first.can_call()[0] is True
+    can_call, wait_time = second.can_call()
+    assert can_call is False
+    assert 0 < wait_time <= 60
+
+@pytest.mark.parametrize("burst", [1, 10, 60])
+def test_rate_limiter_never_exceeds_calls_per_period(monkeypatch, burst):
+    clock = [1000.0]
+    monkeypatch.setattr("weather_service.ratelimit.time.monotonic", lambda: clock[0])
+    limiter = RateLimiter(calls=60, period=60, burst=burst)
+
+    admitted = []
+    while clock[0] < 1180:
+        if limiter.can_call()[0]:
+            admitted.append(clock[0])
+        else:
+            clock[0] += 0.25
+
+    assert sum(1 for t in admitted if t < 1060) == 60  # The first window is used in full
+    for start in admitted:
+        assert sum(1 for t in admitted if start <= t < start + 60) <= 60
+
+@pytest.mark.asyncio
+async def test_shared_rate_limiter_acquire_keeps_order(tmp_path):
+    limiter = RateLimiter(calls=10, period=1, shared_path=tmp_path / "quota")
+    order = []
+
+    async def call(i):
+        await limiter.acquire()
+        order.append(i)
+
+    await asyncio.gather(*(call(i) for i in range(4)))
+
+    assert order == [0, 1, 2, 3]
+
+@pytest.mark.asyncio
+async def test_weather_bulk(weather_server, stub_api, mock_weather_response):
+    stub_api.routes["/weather"] = mock_weather_response
+    stub_api.delay = 0.1
+    await weather_server.get_weather_data("City0")  # Already cached
+    cities = [f"City{i}" for i in range(20)] + ["city1", " CITY2 "]
+
+    started = time.perf_counter()
+    result = await weather_server.get_weather_bulk(cities)
+    elapsed = time.perf_counter() - started
+
+    assert result["unique_cities"] == 20
+    assert set(result["results"]) == set(cities)
+    assert result["results"]["City3"]["temperature"] == 20.5
+    assert stub_api.calls("/weather") == 20  # One per distinct city, none for duplicates
+    assert elapsed < 1.0  # 19 serialized misses would take about 2 seconds
+
+@pytest.mark.asyncio
+async def test_weather_bulk_reports_errors_per_city(weather_server, stub_api, mock_weather_response):
+    stub_api.routes["/weather"] = mock_weather_response
+    stub_api.failures.append((404, "API Error"))
+
+    result = await weather_server.get_weather_bulk(["Atlantis"])
+
+    assert "API Error" in result["errors"]["Atlantis"]
+    assert result["results"] == {}
+
+    too_many = await weather_server.get_weather_bulk([f"City{i}" for i in range(201)])
+    assert "error" in too_many
+
+def test_normalize_query():
+    assert normalize_query(" London ") == "london"
+    assert normalize_query("london,  GB") == "london,gb"
+    assert normalize_query("London,UK") == "london,gb"
+    assert normalize_query("New   York , USA") == "new york,us"
+    with pytest.raises(ValueError):
+        normalize_query(" , ")
+
+@pytest.mark.asyncio
+async def test_location_variants_share_cache_entry(weather_server, stub_api, mock_weather_response):
+    stub_api.routes["/weather"] = mock_weather_response
+
+    for city in ["London", "london, gb", "London,UK", " London "]:
+        resource = await weather_server.get_current_weather({"city": city})
+        assert resource.metadata["location"] == "london,gb"
+
+    assert stub_api.calls("/weather") == 1
+    assert stub_api.calls("/geo/1.0/direct") == 2  # "london" and "london,gb"
+    assert len(weather_server.weather_cache) == 1
+    await weather_server.get_current_weather({"city": "LONDON"})
+    assert stub_api.calls("/geo/1.0/direct") == 2  # Resolutions are cached too
+
+@pytest.mark.asyncio
+async def test_unknown_location(weather_server, stub_api):
+    stub_api.routes["/geo/1.0/direct"] = []
+
+    resource = await weather_server.get_current_weather({"city": "Atlantis"})
+
+    assert "Unknown location" in resource.error
+    assert stub_api.calls("/weather") == 0
+
+def test_histogram_quantiles():
+    histogram = Histogram(buckets=(0.1, 1.0))
+    for value in (0.05, 0.05, 0.5, 5.0):
+        histogram.observe(value)
+
+    assert histogram.counts == [2, 1, 1]
+    assert histogram.quantile(0.5) == 0.1
+    assert histogram.quantile(0.75) == 1.0
+    assert histogram.quantile(1.0) == float("inf")
+
+def test_ttl_cache_counts_evictions():
+    clock = FakeClock()
+    cache = RefreshingCache(maxsize=2, soft_ttl=10, hard_ttl=30, timer=clock)
+    for city in ("london", "paris", "rome"):
+        cache.store(city, "sunny")
+    clock.now = 31
+    cache.store("oslo", "snow")
+
+    assert cache.entries.evictions == 1
+    assert cache.entries.expirations == 2
+
+@pytest.mark.asyncio
+async def test_metrics_resource(weather_server, stub_api, mock_weather_response):
+    stub_api.routes["/weather"] = mock_weather_response
+    await weather_server.get_current_weather({"city": "London"})
+    await weather_server.get_current_weather({"city": "London"})
+    stub_api.failures.append((404, "API Error"))
+    await weather_server.get_current_weather({"city": "Paris"})
+
+    metrics = weather_server.metrics
+    assert metrics.value("weather_cache_lookups_total", cache="weather", result="miss") == 1
+    assert metrics.value("weather_cache_lookups_total", cache="weather", result="hit") == 1
+    assert metrics.value("weather_upstream_requests_total", endpoint="weather", outcome="ok") == 1
+    assert metrics.value("weather_upstream_requests_total", endpoint="direct", outcome="error") == 1
+
+    resource = await weather_server.get_metrics()
+    latency = resource.data["weather_upstream_latency_seconds"]
+    assert sum(series["count"] for series in latency) == 3
+    assert {"labels": {"cache": "weather"}, "value": 1} in resource.data["weather_cache_entries"]
+
+    text = (await weather_server.get_metrics({"format": "prometheus"})).data
+    assert "# TYPE weather_upstream_latency_seconds histogram" in text
+    assert 'weather_cache_lookups_total{cache="weather",result="hit"} 1' in text
+    assert 'weather_rate_limit_wait_seconds_bucket{le="+Inf"} 3' in text
@@ -1,118 +1,201 @@
+import argparse
 import asyncio
+import os
 import random
 import time
-from typing import List, Dict
-from rich.console import Console
-from rich.progress import Progress, SpinnerColumn
+from dataclasses import dataclass, field, replace
+from typing import Iterator, List, Dict, Optional, Tuple
+import numpy as np
+from rich.console import Console, Group
+from rich.progress_bar import ProgressBar
 from rich.table import Table
 from rich.panel import Panel
 from rich.live import Live
-from megadev.server import MegaDevServer
+from megadev.server import DEFAULT_SESSION, MegaDevServer
 from megadev.models import Squad
+from megadev.parallel import ShardedScorer
+from megadev.population import Population
+from megadev.scoring import ConfigMatrix, challenge_scores, stream_top_k
 
 console = Console()
 
+CHALLENGE_TYPES = ["Algorithm Battle", "System Design Showdown", "Debug Death Match"]
+
+# Squads per progress step when pacing is on
+PACE_CHUNK = 1000
+
+@dataclass(frozen=True)
+class TournamentSnapshot:
+    """Immutable view of the tournament at one instant"""
+    phase: str = "starting"
+    round: int = 0
+    challenge: str = ""
+    remaining: int = 0
+    done: int = 0
+    total: int = 0
+    # (name, score, agents) of the current top 10
+    top: Tuple[Tuple[str, float, int], ...] = ()
+    started_at: float = field(default_factory=time.perf_counter)
+
+class TournamentState:
+    """Latest snapshot, published by the tournament and read by renderers.
+    
+    Publishing swaps in a new immutable snapshot, so readers on other threads
+    never see a half-updated state and the engine never waits for them.
+    """
+    
+    def __init__(self):
+        self.snapshot = TournamentSnapshot()
+    
+    def publish(self, **changes):
+        self.snapshot = replace(self.snapshot, **changes)
+
 class CodingTournament:
-    def __init__(self, initial_devs: int = 1_000_000):
+    def __init__(self, initial_devs: int = 1_000_000, paced: bool = False,
+                 seed: Optional[int] = None, streaming: bool = False,
+                 chunk_size: int = 10_000, workers: int = 1):
         self.initial_devs = initial_devs
-        self.server = MegaDevServer()
+        # Generate and score the field chunk by chunk, keeping only round 1 survivors
+        self.streaming = streaming
+        self.chunk_size = chunk_size
+        # Slow the progress bar down to watch the rounds play out
+        self.paced = paced
+        # Every random draw derives from this seed, whatever the worker count
+        self.seed = seed if seed is not None else int(np.random.SeedSequence().entropy % 2**63)
+        self.rng = np.random.default_rng(self.seed)
+        self.workers = workers
+        # Agent configurations of every squad, by the population's stable slots
+        self.configs: Optional[ConfigMatrix] = None
+        self.scorer: Optional[ShardedScorer] = None
+        # A local tournament is the only client, so lift the per-session memory quotas
+        self.server = MegaDevServer(max_session_bytes=None, max_resident_bytes=None)
         self.round = 0
-        self.squads: List[Squad] = []
         self.hall_of_fame: List[Dict] = []
+        # Progress and standings for whatever UI is attached
+        self.state = TournamentState()
         
-    def calculate_challenge_score(self, squad: Squad) -> float:
-        """Calculate squad performance in current challenge"""
-        base_score = 0
-        
-        for agent in squad.agents:
-            # Different challenges favor different attributes
-            if self.round % 3 == 0:  # Algorithm challenges
-                score = (agent.config.learning_rate * 0.4 +
-                        agent.config.memory_capacity * 0.4 +
-                        agent.config.attention_span * 0.2)
-            elif self.round % 3 == 1:  # System design challenges
-                score = (agent.config.creativity_factor * 0.3 +
-                        agent.config.cooperation_bias * 0.4 +
-                        agent.config.risk_tolerance * 0.3)
-            else:  # Debug challenges
-                score = (agent.config.adaptation_speed * 0.5 +
-                        agent.config.energy_efficiency * 0.3 +
-                        agent.config.attention_span * 0.2)
-            
-            # Add some randomness
-            score *= random.uniform(0.8, 1.2)
-            base_score += score
-        
-        return base_score / len(squad.agents)
+    @property
+    def squads(self) -> Population:
+        """Live squads, shared with the server; eliminations shrink it in place"""
+        return self.server.population
 
     async def initialize_tournament(self):
         """Set up initial population of dev squads"""
         squad_size = 5
         num_squads = self.initial_devs // squad_size
+        if self.streaming:
+            await self.run_streaming_first_round(num_squads, squad_size)
+            return
         
-        with console.status("[bold green]Gathering developers worldwide..."):
-            await self.server.initialize_population(
-                population_size=num_squads,
-                squad_size=squad_size
-            )
-            self.squads = self.server.population
+        self.state.publish(phase="gathering", total=num_squads)
+        await self.server.initialize_population(
+            population_size=num_squads,
+            squad_size=squad_size,
+            seed=self.seed
+        )
+        population = self.squads
+        self.prepare_rounds(ConfigMatrix([population.at(slot) for slot in range(population.capacity)]))
+        self.state.publish(remaining=len(population), done=num_squads)
 
-    async def run_challenge_round(self) -> List[Squad]:
-        """Run one round of the tournament"""
-        self.round += 1
-        challenge_types = ["Algorithm Battle", "System Design Showdown", "Debug Death Match"]
-        challenge = challenge_types[self.round % 3]
+    def generate_squads(self, num_squads: int, squad_size: int) -> Iterator[List[Squad]]:
+        """Lazily create the field in chunks of `chunk_size` squads"""
+        # Ids included, so the same seed always fields the same squads
+        rng = random.Random(self.seed)
+        for start in range(0, num_squads, self.chunk_size):
+            yield [
+                Squad.create_random(f"Squad-{i}", size=squad_size, rng=rng)
+                for i in range(start, min(start + self.chunk_size, num_squads))
+            ]
+
+    async def run_streaming_first_round(self, num_squads: int, squad_size: int) -> Population:
+        """Play round 1 over a lazily generated field, never holding all of it.
         
-        console.print(f"\n[bold red]Round {self.round}: {challenge}")
-        console.print(f"[bold yellow]{len(self.squads)} squads remaining")
+        Each chunk is scored as it is created and only the top half of the
+        field survives in a bounded heap; the survivors become the server's
+        population for the remaining rounds.
+        """
+        self.round = 1
+        challenge = CHALLENGE_TYPES[self.round % 3]
+        self.state.publish(phase="gathering and evaluating", round=self.round,
+                           challenge=challenge, remaining=num_squads, done=0, total=num_squads)
         
-        # Evaluate all squads
-        with Progress(
-            SpinnerColumn(),
-            *Progress.get_default_columns(),
-            console=console
-        ) as progress:
-            task = progress.add_task("Evaluating squads...", total=len(self.squads))
-            
-            for squad in self.squads:
-                squad.fitness_score = self.calculate_challenge_score(squad)
-                progress.advance(task)
-                await asyncio.sleep(0.01)  # For dramatic effect
+        done = 0
+        def score(chunk: List[Squad]) -> np.ndarray:
+            nonlocal done
+            scores = challenge_scores(ConfigMatrix(chunk), self.round, self.rng)
+            done += len(chunk)
+            self.state.publish(done=done)
+            return scores
         
-        # Sort and eliminate bottom 50%
-        self.squads.sort(key=lambda s: s.fitness_score, reverse=True)
-        eliminated = len(self.squads) // 2
-        self.squads = self.squads[:-eliminated]
+        survivors = stream_top_k(self.generate_squads(num_squads, squad_size),
+                                 num_squads - num_squads // 2, score)
         
-        # Record top performers
+        squads = [squad for _, squad in survivors]
+        for value, squad in survivors:
+            squad.fitness_score = value
+        await self.server.adopt_population(squads, self.server.sessions.get(DEFAULT_SESSION))
+        self.prepare_rounds(ConfigMatrix(squads))
+        self.finish_round(challenge)
+        return self.squads
+
+    def prepare_rounds(self, configs: ConfigMatrix):
+        """Set up scoring of later rounds over the population's config matrix"""
+        self.close()
+        self.configs = configs
+        self.scorer = ShardedScorer(configs, self.seed, self.workers)
+
+    def close(self):
+        """Stop scoring workers and release shared memory"""
+        if self.scorer is not None:
+            self.scorer.close()
+            self.scorer = None
+
+    def finish_round(self, challenge: str):
+        """Publish the round's standings and record its winner once the field is small"""
+        top = self.server.fitness_index.top(10)
+        self.state.publish(
+            phase="round complete",
+            remaining=len(self.squads),
+            top=tuple((squad.name, squad.fitness_score, len(squad.agents)) for squad in top)
+        )
         if len(self.squads) <= 100:
-            top_squad = self.squads[0]
+            top_squad = top[0]
             self.hall_of_fame.append({
                 "round": self.round,
                 "name": top_squad.name,
                 "score": top_squad.fitness_score,
                 "challenge": challenge
             })
-        
-        return self.squads
 
-    def display_leaderboard(self):
-        """Show current top performers"""
-        table = Table(title=f"Top Squads - Round {self.round}")
-        table.add_column("Rank", justify="right", style="cyan")
-        table.add_column("Squad", style="magenta")
-        table.add_column("Score", justify="right", style="green")
-        table.add_column("Agents", justify="right", style="yellow")
+    async def run_challenge_round(self) -> Population:
+        """Run one round of the tournament"""
+        self.round += 1
+        challenge = CHALLENGE_TYPES[self.round % 3]
+        self.state.publish(phase="evaluating", round=self.round, challenge=challenge,
+                           remaining=len(self.squads), done=0, total=len(self.squads))
         
-        for i, squad in enumerate(self.squads[:10], 1):
-            table.add_row(
-                str(i),
-                squad.name,
-                f"{squad.fitness_score:.3f}",
-                str(len(squad.agents))
-            )
+        # Score the live squads across the worker shards, keeping the top half
+        slots = self.squads.live_slots()
+        survivors_wanted = len(slots) - len(slots) // 2
+        done = 0
+        def shard_done(count: int):
+            nonlocal done
+            done += count
+            self.state.publish(done=done)
+        survivors, scores = self.scorer.top_k(self.round, slots, survivors_wanted,
+                                              on_shard=shard_done)
+        if self.paced:
+            for start in range(0, len(slots), PACE_CHUNK):
+                self.state.publish(done=min(start + PACE_CHUNK, len(slots)))
+                await asyncio.sleep(0.01)  # For dramatic effect
+        
+        # Eliminate bottom 50% in place and publish the survivors' scores in one bulk update
+        self.squads.retain(survivors, scores)
+        
+        # Record top performers
+        self.finish_round(challenge)
         
-        console.print(table)
+        return self.squads
 
     def display_hall_of_fame(self):
         """Display tournament highlights"""
@@ -132,30 +215,87 @@ class CodingTournament:
         
         console.print(Panel(table, title="[bold yellow]Hall of Fame"))
 
-async def main():
-    console.clear()
-    console.print("[bold red]MEGADEV TOURNAMENT[/bold red]", justify="center")
-    console.print("[bold yellow]Million Developer Challenge[/bold yellow]\n", justify="center")
+def render_leaderboard(snapshot: TournamentSnapshot) -> Table:
+    """Show current top performers"""
+    table = Table(title=f"Top Squads - Round {snapshot.round}")
+    table.add_column("Rank", justify="right", style="cyan")
+    table.add_column("Squad", style="magenta")
+    table.add_column("Score", justify="right", style="green")
+    table.add_column("Agents", justify="right", style="yellow")
     
-    tournament = CodingTournament()
-    await tournament.initialize_tournament()
+    for i, (name, score, agents) in enumerate(snapshot.top, 1):
+        table.add_row(str(i), name, f"{score:.3f}", str(agents))
     
+    return table
+
+def render_dashboard(snapshot: TournamentSnapshot) -> Panel:
+    """Whole dashboard for one frame"""
+    header = f"[bold red]Round {snapshot.round}: {snapshot.challenge}[/bold red]  " \
+             f"[bold yellow]{snapshot.remaining:,} squads remaining[/bold yellow]"
+    if 0 < snapshot.remaining <= 100:
+        header += "  [bold red]!!! FINAL STAGES !!![/bold red]"
+    progress = f"{snapshot.phase}: {snapshot.done:,}/{snapshot.total:,} squads  " \
+               f"[dim]{time.perf_counter() - snapshot.started_at:.1f}s elapsed[/dim]"
+    return Panel(
+        Group(header, ProgressBar(total=max(snapshot.total, 1), completed=snapshot.done),
+              progress, render_leaderboard(snapshot)),
+        title="[bold red]MEGADEV TOURNAMENT[/bold red]"
+    )
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Million Developer Challenge")
+    parser.add_argument("--devs", type=int, default=1_000_000, help="Number of developers")
+    parser.add_argument("--seed", type=int, default=None, help="Seed for reproducible rounds")
+    parser.add_argument("--no-ui", action="store_true",
+                        help="Skip the live dashboard and pauses; print only the results")
+    parser.add_argument("--fps", type=float, default=8, help="Dashboard frames per second")
+    parser.add_argument("--paced", action="store_true", help="Slow rounds down to watch them")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="Processes that score each round in parallel")
+    parser.add_argument("--streaming", action=argparse.BooleanOptionalAction, default=True,
+                        help="Generate and score round 1 chunk by chunk, holding only its "
+                             "survivors (default). Round 1 then runs in this process; "
+                             "--no-streaming holds the whole field so --workers shares "
+                             "round 1 too")
+    return parser.parse_args(argv)
+
+async def play(tournament: CodingTournament, pause: float = 0):
+    await tournament.initialize_tournament()
     while len(tournament.squads) > 1:
         await tournament.run_challenge_round()
-        tournament.display_leaderboard()
-        
-        if len(tournament.squads) <= 100:
-            console.print(f"\n[bold red]!!! FINAL STAGES !!![/bold red]")
-        
         # Dramatic pause between rounds
-        await asyncio.sleep(2)
+        await asyncio.sleep(pause)
+    tournament.state.publish(phase="complete")
+
+async def main(argv: Optional[List[str]] = None):
+    args = parse_args(argv)
+    tournament = CodingTournament(initial_devs=args.devs, paced=args.paced,
+                                  seed=args.seed, streaming=args.streaming,
+                                  workers=args.workers)
+    
+    try:
+        if args.no_ui:
+            await play(tournament)
+        else:
+            console.clear()
+            # The dashboard redraws from its own thread at a fixed rate, so
+            # rendering never runs on the scoring path
+            with Live(get_renderable=lambda: render_dashboard(tournament.state.snapshot),
+                      console=console, refresh_per_second=args.fps):
+                await play(tournament, pause=2)
+    finally:
+        tournament.close()
+        await tournament.server.close()
     
     # Tournament complete
+    winner = tournament.squads[0]
     console.print("\n[bold green]Tournament Complete![/bold green]")
-    console.print(f"[bold yellow]Winner: {tournament.squads[0].name}")
-    console.print(f"Final Score: {tournament.squads[0].fitness_score:.3f}\n")
+    console.print(f"[bold yellow]Winner: {winner.name}")
+    console.print(f"Final Score: {winner.fitness_score:.3f}")
+    console.print(f"Rounds: {tournament.round}, "
+                  f"{time.perf_counter() - tournament.state.snapshot.started_at:.1f}s\n")
     
     tournament.display_hall_of_fame()
 
 if __name__ == "__main__":
-    asyncio.run(main()) 
\ No newline at end of file
+    asyncio.run(main())